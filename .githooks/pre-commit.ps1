@@ -11,6 +11,38 @@ try {
     exit 1
   }
   Write-Host 'Pre-commit: require lint passed. Proceeding with commit.'
+  # Audit locale drift when locale files are staged (parse cache: .scripts/.cache/).
+  # The staged blobs are what gets committed: when locale/ has unstaged or untracked
+  # changes, audit a copy of the index's locale/ instead of the working tree.
+  $staged = git diff --cached --name-only
+  if ($staged | Where-Object { $_ -like 'locale/*' }) {
+    $python = Get-Command python, python3 -CommandType Application -ErrorAction SilentlyContinue | Select-Object -First 1
+    if (-not $python) {
+      Write-Warning 'Pre-commit: python not found; skipping locale audit.'
+    } else {
+      Write-Host 'Running locale audit...'
+      $dirty = (git diff --name-only -- locale/) -or (git ls-files --others --exclude-standard -- locale/)
+      $stagedDir = $null
+      try {
+        if ($dirty) {
+          $stagedDir = Join-Path ([IO.Path]::GetTempPath()) ([IO.Path]::GetRandomFileName())
+          New-Item -ItemType Directory -Path $stagedDir | Out-Null
+          $prefix = ($stagedDir -replace '\\', '/') + '/'
+          git ls-files -- locale/ | git checkout-index --stdin "--prefix=$prefix"
+          & $python.Source .scripts/audit_locales.py --quiet --no-cache --jobs 0 --locale-root (Join-Path $stagedDir 'locale')
+        } else {
+          & $python.Source .scripts/audit_locales.py --quiet --incremental --jobs 0
+        }
+        $rc = $LASTEXITCODE
+      } finally {
+        if ($stagedDir) { Remove-Item -Recurse -Force $stagedDir }
+      }
+      if ($rc -ne 0) {
+        Write-Error "Pre-commit: locale audit found drift (rc=$rc). Run .scripts/sync_locales.py --write. Commit aborted."
+        exit 1
+      }
+    }
+  }
   exit 0
 } catch {
   Write-Error $_.Exception.Message
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+File fingerprints for the .scripts on-disk caches (locale audit state, the test
+impact map, the Lua line counts): decide whether a cached per-file result is
+still valid without re-reading every file on every run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+# (size, mtime_ns, sha256 hex digest)
+Fingerprint = Tuple[int, int, str]
+
+
+def file_fingerprint(path: Path, previous: Optional[Fingerprint] = None) -> Fingerprint:
+    """
+    Fingerprint ``path``. When size and mtime match ``previous`` its digest is reused
+    (one stat call); otherwise the file is read and hashed, so a touched-but-identical
+    file (checkout, rebase) still compares equal by digest.
+    """
+    st = os.stat(path)
+    if previous is not None and previous[0] == st.st_size and previous[1] == st.st_mtime_ns:
+        return previous
+    return (st.st_size, st.st_mtime_ns, hashlib.sha256(path.read_bytes()).hexdigest())
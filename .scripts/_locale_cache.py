@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+On-disk parse cache for locale strings.cfg files.
+Shared by audit_locales.py, sync_locales.py and the pre-commit hook.
+
+Parsed records are stored by content hash (sha256) in a single pickle file.
+Each path remembers (size, mtime_ns, digest), so an unchanged file costs one
+stat call; a touched-but-identical file costs a read + hash but no parse.
+The whole cache is dropped when _locale_parser.py or this module changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+import _locale_parser  # noqa: E402
+from _locale_parser import LineKind, LineRecord, decode_text, parse_lines  # noqa: E402
+
+# Bump when the pickled layout below changes.
+CACHE_FORMAT = 2
+
+DEFAULT_CACHE_PATH = _SCRIPT_DIR / ".cache" / "locale_parse.pickle"
+
+_KINDS = tuple(LineKind)
+
+# (kind, text, section, key) — plain tuples pickle faster than LineRecord.
+_PackedRecord = Tuple[int, str, Optional[str], Optional[str]]
+
+
+class ParsedFile(NamedTuple):
+    """A parsed file with the stat and digest it was read at, ready for ParseCache.add."""
+
+    key: str  # resolved path
+    size: int
+    mtime_ns: int
+    digest: str
+    lines: List[LineRecord]
+
+
+def parser_fingerprint() -> str:
+    """Hash of the cache format and the parser/cache sources; any edit invalidates."""
+    h = hashlib.sha256(f"format={CACHE_FORMAT}".encode())
+    for src in (Path(_locale_parser.__file__), Path(__file__)):
+        h.update(src.read_bytes())
+    return h.hexdigest()
+
+
+class ParseCache:
+    """
+    Content-addressed store of parsed locale files.
+
+    Usage:
+        with ParseCache.open() as cache:
+            lines = cache.records(path)
+    """
+
+    def __init__(self, cache_path: Path = DEFAULT_CACHE_PATH) -> None:
+        self.cache_path = cache_path
+        self.fingerprint = parser_fingerprint()
+        # path -> (size, mtime_ns, digest)
+        self._stats: Dict[str, Tuple[int, int, str]] = {}
+        # digest -> packed records
+        self._parsed: Dict[str, List[_PackedRecord]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open(cls, cache_path: Path = DEFAULT_CACHE_PATH) -> "ParseCache":
+        cache = cls(cache_path)
+        cache._load()
+        return cache
+
+    def __enter__(self) -> "ParseCache":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.save()
+
+    def _load(self) -> None:
+        try:
+            with self.cache_path.open("rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("fingerprint") != self.fingerprint:
+            # Parser changed (or foreign file): start over and rewrite on save.
+            self._dirty = True
+            return
+        self._stats = data["stats"]
+        self._parsed = data["parsed"]
+
+    def save(self) -> None:
+        """Evict deleted files and unreferenced digests, then write atomically if changed."""
+        for key in [k for k in self._stats if not os.path.isfile(k)]:
+            del self._stats[key]
+            self._dirty = True
+        live = {digest for _, _, digest in self._stats.values()}
+        for digest in [d for d in self._parsed if d not in live]:
+            del self._parsed[digest]
+            self._dirty = True
+        if not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        payload = {"fingerprint": self.fingerprint, "stats": self._stats, "parsed": self._parsed}
+        with tmp.open("wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.cache_path)
+        self._dirty = False
+
+    def lookup(self, path: Path) -> Optional[List[LineRecord]]:
+        """Cached records if ``path`` is unchanged since it was stored (stat only), else None."""
+        key = str(path.resolve())
+        known = self._stats.get(key)
+        if known is None:
+            return None
+        st = os.stat(key)
+        if known[0] != st.st_size or known[1] != st.st_mtime_ns:
+            return None
+        packed = self._parsed.get(known[2])
+        if packed is None:
+            return None
+        self.hits += 1
+        return self._unpack(packed)
+
+    def add(self, parsed: ParsedFile) -> None:
+        """Store a parsed file under its path and content digest."""
+        self._stats[parsed.key] = (parsed.size, parsed.mtime_ns, parsed.digest)
+        if parsed.digest not in self._parsed:
+            self._parsed[parsed.digest] = [
+                (int(r.kind), r.text, r.section, r.key) for r in parsed.lines
+            ]
+        self._dirty = True
+
+    def records(self, path: Path) -> List[LineRecord]:
+        """Parsed LineRecords for ``path``; parses and stores on a miss."""
+        hit = self.lookup(path)
+        if hit is not None:
+            return hit
+
+        key = str(path.resolve())
+        st = os.stat(key)
+        data = Path(key).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        packed = self._parsed.get(digest)
+        if packed is not None:
+            # Touched but identical content: refresh the stat, skip the parse.
+            self._stats[key] = (st.st_size, st.st_mtime_ns, digest)
+            self._dirty = True
+            self.hits += 1
+            return self._unpack(packed)
+
+        self.misses += 1
+        lines = parse_lines(decode_text(data))[0]
+        self.add(ParsedFile(key, st.st_size, st.st_mtime_ns, digest, lines))
+        return lines
+
+    @staticmethod
+    def _unpack(packed: List[_PackedRecord]) -> List[LineRecord]:
+        kinds = _KINDS
+        return [LineRecord(kinds[k], text, sec, key) for k, text, sec, key in packed]
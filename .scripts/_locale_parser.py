@@ -7,9 +7,10 @@ Used by audit_locales.py and sync_locales.py.
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass, field
+import sys
+from enum import IntEnum
 from pathlib import Path
-from typing import Dict, List, Literal, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Protocol, Tuple
 
 # Synthetic section id for lines before the first [section] header.
 ROOT_SECTION = "<root>"
@@ -19,13 +20,41 @@ SECTION_RE = re.compile(r"^\s*\[([^\]]+)\]\s*$")
 ENTRY_RE = re.compile(r"^([A-Za-z0-9_.\-]+)\s*=(.*)$")
 
 
-@dataclass
-class LineRecord:
-    kind: Literal["raw", "blank", "comment", "section", "entry"]
+class LineKind(IntEnum):
+    RAW = 0
+    BLANK = 1
+    COMMENT = 2
+    SECTION = 3
+    ENTRY = 4
+
+
+class LineRecord(NamedTuple):
+    """
+    One line of a strings.cfg file.
+
+    Tuple-backed (no per-instance __dict__); section and key strings are interned
+    by the parser so every locale shares a single copy of each name. An entry's
+    value is not stored: it is sliced from ``text`` on access, which keeps one
+    string per line instead of two.
+    """
+
+    kind: LineKind
     text: str  # full line including newline if present
     section: Optional[str] = None  # current section after this line is processed (for entry)
     key: Optional[str] = None
-    value: Optional[str] = None
+
+    @property
+    def value(self) -> Optional[str]:
+        """Everything after the first ``=`` of an entry line (no line ending); None otherwise."""
+        if self.kind != LineKind.ENTRY:
+            return None
+        return _strip_newline(self.text).partition("=")[2]
+
+
+class RecordCache(Protocol):
+    """Anything that can serve parsed records for a path (see _locale_cache.ParseCache)."""
+
+    def records(self, path: Path) -> List[LineRecord]: ...
 
 
 def _strip_bom(s: str) -> str:
@@ -34,101 +63,148 @@ def _strip_bom(s: str) -> str:
     return s
 
 
+def _strip_newline(part: str) -> str:
+    if part.endswith("\r\n"):
+        return part[:-2]
+    if part.endswith("\n") or part.endswith("\r"):
+        return part[:-1]
+    return part
+
+
 def is_comment_line(line: str) -> bool:
     s = _strip_bom(line).strip()
     return bool(s) and (s.startswith("#") or s.startswith(";"))
 
 
-def parse_lines(text: str) -> Tuple[List[LineRecord], Dict[str, str], List[Tuple[str, str]]]:
-    """
-    Parse file text into line records and key metadata.
-
-    Returns:
-      - lines: LineRecord per input line (kind + entry metadata)
-      - key_to_section: last section each key appears in (duplicates: last wins)
-      - ordered_pairs: (section, key) in file order for each entry line
-    """
-    # Preserve line endings by splitting with keepends
-    parts = text.splitlines(keepends=True)
-    lines: List[LineRecord] = []
+def _iter_line_records(parts: Iterable[str]) -> Iterator[LineRecord]:
+    """Classify each line (with its line ending) and yield one LineRecord per line."""
     current_section = ROOT_SECTION
-    key_to_section: Dict[str, str] = {}
-    ordered_pairs: List[Tuple[str, str]] = []
 
     for part in parts:
         if not part:
-            lines.append(LineRecord(kind="blank", text="\n"))
+            yield LineRecord(kind=LineKind.BLANK, text="\n")
             continue
-        nl = ""
-        body = part
-        if body.endswith("\r\n"):
-            nl = "\r\n"
-            body = body[:-2]
-        elif body.endswith("\n"):
-            nl = "\n"
-            body = body[:-1]
-        elif body.endswith("\r"):
-            nl = "\r"
-            body = body[:-1]
+        body = _strip_newline(part)
 
         if not body.strip():
-            lines.append(LineRecord(kind="blank", text=part))
+            yield LineRecord(kind=LineKind.BLANK, text=part)
             continue
 
         if is_comment_line(body):
-            lines.append(LineRecord(kind="comment", text=part))
+            yield LineRecord(kind=LineKind.COMMENT, text=part)
             continue
 
         msec = SECTION_RE.match(body.strip())
         if msec:
-            current_section = msec.group(1).strip()
-            lines.append(LineRecord(kind="section", text=part, section=current_section))
+            current_section = sys.intern(msec.group(1).strip())
+            yield LineRecord(kind=LineKind.SECTION, text=part, section=current_section)
             continue
 
         ment = ENTRY_RE.match(body)
         if ment:
-            k = ment.group(1)
-            v = ment.group(2)
-            key_to_section[k] = current_section
-            ordered_pairs.append((current_section, k))
-            lines.append(
-                LineRecord(
-                    kind="entry",
-                    text=part,
-                    section=current_section,
-                    key=k,
-                    value=v,
-                )
+            yield LineRecord(
+                kind=LineKind.ENTRY,
+                text=part,
+                section=current_section,
+                key=sys.intern(ment.group(1)),
             )
             continue
 
         # Unrecognized — keep as raw passthrough
-        lines.append(LineRecord(kind="raw", text=part))
+        yield LineRecord(kind=LineKind.RAW, text=part)
+
+
+def iter_file_lines(path: Path) -> Iterator[str]:
+    """
+    Yield the lines of a UTF-8 file, keeping line endings.
 
+    Splits exactly like ``path.read_text(encoding="utf-8").splitlines(keepends=True)``
+    (universal newlines, so \r\n and \r arrive as \n), but reads the file
+    incrementally instead of holding the text and its line list.
+    """
+    with path.open("r", encoding="utf-8") as f:
+        for chunk in f:
+            # Text mode only splits on newlines; splitlines also breaks on \v, \f,
+            # \x1c-\x1e, \x85, \u2028 and \u2029, so split again to match.
+            yield from chunk.splitlines(keepends=True)
+
+
+def decode_text(data: bytes) -> str:
+    """Decode file bytes the way ``Path.read_text(encoding="utf-8")`` does."""
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def iter_records(path: Path) -> Iterator[LineRecord]:
+    """Lazily yield a LineRecord per line of ``path`` in file order."""
+    return _iter_line_records(iter_file_lines(path))
+
+
+def _collect(
+    records: Iterable[LineRecord],
+) -> Tuple[List[LineRecord], Dict[str, str], List[Tuple[str, str]]]:
+    lines: List[LineRecord] = []
+    key_to_section: Dict[str, str] = {}
+    ordered_pairs: List[Tuple[str, str]] = []
+    for rec in records:
+        lines.append(rec)
+        if rec.kind == LineKind.ENTRY and rec.key is not None and rec.section is not None:
+            key_to_section[rec.key] = rec.section
+            ordered_pairs.append((rec.section, rec.key))
     return lines, key_to_section, ordered_pairs
 
 
-def load_parsed(path: Path) -> Tuple[str, List[LineRecord], Dict[str, str], List[Tuple[str, str]]]:
-    raw = path.read_text(encoding="utf-8")
-    lines, key_to_section, ordered_pairs = parse_lines(raw)
+def parse_lines(text: str) -> Tuple[List[LineRecord], Dict[str, str], List[Tuple[str, str]]]:
+    """
+    Parse file text into line records and key metadata.
+
+    Returns:
+      - lines: LineRecord per input line (kind + entry metadata)
+      - key_to_section: last section each key appears in (duplicates: last wins)
+      - ordered_pairs: (section, key) in file order for each entry line
+    """
+    # Preserve line endings by splitting with keepends
+    return _collect(_iter_line_records(text.splitlines(keepends=True)))
+
+
+def read_records(path: Path, cache: Optional[RecordCache] = None) -> Iterable[LineRecord]:
+    """Records for ``path``: from ``cache`` when given, else streamed from disk."""
+    if cache is not None:
+        return cache.records(path)
+    return iter_records(path)
+
+
+def load_parsed(
+    path: Path, cache: Optional[RecordCache] = None
+) -> Tuple[str, List[LineRecord], Dict[str, str], List[Tuple[str, str]]]:
+    lines, key_to_section, ordered_pairs = _collect(read_records(path, cache))
+    # Records keep their line endings, so joining them reproduces the file text.
+    raw = "".join(rec.text for rec in lines)
     return raw, lines, key_to_section, ordered_pairs
 
 
+def key_sections(path: Path, cache: Optional[RecordCache] = None) -> Dict[str, str]:
+    """Key -> last section it appears in, without keeping line records."""
+    out: Dict[str, str] = {}
+    for rec in read_records(path, cache):
+        if rec.kind == LineKind.ENTRY and rec.key is not None and rec.section is not None:
+            out[rec.key] = rec.section
+    return out
+
+
 def en_key_order(ordered_pairs: List[Tuple[str, str]]) -> List[str]:
     return [k for _, k in ordered_pairs]
 
 
-def ordered_entries_with_values(lines: List[LineRecord]) -> List[Tuple[str, str, str]]:
+def ordered_entries_with_values(lines: Iterable[LineRecord]) -> List[Tuple[str, str, str]]:
     """(section, key, value) for each entry line, in file order."""
     out: List[Tuple[str, str, str]] = []
     for rec in lines:
-        if rec.kind == "entry" and rec.key is not None and rec.value is not None:
+        if rec.kind == LineKind.ENTRY and rec.key is not None and rec.value is not None:
             sec = rec.section if rec.section is not None else ROOT_SECTION
             out.append((sec, rec.key, rec.value))
     return out
 
 
-def flatten_en_order(path: Path) -> List[Tuple[str, str, str]]:
+def flatten_en_order(path: Path, cache: Optional[RecordCache] = None) -> List[Tuple[str, str, str]]:
     """Return list of (section, key, value) for each entry in file order."""
-    _, lines, _, _ = load_parsed(path)
-    return ordered_entries_with_values(lines)
+    return ordered_entries_with_values(read_records(path, cache))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Where the mod's Lua files are: the repo root, require() name resolution and the
+set of shipped files, shared by the .scripts tools that read Lua sources.
+
+The shipped set is what analyze_lua_lines.py counts: every *.lua file outside
+dot directories, test directories and the root asset folders, minus test-named
+files and factorio.emmy.lua.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterator, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TESTS_DIR = REPO_ROOT / "tests"
+
+# Module search roots, mirroring package.path when run_all_tests.lua runs from tests/
+_SEARCH_ROOTS = (REPO_ROOT, TESTS_DIR, TESTS_DIR / "infrastructure")
+
+
+def resolve_module(name: str) -> Optional[str]:
+    """Repo-relative file for a module name, or None (external / not found)."""
+    base = name.replace(".", "/")
+    for root in _SEARCH_ROOTS:
+        for candidate in (root / f"{base}.lua", root / base / "init.lua"):
+            if candidate.is_file():
+                return candidate.relative_to(REPO_ROOT).as_posix()
+    return None
+
+
+# Directory names never analyzed (compared lowercase), at any depth
+TEST_DIR_NAMES = frozenset(('test', 'tests', 'spec', 'specs'))
+# Top-level asset folders: Factorio never loads Lua from them
+ASSET_DIR_NAMES = frozenset(('graphics', 'locale', 'sound'))
+
+
+def is_excluded_dir(name: str, depth: int) -> bool:
+    """
+    Whether a directory (and everything below it) is excluded from analysis.
+
+    Args:
+        name: Directory name
+        depth: 0 for directories in the project root
+
+    Returns:
+        True for .dist and other dot directories, test directories and root asset folders
+    """
+    if name.startswith('.'):
+        return True
+    lowered = name.lower()
+    if lowered in TEST_DIR_NAMES:
+        return True
+    return depth == 0 and lowered in ASSET_DIR_NAMES
+
+
+def should_exclude_file(file_path: Path, project_root: Path) -> bool:
+    """
+    Determine if a file should be excluded from analysis.
+    
+    Args:
+        file_path: Path to the file
+        project_root: Root directory of the project
+        
+    Returns:
+        True if file should be excluded, False otherwise
+    """
+    relative_path = file_path.relative_to(project_root)
+    path_parts = relative_path.parts
+
+    # Excluded directories (.dist, dot dirs, tests, top-level asset folders)
+    for depth, part in enumerate(path_parts[:-1]):
+        if is_excluded_dir(part, depth):
+            return True
+
+    # Exclude dot-prefixed files
+    if path_parts[-1].startswith('.'):
+        return True
+    
+    # Exclude specific test files by name pattern
+    filename = file_path.name.lower()
+    if any(indicator in filename for indicator in ['test_', '_test', 'spec_', '_spec']):
+        return True
+    
+    # Exclude development/tooling files in project root
+    if len(path_parts) == 1:  # Files in project root
+        filename = file_path.name.lower()
+        if filename in ['.test.lua', 'test.lua', '.test.ps1', 'test.ps1', '.test.bat', 'test.bat']:
+            return True
+    
+    # Exclude factorio.emmy.lua (type definitions, not production code)
+    if filename == 'factorio.emmy.lua':
+        return True
+    
+    return False
+
+
+def iter_lua_files(project_root: Path) -> Iterator[Path]:
+    """
+    Yield the shipped Lua files under project_root in sorted path order.
+    Excluded directories (.git, .dist, tests, graphics, ...) are pruned before
+    descending, so their size does not affect the scan.
+    """
+    root = str(project_root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel = os.path.relpath(dirpath, root)
+        depth = 0 if rel == '.' else rel.count(os.sep) + 1
+        dirnames[:] = sorted(d for d in dirnames if not is_excluded_dir(d, depth))
+        for filename in sorted(filenames):
+            if filename.endswith('.lua'):
+                lua_file = Path(dirpath, filename)
+                if not should_exclude_file(lua_file, project_root):
+                    yield lua_file
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Single-pass tokenizer for Lua 5.2 / Factorio Lua source.
+Used by the .scripts analysis tools that need to see Lua code, strings and
+comments the way the Lua compiler does (not line-by-line text heuristics).
+
+tokenize() yields Token(kind, text, line, end_line) with the exact source text
+of each token; whitespace is skipped but line numbers stay exact, including
+for multi-line strings and --[==[ long comments ]==]. functions() builds on it
+to find every function definition and the line span of its body.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterator, List, NamedTuple
+
+NAME = "name"
+KEYWORD = "keyword"
+NUMBER = "number"
+STRING = "string"  # "..." or '...'
+LONG_STRING = "long_string"  # [[...]] / [==[...]==]
+COMMENT = "comment"  # -- to end of line
+LONG_COMMENT = "long_comment"  # --[[...]] / --[==[...]==]
+OP = "op"
+ERROR = "error"  # a character Lua would reject; kept so callers can report it
+
+KEYWORDS = frozenset(
+    (
+        "and break do else elseif end false for function goto if in local nil not or "
+        "repeat return then true until while"
+    ).split()
+)
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str  # exact source text, including quotes/brackets/comment dashes
+    line: int  # 1-based line of the first character
+    end_line: int  # 1-based line of the last character
+
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>[ \t\r\n\f\v]+)
+  | (?P<comment>--(?!\[=*\[)[^\n]*)
+  | (?P<long_open>(?:--)?\[(?P<eq>=*)\[)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<number>
+        0[xX](?:[0-9a-fA-F]*\.?[0-9a-fA-F]*)(?:[pP][+-]?[0-9]+)?
+      | (?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?
+    )
+  | (?P<string>
+        "(?:\\z\s*|\\[\s\S]|[^"\\\n])*"?
+      | '(?:\\z\s*|\\[\s\S]|[^'\\\n])*'?
+    )
+  | (?P<op>\.\.\.|\.\.|==|~=|<=|>=|::|//|<<|>>|[-+*/%^\#&~|<>=(){}\[\];:,.])
+    """,
+    re.VERBOSE,
+)
+
+
+def tokenize(source: str, comments: bool = True) -> Iterator[Token]:
+    """
+    Yield tokens for ``source`` in order.
+
+    Unterminated strings/long brackets run to end of line/file instead of raising,
+    so a half-edited file still produces a usable token stream.
+    """
+    pos = 0
+    line = 1
+    end = len(source)
+    match = _TOKEN_RE.match
+    count_nl = source.count
+    if source.startswith("#"):
+        # Shebang line (Lua skips it)
+        pos = source.find("\n")
+        if pos < 0:
+            return
+    while pos < end:
+        m = match(source, pos)
+        if m is None:
+            yield Token(ERROR, source[pos], line, line)
+            pos += 1
+            continue
+        kind = m.lastgroup
+        start = pos
+        pos = m.end()
+        if kind == "ws":
+            line += count_nl("\n", start, pos)
+            continue
+        if kind == "long_open":
+            close = "]" + m.group("eq") + "]"
+            stop = source.find(close, pos)
+            pos = end if stop < 0 else stop + len(close)
+            text = source[start:pos]
+            end_line = line + text.count("\n")
+            is_comment = text.startswith("--")
+            if comments or not is_comment:
+                yield Token(LONG_COMMENT if is_comment else LONG_STRING, text, line, end_line)
+            line = end_line
+            continue
+        text = m.group()
+        if kind == "comment":
+            if comments:
+                yield Token(COMMENT, text, line, line)
+            continue
+        if kind == "name" and text in KEYWORDS:
+            kind = KEYWORD
+        if kind == "string":
+            nl = text.count("\n")
+            yield Token(STRING, text, line, line + nl)
+            line += nl
+            continue
+        yield Token(kind, text, line, line)
+
+
+_ESCAPES = {"a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+_ESCAPE_RE = re.compile(r"\\(z\s*|x[0-9a-fA-F]{2}|u\{[0-9a-fA-F]+\}|[0-9]{1,3}|\r\n|[\s\S])")
+
+
+def _unescape(m: "re.Match[str]") -> str:
+    esc = m.group(1)
+    c = esc[0]
+    if c == "z":
+        return ""
+    if c == "x":
+        return chr(int(esc[1:], 16))
+    if c == "u":
+        return chr(int(esc[2:-1], 16))
+    if c.isdigit():
+        return chr(int(esc))
+    if esc in ("\n", "\r", "\r\n"):
+        return "\n"
+    return _ESCAPES.get(c, c)
+
+
+def string_value(tok: Token) -> str:
+    """Decoded contents of a STRING or LONG_STRING token."""
+    text = tok.text
+    if tok.kind == LONG_STRING:
+        level = text.index("[", 1) + 1  # "[" + "="*n + "[" is also the close length
+        close = "]" + text[1 : level - 1] + "]"
+        terminated = len(text) >= 2 * level and text.endswith(close)
+        body = text[level : len(text) - level] if terminated else text[level:]
+        # A newline right after the opening bracket is not part of the string
+        if body.startswith("\r\n"):
+            return body[2:]
+        if body.startswith("\n"):
+            return body[1:]
+        return body
+    quote = text[0]
+    body = text[1:-1] if len(text) > 1 and text.endswith(quote) else text[1:]
+    if "\\" not in body:
+        return body
+    return _ESCAPE_RE.sub(_unescape, body)
+
+
+class FunctionSpan(NamedTuple):
+    name: str  # "M.f", "Cache:get", "local f", or "<anonymous>"
+    line: int  # line of the `function` keyword
+    end_line: int  # line of the matching `end`
+    depth: int  # 0 = not nested inside another function
+
+
+# Keywords that open a block closed by `end` (for/while open theirs with `do`).
+_BLOCK_OPENERS = frozenset(("function", "if", "do"))
+
+
+def _function_name(tokens: List[Token], i: int) -> str:
+    """Name for the `function` keyword at tokens[i]."""
+    j = i + 1
+    parts: List[str] = []
+    while j < len(tokens) and (tokens[j].kind == NAME or tokens[j].text in (".", ":")):
+        parts.append(tokens[j].text)
+        j += 1
+    if parts:
+        local = i > 0 and tokens[i - 1].text == "local"
+        return ("local " if local else "") + "".join(parts)
+    # `target = function(...)`: name the function after the assignment target
+    if i >= 2 and tokens[i - 1].text == "=":
+        k = i - 2
+        while k >= 2 and tokens[k - 1].text in (".", ":") and tokens[k - 2].kind == NAME:
+            k -= 2
+        if tokens[i - 2].kind == NAME:
+            return "".join(t.text for t in tokens[k : i - 1])
+        if tokens[i - 2].text == "]" and i >= 4 and tokens[i - 3].kind == STRING:
+            return f"[{tokens[i - 3].text}]"
+    return "<anonymous>"
+
+
+def functions(source: str) -> List[FunctionSpan]:
+    """Every function in ``source`` with its line span, in source order."""
+    tokens = [t for t in tokenize(source, comments=False) if t.kind != ERROR]
+    # Open blocks: index into spans for function blocks, -1 for other blocks
+    stack: List[int] = []
+    spans: List[FunctionSpan] = []
+    depth = 0
+    for i, tok in enumerate(tokens):
+        if tok.kind == KEYWORD:
+            text = tok.text
+            if text in _BLOCK_OPENERS or text == "repeat":
+                if text == "function":
+                    spans.append(FunctionSpan(_function_name(tokens, i), tok.line, tok.line, depth))
+                    stack.append(len(spans) - 1)
+                    depth += 1
+                else:
+                    stack.append(-1)
+            elif (text == "end" or text == "until") and stack:
+                idx = stack.pop()
+                if idx >= 0:
+                    depth -= 1
+                    spans[idx] = spans[idx]._replace(end_line=tok.line)
+    return spans
@@ -0,0 +1,641 @@
+#!/usr/bin/env python3
+"""
+Static module index over the mod's Lua files, for the .scripts tools that
+follow code across require() boundaries (ups_lint.py, ...).
+
+ModuleIndex loads modules on demand (resolved like _lua_files.resolve_module)
+and resolves dotted names ("Cache.Lookups.sweep_expired_entries") to the
+function definitions or constants they refer to, following the
+patterns this mod uses:
+
+  local X = require("a.b")                    module alias
+  local A, B = Deps.A, Deps.B                 field alias (deps barrel)
+  local T = { k = local_fn }                  table of locals
+  M.K = require("c") / M.K = Alias            sub-module field
+  return M / return { K = V }                 module exports
+  require("x")(M, helpers) / ext(M, helpers)  extender module: `return function(M, helpers)`
+
+Resolution is best effort: values passed as parameters, stored at runtime or
+reached through metatables are not followed.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _lua_files import REPO_ROOT, resolve_module  # noqa: E402
+from _lua_lexer import (  # noqa: E402
+    ERROR,
+    KEYWORD,
+    LONG_STRING,
+    NAME,
+    NUMBER,
+    OP,
+    STRING,
+    Token,
+    functions,
+    string_value,
+    tokenize,
+)
+
+# ("module", "a.b") | ("path", ["X", "k"]) | ("number", 1.0) | ("string", "s")
+# | ("table", {key: binding})
+Binding = Tuple[str, object]
+
+# Keywords that start a statement (so they end the expression before them)
+_STATEMENT_KEYWORDS = frozenset(
+    "break do else elseif end for goto if local repeat return until while".split()
+)
+
+
+class FuncDef(NamedTuple):
+    rel: str  # repo-relative file
+    name: str  # FunctionSpan name: "M.f", "Cache:get", "local f", "<anonymous>"
+    line: int
+    end_line: int
+    start: int  # token index of the `function` keyword
+    end: int  # token index of its `end`
+    params: Tuple[str, ...]
+
+
+class Call(NamedTuple):
+    parts: Tuple[str, ...]  # callee name chain; a method call keeps its object: ("obj", "m")
+    index: int  # token index of the first name
+    line: int
+
+
+def normalize(name: str) -> str:
+    """FunctionSpan name as a lookup key: "local f" -> "f", "M:f" -> "M.f"."""
+    if name.startswith("local "):
+        name = name[6:]
+    return name.replace(":", ".")
+
+
+def _is(tok: Token, kind: str, text: str) -> bool:
+    return tok.kind == kind and tok.text == text
+
+
+def _ends_expression(tok: Token) -> bool:
+    """Can ``tok`` be the last token of an expression?"""
+    if tok.kind in (NAME, NUMBER, STRING, LONG_STRING):
+        return True
+    if tok.kind == KEYWORD:
+        return tok.text in ("end", "nil", "true", "false")
+    return tok.kind == OP and tok.text in (")", "]", "}", "...")
+
+
+class LuaModule:
+    """One parsed file: tokens, function definitions and top-level bindings."""
+
+    def __init__(self, rel: str, source: str) -> None:
+        self.rel = rel
+        self.lines = source.split("\n")
+        self.tokens = [t for t in tokenize(source, comments=False) if t.kind != ERROR]
+        self.funcs: List[FuncDef] = []
+        self.by_start: Dict[int, FuncDef] = {}
+        self.by_name: Dict[str, List[FuncDef]] = {}
+        self.bindings: Dict[str, Binding] = {}
+        self.export: Optional[Binding] = None
+        self.extender_params: Optional[Tuple[str, ...]] = None  # `return function(...)`
+        self.extender_calls: List[Tuple[str, List[str]]] = []  # (module name, argument names)
+        self._parse(source)
+
+    # -- parsing --------------------------------------------------------------
+
+    def _parse(self, source: str) -> None:
+        tokens = self.tokens
+        spans = iter(functions(source))
+        stack: List[int] = []  # start index of open function blocks, -1 for other blocks
+        for i, tok in enumerate(tokens):
+            if tok.kind == KEYWORD:
+                text = tok.text
+                if text == "function":
+                    stack.append(i)
+                    span = next(spans)
+                    params = self._params(i)
+                    fd = FuncDef(self.rel, span.name, span.line, span.end_line, i, i, params)
+                    self.funcs.append(fd)
+                elif text in ("if", "do", "repeat"):
+                    stack.append(-1)
+                elif text in ("end", "until") and stack:
+                    start = stack.pop()
+                    if start >= 0:
+                        for k in range(len(self.funcs) - 1, -1, -1):
+                            if self.funcs[k].start == start:
+                                self.funcs[k] = self.funcs[k]._replace(end=i)
+                                break
+                elif text == "local" and (not stack or self._is_require_at(i + 3)):
+                    self._parse_local(i)
+                elif text == "return" and not stack:
+                    self._parse_return(i)
+            elif tok.kind == NAME and not stack:
+                self._parse_statement(i)
+        for fd in self.funcs:
+            self.by_start[fd.start] = fd
+            if fd.name != "<anonymous>":
+                self.by_name.setdefault(normalize(fd.name), []).append(fd)
+
+    def _params(self, i: int) -> Tuple[str, ...]:
+        tokens = self.tokens
+        j = i + 1
+        while j < len(tokens) and not _is(tokens[j], OP, "("):
+            j += 1
+        params = []
+        j += 1
+        while j < len(tokens) and not _is(tokens[j], OP, ")"):
+            if tokens[j].kind == NAME:
+                params.append(tokens[j].text)
+            j += 1
+        return tuple(params)
+
+    def _is_require_at(self, i: int) -> bool:
+        return i < len(self.tokens) and _is(self.tokens[i], NAME, "require")
+
+    def chain(self, i: int) -> Tuple[List[str], int]:
+        """NAME(.NAME)* starting at tokens[i]: (parts, index after the chain)."""
+        tokens = self.tokens
+        parts = [tokens[i].text]
+        j = i + 1
+        while j + 1 < len(tokens) and _is(tokens[j], OP, ".") and tokens[j + 1].kind == NAME:
+            parts.append(tokens[j + 1].text)
+            j += 2
+        return parts, j
+
+    def _value(self, i: int) -> Tuple[Optional[Binding], int]:
+        """Parse a simple expression at tokens[i]: (binding or None, index after it)."""
+        tokens = self.tokens
+        if i >= len(tokens):
+            return None, i
+        tok = tokens[i]
+        if tok.kind == NUMBER or (
+            _is(tok, OP, "-") and i + 1 < len(tokens) and tokens[i + 1].kind == NUMBER
+        ):
+            neg = tok.kind == OP
+            text = (tokens[i + 1] if neg else tok).text.lower()
+            try:
+                value = float(int(text, 16)) if text.startswith("0x") else float(text)
+            except ValueError:
+                return None, i + 1
+            return ("number", -value if neg else value), i + (2 if neg else 1)
+        if _is(tok, NAME, "require"):
+            j = i + 1
+            paren = j < len(tokens) and _is(tokens[j], OP, "(")
+            if paren:
+                j += 1
+            if j < len(tokens) and tokens[j].kind in (STRING, LONG_STRING):
+                name = string_value(tokens[j])
+                j += 1
+                if paren and j < len(tokens) and _is(tokens[j], OP, ")"):
+                    j += 1
+                elif paren:
+                    return None, j
+                if j < len(tokens) and tokens[j].kind == OP and tokens[j].text in ("(", ".", ":"):
+                    return None, j
+                return ("module", name), j
+            return None, j
+        if tok.kind in (STRING, LONG_STRING):
+            nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+            if nxt is not None and nxt.kind == OP and nxt.text not in (",", ";", "}", ")"):
+                return None, i + 1
+            return ("string", string_value(tok)), i + 1
+        if tok.kind == NAME:
+            parts, j = self.chain(i)
+            nxt = tokens[j] if j < len(tokens) else None
+            if nxt is not None:
+                if nxt.kind == OP and nxt.text not in (",", ";", "}", ")"):
+                    return None, j
+                if nxt.kind in (STRING, LONG_STRING) or _is(nxt, KEYWORD, "and") or _is(
+                    nxt, KEYWORD, "or"
+                ):
+                    return None, j
+            return ("path", parts), j
+        if _is(tok, OP, "{"):
+            return self._table(i)
+        return None, i + 1
+
+    def _table(self, i: int) -> Tuple[Binding, int]:
+        """Table constructor at tokens[i] ("{"): the ``key = simple value`` fields."""
+        tokens = self.tokens
+        fields: Dict[str, Binding] = {}
+        j = i + 1
+        while j < len(tokens) and not _is(tokens[j], OP, "}"):
+            if (
+                tokens[j].kind == NAME
+                and j + 1 < len(tokens)
+                and _is(tokens[j + 1], OP, "=")
+            ):
+                value, k = self._value(j + 2)
+                if value is not None and k < len(tokens) and tokens[k].text in (",", ";", "}"):
+                    fields[tokens[j].text] = value
+                    j = k
+            # Skip the rest of this field
+            depth = 0
+            while j < len(tokens):
+                text = tokens[j].text if tokens[j].kind == OP else ""
+                if text in ("{", "(", "["):
+                    depth += 1
+                elif text in ("}", ")", "]"):
+                    if depth == 0:
+                        break
+                    depth -= 1
+                elif text in (",", ";") and depth == 0:
+                    j += 1
+                    break
+                j += 1
+        return ("table", fields), j + 1
+
+    def _parse_local(self, i: int) -> None:
+        tokens = self.tokens
+        j = i + 1
+        if j < len(tokens) and _is(tokens[j], KEYWORD, "function"):
+            return
+        names = []
+        while j < len(tokens) and tokens[j].kind == NAME:
+            names.append(tokens[j].text)
+            j += 1
+            if j < len(tokens) and _is(tokens[j], OP, "<"):  # <const> / <close>
+                j += 3
+            if j < len(tokens) and _is(tokens[j], OP, ","):
+                j += 1
+            else:
+                break
+        if not names or j >= len(tokens) or not _is(tokens[j], OP, "="):
+            return
+        j += 1
+        for name in names:
+            value, j = self._value(j)
+            if value is not None:
+                self.bindings.setdefault(name, value)
+            if j < len(tokens) and _is(tokens[j], OP, ","):
+                j += 1
+            else:
+                break
+
+    def _parse_return(self, i: int) -> None:
+        tokens = self.tokens
+        if i + 1 < len(tokens) and _is(tokens[i + 1], KEYWORD, "function"):
+            self.extender_params = self._params(i + 1)
+            return
+        value, _ = self._value(i + 1)
+        if value is not None:
+            self.export = value
+
+    def _parse_statement(self, i: int) -> None:
+        """Top-level ``a.b = value`` and extender calls ``ext(M, ...)``."""
+        tokens = self.tokens
+        if i > 0 and tokens[i - 1].kind == OP and tokens[i - 1].text in (".", ":", ",", "="):
+            return
+        if i > 0 and (_is(tokens[i - 1], KEYWORD, "local") or
+                      _is(tokens[i - 1], KEYWORD, "function")):
+            return
+        if tokens[i].text == "require":
+            value, j = self._value(i)
+            module = None
+            if j < len(tokens) and _is(tokens[j], OP, "("):
+                # require("x")(...): _value stops before the call
+                k = i + 1
+                if _is(tokens[k], OP, "("):
+                    k += 1
+                if tokens[k].kind in (STRING, LONG_STRING):
+                    module = string_value(tokens[k])
+            if module is not None:
+                self._parse_extender_call(module, j)
+            return
+        parts, j = self.chain(i)
+        if j >= len(tokens):
+            return
+        nxt = tokens[j]
+        if _is(nxt, OP, "=") and len(parts) > 1:
+            value, _ = self._value(j + 1)
+            if value is not None:
+                self.bindings[".".join(parts)] = value
+        elif _is(nxt, OP, "(") and len(parts) == 1:
+            target = self.bindings.get(parts[0])
+            if target is not None and target[0] == "module":
+                self._parse_extender_call(str(target[1]), j)
+
+    def _parse_extender_call(self, module: str, j: int) -> None:
+        """Arguments of ``ext(a, b)`` at tokens[j] ("("), if they are all plain names."""
+        tokens = self.tokens
+        args = []
+        j += 1
+        while j < len(tokens) and tokens[j].kind == NAME:
+            args.append(tokens[j].text)
+            j += 1
+            if j < len(tokens) and _is(tokens[j], OP, ","):
+                j += 1
+        if args and j < len(tokens) and _is(tokens[j], OP, ")"):
+            self.extender_calls.append((module, args))
+
+    # -- queries --------------------------------------------------------------
+
+    def source_line(self, line: int) -> str:
+        return self.lines[line - 1].strip() if 0 < line <= len(self.lines) else ""
+
+    def calls(self, fd: FuncDef, nested: bool = False) -> List[Call]:
+        """
+        Calls made in ``fd``'s body (not in nested functions unless ``nested``).
+        pcall/xpcall(f, ...) also counts as a call of ``f``.
+        """
+        found: List[Call] = []
+        for i in self.body_indices(fd, nested):
+            call = self.call_at(i)
+            if call is not None:
+                found.append(call)
+        return found
+
+    def body_indices(self, fd: FuncDef, nested: bool = False) -> List[int]:
+        """Token indices of ``fd``'s body, skipping nested function bodies unless ``nested``."""
+        indices = []
+        i = fd.start + 1
+        while i < fd.end:
+            inner = self.by_start.get(i)
+            if inner is not None and not nested:
+                indices.append(i)  # the `function` keyword itself (closure creation)
+                i = inner.end + 1
+                continue
+            indices.append(i)
+            i += 1
+        return indices
+
+    def call_at(self, i: int) -> Optional[Call]:
+        """The call whose callee name chain starts at tokens[i], if any."""
+        tokens = self.tokens
+        tok = tokens[i]
+        if tok.kind != NAME:
+            return None
+        if i > 0:
+            prev = tokens[i - 1]
+            if prev.kind == OP and prev.text in (".", ":"):
+                return None
+            if _is(prev, KEYWORD, "function"):
+                return None
+        parts = [tok.text]
+        j = i + 1
+        while j + 1 < len(tokens) and tokens[j].kind == OP and tokens[j].text in (".", ":"):
+            if tokens[j + 1].kind != NAME:
+                break
+            parts.append(tokens[j + 1].text)
+            j += 2
+            if tokens[j - 2].text == ":":
+                break
+        if j >= len(tokens):
+            return None
+        nxt = tokens[j]
+        if not (_is(nxt, OP, "(") or _is(nxt, OP, "{") or nxt.kind in (STRING, LONG_STRING)):
+            return None
+        if parts[0] in ("pcall", "xpcall") and len(parts) == 1 and _is(nxt, OP, "("):
+            if j + 1 < len(tokens) and tokens[j + 1].kind == NAME:
+                inner, k = self.chain(j + 1)
+                if k < len(tokens) and tokens[k].text in (",", ")"):
+                    return Call(tuple(inner), j + 1, tok.line)
+        return Call(tuple(parts), i, tok.line)
+
+    def enclosing(self, index: int) -> Optional[FuncDef]:
+        """Innermost function whose body contains token ``index``."""
+        best = None
+        for fd in self.funcs:
+            if fd.start < index < fd.end and (best is None or fd.start > best.start):
+                best = fd
+        return best
+
+    def split_args(self, open_index: int) -> List[Tuple[int, int]]:
+        """Token ranges [start, end) of the arguments of the call whose "(" is at open_index."""
+        tokens = self.tokens
+        args: List[Tuple[int, int]] = []
+        depth = 0
+        start = open_index + 1
+        i = start
+        while i < len(tokens):
+            tok = tokens[i]
+            if tok.kind == OP and tok.text in ("(", "{", "["):
+                depth += 1
+            elif _is(tok, KEYWORD, "function") and i in self.by_start:
+                i = self.by_start[i].end
+            elif tok.kind == OP and tok.text in (")", "}", "]"):
+                if depth == 0:
+                    if i > start or args:
+                        args.append((start, i))
+                    break
+                depth -= 1
+            elif _is(tok, OP, ",") and depth == 0:
+                args.append((start, i))
+                start = i + 1
+            i += 1
+        return args
+
+    def expr_end(self, i: int) -> int:
+        """Index just past the expression at tokens[i] (stops at , ; or a new statement)."""
+        tokens = self.tokens
+        depth = 0
+        prev: Optional[Token] = None
+        while i < len(tokens):
+            tok = tokens[i]
+            if _is(tok, KEYWORD, "function") and i in self.by_start:
+                if depth == 0 and prev is not None and _ends_expression(prev):
+                    return i
+                i = self.by_start[i].end
+                prev = tokens[i]
+                i += 1
+                continue
+            if tok.kind == OP and tok.text in ("(", "{", "["):
+                depth += 1
+            elif tok.kind == OP and tok.text in (")", "}", "]"):
+                if depth == 0:
+                    return i
+                depth -= 1
+            elif depth == 0:
+                if tok.kind == OP and tok.text in (",", ";"):
+                    return i
+                if tok.kind == KEYWORD and tok.text in _STATEMENT_KEYWORDS:
+                    return i
+                if tok.kind == NAME and prev is not None and _ends_expression(prev):
+                    return i
+            prev = tok
+            i += 1
+        return i
+
+    def is_param(self, name: str, use: int) -> bool:
+        """Is ``name`` a parameter of a function enclosing token ``use``?"""
+        return any(
+            name in fd.params for fd in self.funcs if fd.start < use < fd.end
+        )
+
+    def local_init(self, name: str, use: int) -> Optional[Tuple[int, int]]:
+        """Initializer range of the nearest ``local name = ...`` visible at token ``use``."""
+        tokens = self.tokens
+        for d in range(use - 1, -1, -1):
+            if not _is(tokens[d], KEYWORD, "local"):
+                continue
+            scope = self.enclosing(d)
+            if scope is not None and not scope.start < use < scope.end:
+                continue
+            names, j = [], d + 1
+            while j < len(tokens) and tokens[j].kind == NAME:
+                names.append(tokens[j].text)
+                j += 1
+                if j < len(tokens) and _is(tokens[j], OP, ","):
+                    j += 1
+                else:
+                    break
+            if name not in names:
+                continue
+            if j >= len(tokens) or not _is(tokens[j], OP, "="):
+                return None  # declared without a value
+            j += 1
+            for k in range(names.index(name) + 1):
+                end = self.expr_end(j)
+                if k == names.index(name):
+                    return (j, end)
+                if end >= len(tokens) or not _is(tokens[end], OP, ","):
+                    return None
+                j = end + 1
+        return None
+
+    def table_fields(self, start: int) -> List[Tuple[Union[int, str, Tuple[int, int]], int, int]]:
+        """
+        Fields of the table constructor at tokens[start] ("{") as (key, value start, value end):
+        key is the 1-based position, the field name, or the token range of a [key] expression.
+        """
+        tokens = self.tokens
+        fields: List[Tuple[Union[int, str, Tuple[int, int]], int, int]] = []
+        position = 0
+        j = start + 1
+        while j < len(tokens) and not _is(tokens[j], OP, "}"):
+            key: Union[int, str, Tuple[int, int]]
+            if tokens[j].kind == NAME and j + 1 < len(tokens) and _is(tokens[j + 1], OP, "="):
+                key, j = tokens[j].text, j + 2
+            elif _is(tokens[j], OP, "["):
+                close = self.expr_end(j + 1)
+                key, j = (j + 1, close), close + 2
+            else:
+                position += 1
+                key = position
+            end = self.expr_end(j)
+            fields.append((key, j, end))
+            j = end
+            if j < len(tokens) and tokens[j].text in (",", ";"):
+                j += 1
+        return fields
+
+
+Resolved = Union[FuncDef, float, str]
+
+
+class ModuleIndex:
+    """Lazily loaded LuaModules plus name resolution across them."""
+
+    def __init__(self, repo: Path = REPO_ROOT) -> None:
+        self.repo = repo
+        self.modules: Dict[str, Optional[LuaModule]] = {}
+        # extender rel -> (base module rel, {param: name in the base module})
+        self.extended_by: Dict[str, Tuple[str, Dict[str, str]]] = {}
+        # base rel -> [(extender rel, {param: name in the base module})]
+        self.extenders: Dict[str, List[Tuple[str, Dict[str, str]]]] = {}
+
+    def module(self, rel: str) -> Optional[LuaModule]:
+        if rel in self.modules:
+            return self.modules[rel]
+        path = self.repo / rel
+        try:
+            source = path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            self.modules[rel] = None
+            return None
+        mod = LuaModule(rel, source)
+        self.modules[rel] = mod
+        for name, args in mod.extender_calls:
+            ext = self.require(name)
+            if ext is None or ext.extender_params is None:
+                continue
+            mapping = dict(zip(ext.extender_params, args))
+            self.extended_by[ext.rel] = (rel, mapping)
+            self.extenders.setdefault(rel, []).append((ext.rel, mapping))
+        return mod
+
+    def require(self, name: str) -> Optional[LuaModule]:
+        rel = resolve_module(name)
+        return self.module(rel) if rel else None
+
+    def find_defs(self, mod: LuaModule, key: str) -> List[FuncDef]:
+        """Definitions named ``key`` in ``mod`` or in the extenders it applies."""
+        defs = list(mod.by_name.get(key, ()))
+        for ext_rel, mapping in self.extenders.get(mod.rel, ()):
+            ext = self.modules.get(ext_rel)
+            if ext is None:
+                continue
+            for param, arg in mapping.items():
+                if key == arg or key.startswith(arg + "."):
+                    defs.extend(ext.by_name.get(param + key[len(arg):], ()))
+        return defs
+
+    def resolve(self, mod: LuaModule, parts: List[str], depth: int = 0) -> List[Resolved]:
+        """Function definitions / constants a dotted name in ``mod`` refers to."""
+        if not parts or depth > 16:
+            return []
+        defs = self.find_defs(mod, ".".join(parts))
+        if defs:
+            return list(defs)
+        for n in range(len(parts), 0, -1):
+            binding = mod.bindings.get(".".join(parts[:n]))
+            if binding is not None:
+                found = self._follow(mod, binding, parts[n:], depth + 1)
+                if found:
+                    return found
+        base = self.extended_by.get(mod.rel)
+        if base is not None and parts[0] in base[1]:
+            base_mod = self.modules.get(base[0])
+            if base_mod is not None:
+                return self.resolve(base_mod, [base[1][parts[0]], *parts[1:]], depth + 1)
+        return []
+
+    def member(self, mod: LuaModule, parts: List[str], depth: int = 0) -> List[Resolved]:
+        """What ``require(mod)`` followed by ``.parts`` refers to."""
+        if not parts or mod.export is None:
+            return []
+        return self._follow(mod, mod.export, parts, depth + 1)
+
+    def _follow(
+        self, mod: LuaModule, binding: Binding, rest: List[str], depth: int
+    ) -> List[Resolved]:
+        kind, value = binding
+        if kind in ("number", "string"):
+            return [value] if not rest else []  # type: ignore[list-item]
+        if kind == "module":
+            target = self.require(str(value))
+            return self.member(target, rest, depth) if target is not None else []
+        if kind == "path":
+            return self.resolve(mod, [*value, *rest], depth)  # type: ignore[misc]
+        if kind == "table" and rest:
+            field = value.get(rest[0])  # type: ignore[union-attr]
+            return self._follow(mod, field, rest[1:], depth) if field is not None else []
+        return []
+
+    def resolve_call(self, mod: LuaModule, call: Call) -> List[FuncDef]:
+        return [r for r in self.resolve(mod, list(call.parts)) if isinstance(r, FuncDef)]
+
+    def reachable(self, start: List[FuncDef]) -> Dict[Tuple[str, int], FuncDef]:
+        """Every function reached from ``start`` through resolvable calls (closures included)."""
+        seen: Dict[Tuple[str, int], FuncDef] = {}
+        stack = list(start)
+        while stack:
+            fd = stack.pop()
+            key = (fd.rel, fd.start)
+            if key in seen:
+                continue
+            seen[key] = fd
+            mod = self.module(fd.rel)
+            if mod is None:
+                continue
+            for call in mod.calls(fd, nested=True):
+                stack.extend(self.resolve_call(mod, call))
+            for inner in mod.funcs:
+                if fd.start < inner.start < fd.end:
+                    seen.setdefault((inner.rel, inner.start), inner)
+        return seen
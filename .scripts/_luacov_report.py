@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Streaming parser for luacov's default text report (luacov.report.out).
+Shared by generate_coverage_summary.py and generate_formatted_coverage.py.
+
+Report layout (luacov DefaultReporter):
+
+    ==============================================================================
+    core/cache/cache.lua
+    ==============================================================================
+         3 local Cache = {}
+    *****0 local function unused()
+           -- comment / non-executable line
+    ...
+    ==============================================================================
+    Summary
+    ==============================================================================
+    <File / Hits / Missed / Coverage table>
+
+Each source line is prefixed by a right-aligned hit count ("*...0" when missed,
+blanks when not executable) of a fixed width for the whole report. The parser
+reads one line at a time and yields a FileCoverage per file section, so memory
+use does not grow with report size.
+
+luacov also writes luacov.report.out.index ("<name>:<start> <end>" byte ranges,
+one per file plus "Summary"). IndexedReport uses it to mmap the report and read
+a single file's section, or just the summary, without scanning the rest.
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+SEPARATOR = "=" * 78
+SUMMARY_NAME = "Summary"
+
+# Count field at the start of a source line: "   12 " (hit) or "*****0 " (missed).
+_COUNT_RE = re.compile(r" *(?:(\*+0)|([0-9]+))(?: |$)")
+
+
+class FileCoverage(NamedTuple):
+    name: str  # file name exactly as luacov printed it
+    covered: int  # executable lines hit at least once
+    missed: int  # executable lines never hit
+
+    @property
+    def total(self) -> int:
+        return self.covered + self.missed
+
+    @property
+    def coverage_pct(self) -> float:
+        return self.covered / self.total * 100 if self.total else 0.0
+
+
+class FileHits(NamedTuple):
+    name: str
+    hits: List[Optional[int]]  # per source line: hit count, or None if not executable
+    code: List[str]  # source text of each line, count field removed
+
+
+class _CountField:
+    """Reads the hit-count prefix of report lines; learns the report-wide width."""
+
+    __slots__ = ("width",)
+
+    def __init__(self) -> None:
+        self.width = 0
+
+    def hits(self, line: str) -> Optional[int]:
+        """Hit count of one source line (0 = missed), or None if not executable."""
+        m = _COUNT_RE.match(line)
+        if m is None:
+            return None
+        # All count fields share one width, so a non-executable line whose code
+        # happens to start with digits ("       10, 20,") is not mistaken for a hit.
+        end = m.end(1) if m.group(1) else m.end(2)
+        if self.width == 0:
+            self.width = end
+        elif end != self.width:
+            return None
+        return 0 if m.group(1) else int(m.group(2))
+
+
+def _iter_sections(lines: Iterable[str]) -> Iterator[Tuple[str, List[str]]]:
+    """(file name, source lines) per file section; stops at the Summary section."""
+    name: Optional[str] = None
+    body: List[str] = []
+    expect_name = False  # just saw an opening separator
+    in_header = False  # saw the file name, waiting for the closing separator
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if expect_name:
+            expect_name = False
+            if line == SUMMARY_NAME:
+                return
+            name = line
+            body = []
+            in_header = True
+            continue
+        if line[:1] == "=" and line == SEPARATOR:
+            if in_header:
+                in_header = False
+            else:
+                if name is not None:
+                    yield name, body
+                    name = None
+                expect_name = True
+            continue
+        if name is not None and not in_header:
+            body.append(line)
+
+    if name is not None and not in_header:
+        yield name, body
+
+
+def iter_file_coverage(lines: Iterable[str]) -> Iterator[FileCoverage]:
+    """
+    Yield one FileCoverage per file section of a luacov report, in report order.
+    Stops at the Summary section. Only one section is held in memory at a time.
+    """
+    field = _CountField()
+    for name, body in _iter_sections(lines):
+        covered = missed = 0
+        for line in body:
+            if not line:
+                continue
+            hits = field.hits(line)
+            if hits is None:
+                continue
+            if hits:
+                covered += 1
+            else:
+                missed += 1
+        yield FileCoverage(name, covered, missed)
+
+
+def iter_file_hits(lines: Iterable[str]) -> Iterator[FileHits]:
+    """Like iter_file_coverage, but keeps each line's hit count and source text."""
+    field = _CountField()
+    for name, body in _iter_sections(lines):
+        hits = [field.hits(line) if line else None for line in body]
+        cut = field.width + 1
+        code = [line[cut:] if field.width else line.lstrip() for line in body]
+        yield FileHits(name, hits, code)
+
+
+def read_report(path: Union[str, Path]) -> Iterator[FileCoverage]:
+    """Stream FileCoverage records from a report file on disk."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        yield from iter_file_coverage(f)
+
+
+def read_report_hits(path: Union[str, Path]) -> Iterator[FileHits]:
+    """Stream FileHits records from a report file on disk."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        yield from iter_file_hits(f)
+
+
+class SummaryRow(NamedTuple):
+    name: str  # file name, or "Total" for the last row
+    hits: int
+    missed: int
+    coverage_pct: float
+
+
+def parse_summary(lines: Iterable[str]) -> List[SummaryRow]:
+    """Rows of the Summary section's "File Hits Missed Coverage" table."""
+    rows: List[SummaryRow] = []
+    for raw in lines:
+        parts = raw.rstrip("\r\n").rsplit(None, 3)
+        if len(parts) != 4 or not parts[3].endswith("%"):
+            continue
+        name, hits, missed, pct = parts
+        if not (hits.isdigit() and missed.isdigit()):
+            continue  # header row
+        try:
+            rows.append(SummaryRow(name, int(hits), int(missed), float(pct[:-1])))
+        except ValueError:
+            continue
+    return rows
+
+
+# name -> (start, end) byte offsets into the report
+ReportIndex = Dict[str, Tuple[int, int]]
+
+
+def load_index(index_path: Union[str, Path]) -> ReportIndex:
+    """Parse luacov.report.out.index; names may contain ':' (Windows drives)."""
+    index: ReportIndex = {}
+    with open(index_path, "r", encoding="utf-8", errors="replace") as f:
+        for raw in f:
+            name, sep, span = raw.rstrip("\r\n").rpartition(":")
+            start, _, end = span.partition(" ")
+            if sep and start.isdigit() and end.isdigit():
+                index[name] = (int(start), int(end))
+    return index
+
+
+def _path_key(name: str) -> str:
+    return name.replace("\\", "/").lower()
+
+
+class IndexedReport:
+    """
+    Random access into luacov.report.out through its .index file.
+
+    Usage:
+        with IndexedReport.open(report_path) as report:
+            cov = report.file_coverage("core/cache/cache.lua")
+            rows = report.summary()
+
+    Every lookup reads only the requested byte range of the memory-mapped report.
+    If the index is missing or does not match the report (stale offsets), lookups
+    fall back to one streaming scan, so callers always get an answer.
+    """
+
+    def __init__(self, report_path: Path, index: Optional[ReportIndex]) -> None:
+        self.report_path = report_path
+        self.index = index
+        self._file = open(report_path, "rb")
+        size = self._file.seek(0, 2)
+        # mmap refuses empty files; an empty report has nothing to index anyway
+        self._map: Optional[mmap.mmap] = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        )
+        if index is not None and any(end > size or start > end for start, end in index.values()):
+            self.index = None
+
+    @classmethod
+    def open(
+        cls, report_path: Union[str, Path], index_path: Optional[Path] = None
+    ) -> "IndexedReport":
+        report_path = Path(report_path)
+        index_path = index_path or report_path.with_name(report_path.name + ".index")
+        try:
+            index: Optional[ReportIndex] = load_index(index_path)
+        except OSError:
+            index = None
+        return cls(report_path, index)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "IndexedReport":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def indexed(self) -> bool:
+        return self.index is not None
+
+    def names(self) -> List[str]:
+        """File names in the report (excluding Summary)."""
+        if self.index is not None:
+            return [name for name in self.index if name != SUMMARY_NAME]
+        return [cov.name for cov in read_report(self.report_path)]
+
+    def resolve(self, query: str) -> Optional[str]:
+        """
+        Report name for ``query``: exact match, else the unique name ending in
+        ``query`` with either path separator ("core/cache/cache.lua" finds
+        "..\\core\\cache\\cache.lua").
+        """
+        names = self.names()
+        if query in names:
+            return query
+        want = _path_key(query).lstrip("./")
+        hits = [n for n in names if _path_key(n) == want or _path_key(n).endswith("/" + want)]
+        return hits[0] if len(hits) == 1 else None
+
+    def section(self, name: str) -> Optional[str]:
+        """Raw text of one index entry (file section or Summary), or None."""
+        if self.index is None or self._map is None:
+            return None
+        span = self.index.get(name)
+        if span is None:
+            return None
+        text = self._map[span[0] : span[1]].decode("utf-8", errors="replace")
+        # Offsets that do not land on a section header mean the index is stale.
+        head = text.lstrip("\r\n")
+        if not (head.startswith(SEPARATOR) or head.startswith(name)):
+            self.index = None
+            return None
+        return text
+
+    def _section_lines(self, name: str) -> Optional[List[str]]:
+        """One file's section as report lines (header included), or None if not indexed."""
+        text = self.section(name)
+        if text is None:
+            return None
+        lines = text.lstrip("\r\n").splitlines()
+        if not lines or lines[0] != SEPARATOR:
+            lines = [SEPARATOR, name, SEPARATOR] + lines
+        return lines
+
+    def file_coverage(self, name: str) -> Optional[FileCoverage]:
+        lines = self._section_lines(name)
+        if lines is not None:
+            return next(iter_file_coverage(lines), None)
+        for cov in read_report(self.report_path):
+            if cov.name == name:
+                return cov
+        return None
+
+    def file_hits(self, name: str) -> Optional[FileHits]:
+        """Per-line hit counts of one file, read from its section only when indexed."""
+        lines = self._section_lines(name)
+        if lines is not None:
+            return next(iter_file_hits(lines), None)
+        for fh in read_report_hits(self.report_path):
+            if fh.name == name:
+                return fh
+        return None
+
+    def summary(self) -> List[SummaryRow]:
+        text = self.section(SUMMARY_NAME)
+        if text is not None:
+            return parse_summary(text.splitlines())
+        with open(self.report_path, "r", encoding="utf-8", errors="replace") as f:
+            in_summary = False
+            previous = ""
+            tail: List[str] = []
+            for raw in f:
+                line = raw.rstrip("\r\n")
+                if in_summary:
+                    tail.append(line)
+                elif previous == SEPARATOR and line == SUMMARY_NAME:
+                    in_summary = True
+                previous = line
+        return parse_summary(tail)
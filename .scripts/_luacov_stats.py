@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Coverage figures straight from luacov's raw stats file (luacov.stats.out),
+without rendering the annotated luacov.report.out first.
+
+Stats layout (luacov.stats.save), two lines per file:
+
+    <max line>:<file name as luacov saw it>
+    <hits line 1> <hits line 2> ... <hits line max>
+
+Hit counts alone do not say which lines are executable (a 0 can be a comment),
+so each Lua source is tokenized with _lua_lexer and classified the way luacov's
+line scanner does: blank/comment/string-continuation lines never count, lines
+that only hold block syntax (end, else, `local x`, function headers, closing
+brackets) count only when hit, and everything else counts as covered or missed.
+The classification is a close approximation of luacov's, so totals can differ
+from the text report by a few lines per file.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _lua_lexer import tokenize  # noqa: E402
+from _luacov_report import FileCoverage  # noqa: E402
+
+# Per-line classes returned by line_classes()
+NEVER = 0  # no code on the line
+IF_HIT = 1  # block syntax only; counted when hit, ignored when not
+EXECUTABLE = 2  # counted as covered or missed
+
+_STRUCTURAL = frozenset(
+    ("end", "else", "do", "then", "repeat", ")", "}", "]", "(", "{", "[", ",", ";")
+)
+
+# Resolves a luacov file name to the Lua source it was recorded from, or None.
+SourceResolver = Callable[[str], Optional[Path]]
+
+
+def read_stats(
+    path: Union[str, Path], want: Optional[Callable[[str], bool]] = None
+) -> Iterator[Tuple[str, List[int]]]:
+    """
+    Yield (file name, hits) per file; hits[i] is the count for line i + 1.
+    With ``want``, only files it accepts are decoded (the rest are skipped unparsed).
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for header in f:
+            header = header.rstrip("\r\n")
+            if not header:
+                continue
+            max_line, sep, name = header.partition(":")
+            counts = f.readline()
+            if not sep or not max_line.isdigit():
+                raise ValueError(f"{path}: malformed stats header {header!r}")
+            if want is None or want(name):
+                yield name, [int(c) for c in counts.split()]
+
+
+def merge_stats(paths: Iterable[Union[str, Path]]) -> Dict[str, List[int]]:
+    """Sum per-line hits over several stats files (e.g. one per parallel test shard)."""
+    merged: Dict[str, List[int]] = {}
+    for path in paths:
+        for name, hits in read_stats(path):
+            total = merged.get(name)
+            if total is None:
+                merged[name] = hits
+                continue
+            if len(hits) > len(total):
+                total.extend([0] * (len(hits) - len(total)))
+            for i, n in enumerate(hits):
+                total[i] += n
+    return merged
+
+
+def write_stats(path: Union[str, Path], stats: Dict[str, List[int]]) -> None:
+    """Write ``stats`` in luacov's format (files sorted by name), replacing ``path`` atomically."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            for name in sorted(stats):
+                hits = stats[name]
+                f.write(f"{len(hits)}:{name}\n")
+                f.write("".join(f"{n} " for n in hits))
+                f.write("\n")
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _line_class(tokens: List[str]) -> int:
+    if all(text in _STRUCTURAL for text in tokens):
+        return IF_HIT
+    first = tokens[0]
+    if first == "local" and len(tokens) > 1:
+        if tokens[1] == "function":
+            return IF_HIT if tokens[-1] == ")" else EXECUTABLE
+        # `local a, b` (optionally with <const>/<close> attribs) declares without running code
+        if "=" not in tokens:
+            return IF_HIT
+    if first == "function" and tokens[-1] == ")":
+        return IF_HIT
+    return EXECUTABLE
+
+
+def line_classes(source: str) -> List[int]:
+    """NEVER / IF_HIT / EXECUTABLE for each line of ``source`` (index 0 = line 1)."""
+    n_lines = source.count("\n") + 1
+    per_line: List[List[str]] = [[] for _ in range(n_lines + 1)]
+    for tok in tokenize(source, comments=False):
+        # A multi-line string belongs to its first line; the rest stay NEVER.
+        per_line[tok.line].append(tok.text)
+    return [_line_class(toks) if toks else NEVER for toks in per_line[1:]]
+
+
+def file_coverage(name: str, hits: List[int], source: str) -> FileCoverage:
+    covered = missed = 0
+    for i, cls in enumerate(line_classes(source)):
+        if cls == NEVER:
+            continue
+        if i < len(hits) and hits[i] > 0:
+            covered += 1
+        elif cls == EXECUTABLE:
+            missed += 1
+    return FileCoverage(name, covered, missed)
+
+
+def default_resolver(base_dir: Path, repo: Optional[Path] = None) -> SourceResolver:
+    """
+    Resolve luacov names the way the test runner produced them: relative to the
+    directory luacov ran in (where luacov.stats.out is written), absolute, or an
+    absolute path from another checkout ("...\\TeleportFavorites\\core\\x.lua").
+    """
+
+    def resolve(name: str) -> Optional[Path]:
+        norm = name.replace("\\", "/")
+        candidates = [base_dir / norm, Path(norm)]
+        if repo is not None and "TeleportFavorites/" in norm:
+            candidates.append(repo / norm.split("TeleportFavorites/", 1)[1])
+        for candidate in candidates:
+            if candidate.is_file():
+                return candidate
+        return None
+
+    return resolve
+
+
+def repo_rel_name(name: str, base_dir: Path, repo: Path) -> Optional[str]:
+    """
+    Repo-relative path of the file luacov recorded as ``name`` (resolved like
+    default_resolver), or None when it lies outside ``repo``. A file deleted since
+    the run is mapped from its name alone.
+    """
+    source = default_resolver(base_dir, repo)(name)
+    if source is None:
+        norm = name.replace("\\", "/")
+        if "TeleportFavorites/" in norm:
+            source = repo / norm.split("TeleportFavorites/", 1)[1]
+        else:
+            source = base_dir / norm
+    try:
+        return source.resolve().relative_to(repo.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+def coverage_from_stats(
+    stats_path: Union[str, Path],
+    resolve: Optional[SourceResolver] = None,
+    on_missing: Optional[Callable[[str], None]] = None,
+) -> Iterator[Tuple[Path, FileCoverage]]:
+    """
+    (source path, FileCoverage) per file in ``stats_path``, in stats-file order.
+    Files whose source cannot be found are skipped (reported through ``on_missing``).
+    """
+    stats_path = Path(stats_path)
+    if resolve is None:
+        resolve = default_resolver(stats_path.parent)
+    for name, hits in read_stats(stats_path):
+        source_path = resolve(name)
+        if source_path is None:
+            if on_missing is not None:
+                on_missing(name)
+            continue
+        source = source_path.read_text(encoding="utf-8", errors="replace")
+        yield source_path, file_coverage(name, hits, source)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Spec and test durations recorded by tests/infrastructure/run_all_tests.lua.
+
+Each run is one JSON object (format 1):
+
+    {"format": 1, "started_at": "2025-07-01T12:00:00Z", "clock": "cpu", "seconds": 4.2,
+     "specs": [{"spec": "specs/x_spec.lua", "seconds": 0.8, "passed": 5, "failed": 0,
+                "loaded": true,
+                "tests": [{"describe": "...", "test": "...", "seconds": 0.1,
+                           "passed": true}]}]}
+
+The latest run is tests/output/test_timings.json; every run is also appended to
+tests/output/test_timings_history.jsonl (one run per line). Durations are Lua
+os.clock() CPU seconds, which is what matters for balancing CPU-bound shards.
+
+With LuaCov active each spec also lists "covered_files": the luacov file names
+(relative to tests/) whose hit counts grew while it ran; select_tests.py uses
+them as the coverage half of its spec -> module map.
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Union
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+OUTPUT_DIR = _SCRIPT_DIR.parent / "tests" / "output"
+LATEST_PATH = OUTPUT_DIR / "test_timings.json"
+HISTORY_PATH = OUTPUT_DIR / "test_timings_history.jsonl"
+
+Run = Dict[str, Any]
+
+
+def load_run(path: Union[str, Path]) -> Run:
+    with open(path, "r", encoding="utf-8") as f:
+        run = json.load(f)
+    if not isinstance(run, dict) or "specs" not in run:
+        raise ValueError(f"{path}: not a test timing file")
+    return run
+
+
+def load_history(path: Union[str, Path] = HISTORY_PATH, last: int = 20) -> List[Run]:
+    """The most recent ``last`` runs, oldest first; unreadable lines are skipped."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = deque((line for line in f if line.strip()), maxlen=last)
+    except OSError:
+        return []
+    runs: List[Run] = []
+    for line in lines:
+        try:
+            run = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(run, dict) and "specs" in run:
+            runs.append(run)
+    return runs
+
+
+def append_history(run: Run, path: Union[str, Path] = HISTORY_PATH) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, separators=(",", ":")) + "\n")
+
+
+def merge_runs(runs: Iterable[Run]) -> Run:
+    """One run from several shard runs: specs concatenated, seconds summed (CPU time)."""
+    runs = list(runs)
+    specs = sorted((s for run in runs for s in run.get("specs", [])), key=lambda s: s["spec"])
+    return {
+        "format": 1,
+        "started_at": min((run.get("started_at", "") for run in runs), default=""),
+        "clock": "cpu",
+        "seconds": sum(run.get("seconds", 0.0) for run in runs),
+        "specs": specs,
+    }
+
+
+def spec_seconds(run: Run) -> Dict[str, float]:
+    return {s["spec"]: float(s.get("seconds", 0.0)) for s in run.get("specs", [])}
+
+
+def spec_durations(runs: Iterable[Run], last: int = 5) -> Dict[str, float]:
+    """Median duration per spec over its ``last`` most recent runs (``runs`` oldest first)."""
+    samples: Dict[str, deque] = {}
+    for run in runs:
+        for spec, seconds in spec_seconds(run).items():
+            samples.setdefault(spec, deque(maxlen=last)).append(seconds)
+    return {spec: statistics.median(values) for spec, values in samples.items()}
+
+
+def balance_shards(
+    specs: Iterable[str], count: int, weight: Callable[[str], float]
+) -> List[List[str]]:
+    """Longest-first greedy split: each spec goes to the currently lightest shard."""
+    specs = list(specs)
+    count = max(1, min(count, len(specs)))
+    shards: List[List[str]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for spec in sorted(specs, key=lambda s: (-weight(s), s)):
+        i = loads.index(min(loads))
+        shards[i].append(spec)
+        loads[i] += weight(spec)
+    return [sorted(shard) for shard in shards if shard]
+
+
+def duration_weight(
+    durations: Dict[str, float], size: Callable[[str], int]
+) -> Callable[[str], float]:
+    """
+    Weight = historical duration; specs never timed are estimated from their file
+    size at the median seconds-per-byte of the timed ones. With no durations at all
+    the weight is the plain byte count: fine for balancing, but not seconds.
+    """
+    rates = [durations[s] / size(s) for s in durations if size(s) > 0]
+    rate = statistics.median(rates) if rates else 1.0
+
+    def weight(spec: str) -> float:
+        known = durations.get(spec)
+        return known if known is not None else size(spec) * rate
+
+    return weight
@@ -3,19 +3,40 @@
 Lua Code Line Counter for TeleportFavorites Mod
 ===============================================
 Analyzes all *.lua files in the project (excluding tests) and provides:
-- Line count per file (excluding comments and blank lines)
+- Line count per file (excluding comments and blank lines), from the _lua_lexer
+  token stream, so long comments/strings and "--" or parens inside strings are exact
 - Files sorted from most to least lines
 - Totals per folder
 - Grand total across the project
 
-Usage: python .scripts/analyze_lua_lines.py
+Per-file results are cached in .scripts/.cache/lua_lines_cache.json, so only
+changed files are re-counted; --json prints the numbers for dashboards.
+
+Usage: python .scripts/analyze_lua_lines.py [--jobs N] [--no-cache] [--json]
 """
 
+import argparse
+import hashlib
+import json
 import os
-import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Tuple, NamedTuple
+from typing import Dict, List, Optional, Tuple, NamedTuple
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+import _lua_lexer  # noqa: E402
+from _file_cache import file_fingerprint  # noqa: E402
+from _lua_files import iter_lua_files  # noqa: E402
+from _lua_lexer import COMMENT, LONG_COMMENT, LONG_STRING, NAME, OP, STRING, Token, tokenize  # noqa: E402
+
+# Per-file results keyed by (size, mtime_ns, sha256); dropped when this script or the lexer change
+CACHE_PATH = _SCRIPT_DIR / ".cache" / "lua_lines_cache.json"
+CACHE_FORMAT = 1
 
 class FileAnalysis(NamedTuple):
     """Results of analyzing a single file."""
@@ -23,178 +44,227 @@ class FileAnalysis(NamedTuple):
     total_lines: int
     annotation_lines: int
     code_lines: int
+    error_log_lines: int = 0
 
-def is_annotation_line(line: str) -> bool:
-    """
-    Check if a line is an annotation (---@param, ---@return, etc.)
-    
-    Args:
-        line: The line to check
-        
-    Returns:
-        True if the line is an annotation, False otherwise
-    """
-    stripped = line.strip()
-    return stripped.startswith('---@')
+# Calls counted as error/log statements rather than code: any call whose last name
+# part is log/error (log(...), error(...), ErrorHandler.log(...)), plus these
+# (also when reached through a table, e.g. deps.PlayerHelpers.safe_player_print).
+ERROR_LOG_CALLS = frozenset((
+    'PlayerHelpers.safe_player_print',
+    'ErrorHandler.warn_log',
+    'ErrorHandler.debug_log',
+))
+ERROR_LOG_NAMES = frozenset(('log', 'error'))
+NOT_ERROR_LOG_CALLS = frozenset(('math.log',))
 
-def is_comment_or_blank_line(line: str) -> bool:
-    """
-    Determine if a line is a comment or blank line.
-    Excludes annotation comments (---@param, ---@return, etc.)
-    
-    Args:
-        line: The line to check
-        
-    Returns:
-        True if the line is a comment or blank, False otherwise
-    """
-    stripped = line.strip()
-    
-    # Blank line
-    if not stripped:
+def is_error_log_callee(callee: str, last: str) -> bool:
+    """True for log/error calls, also through a table (deps.PlayerHelpers.safe_player_print)."""
+    if any(callee == c or callee.endswith('.' + c) for c in ERROR_LOG_CALLS):
         return True
-    
-    # Check for annotations (keep these as code lines)
-    if stripped.startswith('---@'):
-        return False
-    
-    # Single line comment starting with --
-    if stripped.startswith('--'):
-        return True
-    
-    return False
+    return last in ERROR_LOG_NAMES and callee not in NOT_ERROR_LOG_CALLS
 
-def count_lua_lines_and_error_log_lines(file_path: Path) -> Tuple[int, int, int, int]:
+def read_lua_source(file_path: Path) -> Optional[str]:
     """
-    Count lines in a Lua file, separating annotations from regular code, and count error log statement lines (multi-line aware).
-    Returns (total_lines, annotation_lines, code_lines, error_log_lines)
+    Read a Lua file as UTF-8, falling back to latin-1.
+
+    Returns:
+        The file contents, or None if the file could not be read
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        return file_path.read_text(encoding='utf-8')
     except UnicodeDecodeError:
         try:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                lines = f.readlines()
+            return file_path.read_text(encoding='latin-1')
         except Exception as e:
-            print(f"Warning: Could not read {file_path}: {e}")
-            return 0, 0, 0, 0
+            print(f"Warning: Could not read {file_path}: {e}", file=sys.stderr)
+            return None
     except Exception as e:
-        print(f"Warning: Could not read {file_path}: {e}")
-        return 0, 0, 0, 0
+        print(f"Warning: Could not read {file_path}: {e}", file=sys.stderr)
+        return None
 
-    total_lines = 0
-    annotation_lines = 0
-    code_lines = 0
-    error_log_lines = 0
-    in_multiline_comment = False
-    in_error_log = False
-    error_log_paren_depth = 0
-    error_log_start_regex = re.compile(r'\b(log|error|PlayerHelpers\.safe_player_print|PlayerHelpers\.error|PlayerHelpers\.log|ErrorHandler\.warn_log|ErrorHandler\.debug_log)\s*\(')
-
-    for line in lines:
-        stripped = line.strip()
-
-        # Handle multi-line comments --[[ ... ]]
-        if '--[[' in stripped and not in_multiline_comment:
-            if stripped.startswith('---@') or (stripped.startswith('--[[') and '---@' in stripped):
-                if is_annotation_line(line):
-                    annotation_lines += 1
-                total_lines += 1
-                continue
-            else:
-                if ']]' in stripped and stripped.index(']]') > stripped.index('--[['):
-                    continue
-                else:
-                    in_multiline_comment = True
-                    continue
-
-        if in_multiline_comment:
-            if ']]' in stripped:
-                in_multiline_comment = False
-            continue
+def error_log_spans(tokens: List[Token]) -> List[Tuple[int, int]]:
+    """
+    Line spans (first, last) of error/log call statements, from the callee name to the
+    matching closing parenthesis. Parentheses inside strings and comments are not tokens,
+    so they cannot unbalance the match.
 
-        if is_annotation_line(line):
-            annotation_lines += 1
-            total_lines += 1
-            continue
+    Args:
+        tokens: Token stream without comments
 
-        if is_comment_or_blank_line(line):
+    Returns:
+        List of (first_line, last_line) tuples
+    """
+    spans = []
+    n = len(tokens)
+    i = 0
+    while i < n:
+        tok = tokens[i]
+        if tok.kind != NAME or i + 1 >= n:
+            i += 1
             continue
-
-        # Error log detection (multi-line aware)
-        if not in_error_log:
-            if error_log_start_regex.search(stripped):
-                in_error_log = True
-                error_log_paren_depth = stripped.count('(') - stripped.count(')')
-                error_log_lines += 1
-                total_lines += 1
-                if error_log_paren_depth <= 0:
-                    in_error_log = False
-                continue
-        else:
-            error_log_paren_depth += stripped.count('(') - stripped.count(')')
-            error_log_lines += 1
-            total_lines += 1
-            if error_log_paren_depth <= 0:
-                in_error_log = False
+        # Extend to a dotted callee: PlayerHelpers.safe_player_print, ErrorHandler:log
+        j = i
+        while j + 2 < n and tokens[j + 1].text in ('.', ':') and tokens[j + 2].kind == NAME:
+            j += 2
+        callee = ''.join(t.text for t in tokens[i:j + 1])
+        last = tokens[j].text
+        following = tokens[j + 1] if j + 1 < n else None
+        # f(...), f{...} and f"..." are all calls
+        is_call = following is not None and (
+            following.text in ('(', '{') or following.kind in (STRING, LONG_STRING)
+        )
+        defined = i > 0 and tokens[i - 1].text == 'function'
+        after_dot = i > 0 and tokens[i - 1].text in ('.', ':')
+        if not is_call or defined or after_dot or not is_error_log_callee(callee, last):
+            i = j + 1
             continue
+        end = j + 1
+        if tokens[end].text == '(':
+            depth = 0
+            while end < n:
+                text = tokens[end].text
+                if tokens[end].kind == OP and text == '(':
+                    depth += 1
+                elif tokens[end].kind == OP and text == ')':
+                    depth -= 1
+                    if depth == 0:
+                        break
+                end += 1
+            end = min(end, n - 1)
+        spans.append((tok.line, tokens[end].end_line))
+        i = end + 1
+    return spans
+
+def count_lines_in_source(source: str) -> Tuple[int, int, int, int]:
+    """
+    Classify every line of a Lua source using the _lua_lexer token stream.
+
+    A line is code if any non-comment token touches it (every line of a multi-line
+    string counts); an annotation if its only content is a ---@ comment; an error log
+    line if it is code inside an error/log call (see error_log_spans). Blank lines and
+    other comments, including --[==[ long comments ]==], are not counted.
+
+    Returns:
+        (total_lines, annotation_lines, code_lines, error_log_lines)
+    """
+    n_lines = source.count('\n') + 1
+    has_code = bytearray(n_lines + 2)
+    has_annotation = bytearray(n_lines + 2)
+    code_tokens = []
+    for tok in tokenize(source):
+        kind = tok.kind
+        if kind == COMMENT:
+            if tok.text.startswith('---@'):
+                has_annotation[tok.line] = 1
+        elif kind != LONG_COMMENT:
+            code_tokens.append(tok)
+            for line in range(tok.line, tok.end_line + 1):
+                has_code[line] = 1
 
-        total_lines += 1
-        code_lines += 1
+    in_error_log = bytearray(n_lines + 2)
+    for first, last in error_log_spans(code_tokens):
+        for line in range(first, last + 1):
+            in_error_log[line] = 1
 
+    annotation_lines = code_lines = error_log_lines = 0
+    for line in range(1, n_lines + 1):
+        if has_code[line]:
+            if in_error_log[line]:
+                error_log_lines += 1
+            else:
+                code_lines += 1
+        elif has_annotation[line]:
+            annotation_lines += 1
+    total_lines = annotation_lines + code_lines + error_log_lines
     return total_lines, annotation_lines, code_lines, error_log_lines
 
-def should_exclude_file(file_path: Path, project_root: Path) -> bool:
+def count_lua_lines_and_error_log_lines(file_path: Path) -> Tuple[int, int, int, int]:
     """
-    Determine if a file should be excluded from analysis.
-    
-    Args:
-        file_path: Path to the file
-        project_root: Root directory of the project
-        
-    Returns:
-        True if file should be excluded, False otherwise
+    Count lines in a Lua file, separating annotations from regular code, and count error log statement lines (multi-line aware).
+    Returns (total_lines, annotation_lines, code_lines, error_log_lines)
     """
-    relative_path = file_path.relative_to(project_root)
-    path_parts = relative_path.parts
+    source = read_lua_source(file_path)
+    if source is None:
+        return 0, 0, 0, 0
+    return count_lines_in_source(source)
 
-    # Exclude generated distribution tree explicitly.
-    if '.dist' in path_parts:
-        return True
+def counter_fingerprint() -> str:
+    """Hash of the cache format and the counting code; any edit invalidates cached results."""
+    h = hashlib.sha256(f"format={CACHE_FORMAT}".encode())
+    for src in (Path(__file__), Path(_lua_lexer.__file__)):
+        h.update(src.read_bytes())
+    return h.hexdigest()
 
-    # Exclude all dot-prefixed files/directories.
-    for part in path_parts:
-        if part.startswith('.'):
-            return True
-    
-    # Exclude test directories and files
-    test_indicators = ['test', 'tests', 'spec', 'specs']
-    
-    for part in path_parts:
-        if part.lower() in test_indicators:
-            return True
-    
-    # Exclude specific test files by name pattern
-    filename = file_path.name.lower()
-    if any(indicator in filename for indicator in ['test_', '_test', 'spec_', '_spec']):
-        return True
-    
-    # Exclude development/tooling files in project root
-    if len(path_parts) == 1:  # Files in project root
-        filename = file_path.name.lower()
-        if filename in ['.test.lua', 'test.lua', '.test.ps1', 'test.ps1', '.test.bat', 'test.bat']:
-            return True
-    
-    # Exclude factorio.emmy.lua (type definitions, not production code)
-    if filename == 'factorio.emmy.lua':
-        return True
-    
-    return False
+class LineCountCache:
+    """
+    Persistent per-file results of count_lua_lines_and_error_log_lines.
 
-def analyze_lua_files(project_root: str) -> Tuple[List[FileAnalysis], Dict[str, Tuple[int, int]], int, int, int]:
+    An unchanged file costs one stat call; a touched-but-identical file a read and
+    hash but no tokenizing. Entries for files no longer analyzed are evicted on save.
+    """
+
+    def __init__(self, cache_path: Path = CACHE_PATH):
+        self.cache_path = cache_path
+        self.fingerprint = counter_fingerprint()
+        # relative path -> [size, mtime_ns, sha256, [total, annotation, code, error_log]]
+        self.entries: Dict[str, list] = {}
+        self.seen = set()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open(cls, cache_path: Path = CACHE_PATH) -> "LineCountCache":
+        cache = cls(cache_path)
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        if isinstance(data, dict) and data.get('fingerprint') == cache.fingerprint:
+            cache.entries = data.get('files', {})
+        else:
+            cache.dirty = True
+        return cache
+
+    def lookup(self, key: str, path: Path) -> Tuple[Optional[Tuple[int, ...]], Tuple[int, int, str]]:
+        """(cached counts or None, current (size, mtime_ns, sha256)) for one file."""
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        fp = file_fingerprint(path, (entry[0], entry[1], entry[2]) if entry else None)
+        if entry is not None and entry[2] == fp[2]:
+            if (entry[0], entry[1]) != fp[:2]:
+                entry[0], entry[1] = fp[0], fp[1]
+                self.dirty = True
+            self.hits += 1
+            return tuple(entry[3]), fp
+        self.misses += 1
+        return None, fp
+
+    def store(self, key: str, fp: Tuple[int, int, str], counts: Tuple[int, int, int, int]) -> None:
+        self.entries[key] = [fp[0], fp[1], fp[2], list(counts)]
+        self.dirty = True
+
+    def save(self) -> None:
+        """Evict files not seen in this run, then write atomically if anything changed."""
+        for key in [k for k in self.entries if k not in self.seen]:
+            del self.entries[key]
+            self.dirty = True
+        if not self.dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        payload = {'fingerprint': self.fingerprint, 'files': self.entries}
+        tmp.write_text(json.dumps(payload, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp, self.cache_path)
+        self.dirty = False
+
+def analyze_lua_files(project_root: str, jobs: int = 1, cache: Optional[LineCountCache] = None) -> Tuple[List[FileAnalysis], Dict[str, Tuple[int, int]], int, int, int]:
     """
     Analyze all Lua files in the project, excluding error log statement lines from code lines, and count error log lines.
+    With jobs != 1, files are analyzed in a process pool (0 = one worker per CPU); results
+    are merged in path order, so the output is identical to a serial run.
+    With a cache, only files whose content changed are re-counted (the caller saves it).
     Returns (file_results, folder_totals, grand_total_lines, grand_total_annotations, grand_total_error_log_lines)
     """
     project_path = Path(project_root)
@@ -205,13 +275,31 @@ def analyze_lua_files(project_root: str) -> Tuple[List[FileAnalysis], Dict[str,
     grand_total_code_lines = 0
     grand_total_error_log_lines = 0
 
-    lua_files = list(project_path.rglob('*.lua'))
+    lua_files = list(iter_lua_files(project_path))
+    counts = [None] * len(lua_files)
+    fingerprints = {}
+    if cache is not None:
+        for i, lua_file in enumerate(lua_files):
+            key = lua_file.relative_to(project_path).as_posix()
+            try:
+                counts[i], fingerprints[i] = cache.lookup(key, lua_file)
+            except OSError:
+                pass  # unreadable: count_lua_lines_and_error_log_lines reports it
+    todo = [i for i, c in enumerate(counts) if c is None]
+    if jobs != 1 and len(todo) > 1:
+        workers = jobs if jobs > 0 else (os.cpu_count() or 1)
+        chunksize = max(1, len(todo) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            todo_files = [lua_files[i] for i in todo]
+            fresh = list(pool.map(count_lua_lines_and_error_log_lines, todo_files, chunksize=chunksize))
+    else:
+        fresh = [count_lua_lines_and_error_log_lines(lua_files[i]) for i in todo]
+    for i, result in zip(todo, fresh):
+        counts[i] = result
+        if cache is not None and i in fingerprints:
+            cache.store(lua_files[i].relative_to(project_path).as_posix(), fingerprints[i], result)
 
-    for lua_file in lua_files:
-        if should_exclude_file(lua_file, project_path):
-            continue
-
-        total_lines, annotation_lines, code_lines, error_log_lines = count_lua_lines_and_error_log_lines(lua_file)
+    for lua_file, (total_lines, annotation_lines, code_lines, error_log_lines) in zip(lua_files, counts):
 
         relative_path = lua_file.relative_to(project_path)
         relative_path_str = str(relative_path).replace('\\', '/')
@@ -220,7 +308,8 @@ def analyze_lua_files(project_root: str) -> Tuple[List[FileAnalysis], Dict[str,
             path=relative_path_str,
             total_lines=total_lines,
             annotation_lines=annotation_lines,
-            code_lines=code_lines
+            code_lines=code_lines,
+            error_log_lines=error_log_lines
         ))
 
         folder = relative_path.parent if relative_path.parent != Path('.') else Path('root')
@@ -233,8 +322,8 @@ def analyze_lua_files(project_root: str) -> Tuple[List[FileAnalysis], Dict[str,
         grand_total_code_lines += code_lines
         grand_total_error_log_lines += error_log_lines
 
-    file_results.sort(key=lambda x: x.total_lines, reverse=True)
-    folder_totals_dict = {k: (v[0], v[1]) for k, v in folder_totals.items()}
+    file_results.sort(key=lambda x: (-x.total_lines, x.path))
+    folder_totals_dict = {k: (v[0], v[1]) for k, v in sorted(folder_totals.items())}
 
     return file_results, folder_totals_dict, grand_total_lines, grand_total_annotations, grand_total_code_lines, grand_total_error_log_lines
 
@@ -281,17 +370,60 @@ def print_analysis_report(file_results: List[FileAnalysis],
 
 def main():
     """Main function to run the analysis."""
+    ap = argparse.ArgumentParser(description="Count Lua code, annotation and error log lines")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Analyze files in N worker processes (0 = CPU count; default: 1, serial)",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-count every file instead of using .scripts/.cache/lua_lines_cache.json",
+    )
+    ap.add_argument(
+        "--json",
+        action="store_true",
+        help="Print per-file, per-folder and total counts as JSON instead of the report",
+    )
+    args = ap.parse_args()
     script_dir = Path(__file__).parent
     project_root = str(script_dir.parent)
-    print(f"Analyzing Lua files in: {project_root}")
-    print("Excluding: comments and blank lines (but keeping annotations like ---@param)")
-    print("Excluding: dot paths (files/dirs), .dist, test files, and factorio.emmy.lua")
-    print()
+    if not args.json:
+        print(f"Analyzing Lua files in: {project_root}")
+        print("Excluding: comments and blank lines (but keeping annotations like ---@param)")
+        print("Excluding: dot paths (files/dirs), .dist, test files, and factorio.emmy.lua")
+        print()
     try:
-        file_results, folder_totals, grand_total_lines, grand_total_annotations, grand_total_code_lines, grand_total_error_log_lines = analyze_lua_files(project_root)
-        print_analysis_report(file_results, folder_totals, grand_total_lines, grand_total_annotations, grand_total_code_lines, grand_total_error_log_lines)
+        cache = None if args.no_cache else LineCountCache.open()
+        file_results, folder_totals, grand_total_lines, grand_total_annotations, grand_total_code_lines, grand_total_error_log_lines = analyze_lua_files(project_root, args.jobs, cache)
+        if cache is not None:
+            try:
+                cache.save()
+            except OSError as e:
+                print(f"Warning: could not save {cache.cache_path}: {e}", file=sys.stderr)
+        if args.json:
+            payload = {
+                "files": [f._asdict() for f in file_results],
+                "folders": {
+                    folder: {"total_lines": total, "annotation_lines": annotations}
+                    for folder, (total, annotations) in folder_totals.items()
+                },
+                "totals": {
+                    "files": len(file_results),
+                    "total_lines": grand_total_lines,
+                    "code_lines": grand_total_code_lines,
+                    "annotation_lines": grand_total_annotations,
+                    "error_log_lines": grand_total_error_log_lines,
+                },
+                "cache": None if cache is None else {"hits": cache.hits, "misses": cache.misses},
+            }
+            print(json.dumps(payload, indent=2))
+        else:
+            print_analysis_report(file_results, folder_totals, grand_total_lines, grand_total_annotations, grand_total_code_lines, grand_total_error_log_lines)
     except Exception as e:
-        print(f"Error during analysis: {e}")
+        print(f"Error during analysis: {e}", file=sys.stderr)
         return 1
     return 0
 
@@ -5,6 +5,19 @@ Audit locale strings.cfg files against locale/en/strings.cfg.
 Usage (from mod root):
   python .scripts/audit_locales.py
   python .scripts/audit_locales.py --quiet
+  python .scripts/audit_locales.py --no-cache
+  python .scripts/audit_locales.py --quiet --jobs 0
+  python .scripts/audit_locales.py --quiet --incremental
+  python .scripts/audit_locales.py --quiet --watch
+
+Parsed files are cached in .scripts/.cache/ (see _locale_cache.py). With
+--jobs, files that miss the cache are parsed and audited in a process pool;
+output order and exit codes are the same as the serial run. Files parsed in the
+pool are not added to the cache (a serial run fills it). With --incremental,
+per-locale results are kept in .scripts/.cache/locale_audit_state.json and only
+locales whose strings.cfg changed are re-audited (all of them if en changed).
+With --watch, locale/ is polled (one stat per file) until Ctrl+C; changed files
+are re-audited against the in-memory en key map and count deltas are printed.
 
 Exits with code 1 if any locale has MISSING, EXTRA, or MISPLACED keys
 (template_strings.cfg EMPTY values are allowed).
@@ -13,16 +26,362 @@ Exits with code 1 if any locale has MISSING, EXTRA, or MISPLACED keys
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 # Allow importing sibling _locale_parser when run as script
 _SCRIPT_DIR = Path(__file__).resolve().parent
 if str(_SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(_SCRIPT_DIR))
 
-from _locale_parser import load_parsed  # noqa: E402
+from _file_cache import Fingerprint, file_fingerprint  # noqa: E402
+from _locale_cache import DEFAULT_CACHE_PATH, ParseCache, parser_fingerprint  # noqa: E402
+from _locale_parser import (  # noqa: E402
+    ROOT_SECTION,
+    LineKind,
+    LineRecord,
+    iter_records,
+    key_sections,
+)
+
+
+class LocaleAudit(NamedTuple):
+    missing: List[str]
+    extra: List[str]
+    misplaced: List[Tuple[str, str]]  # (key, section in this file)
+    empty: List[str]
+
+    @property
+    def drift(self) -> bool:
+        return bool(self.missing or self.extra or self.misplaced)
+
+
+def audit_records(records: Iterable[LineRecord], en_key_section: Dict[str, str]) -> LocaleAudit:
+    """Compare one locale's records against the en key -> section map."""
+    # Single pass: key -> section map and empty values together.
+    loc_key_to_section: Dict[str, str] = {}
+    empty: List[str] = []
+    for rec in records:
+        if rec.kind == LineKind.ENTRY and rec.key and rec.value is not None:
+            loc_key_to_section[rec.key] = rec.section or ROOT_SECTION
+            if rec.value.strip() == "":
+                empty.append(rec.key)
+    en_keys = en_key_section.keys()
+    loc_keys = loc_key_to_section.keys()
+
+    misplaced: List[Tuple[str, str]] = []
+    for k in sorted(en_keys & loc_keys):
+        if en_key_section[k] != loc_key_to_section[k]:
+            misplaced.append((k, loc_key_to_section[k]))
+
+    return LocaleAudit(
+        missing=sorted(en_keys - loc_keys),
+        extra=sorted(loc_keys - en_keys),
+        misplaced=misplaced,
+        empty=empty,
+    )
+
+
+# Worker-process state, set once per worker by _init_worker.
+_WORKER_EN: Dict[str, str] = {}
+
+
+def _init_worker(en_key_section: Dict[str, str]) -> None:
+    global _WORKER_EN
+    _WORKER_EN = en_key_section
+
+
+def _audit_worker(path: Path) -> LocaleAudit:
+    # Only the small audit result crosses the process boundary: shipping the records
+    # back to fill the parse cache would cost about as much as parsing again.
+    return audit_records(iter_records(path), _WORKER_EN)
+
+
+def audit_paths(
+    paths: List[Path],
+    en_key_section: Dict[str, str],
+    cache: Optional[ParseCache],
+    jobs: int,
+) -> List[LocaleAudit]:
+    """Audit ``paths``; results are in input order regardless of ``jobs``."""
+    results: List[Optional[LocaleAudit]] = [None] * len(paths)
+    pending: List[int] = []
+    for i, path in enumerate(paths):
+        hit = cache.lookup(path) if cache is not None else None
+        if hit is not None:
+            results[i] = audit_records(hit, en_key_section)
+        else:
+            pending.append(i)
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(pending)),
+            initializer=_init_worker,
+            initargs=(en_key_section,),
+        ) as pool:
+            outcomes = pool.map(_audit_worker, [paths[i] for i in pending])
+            for i, result in zip(pending, outcomes):
+                results[i] = result
+    else:
+        for i in pending:
+            records = cache.records(paths[i]) if cache is not None else iter_records(paths[i])
+            results[i] = audit_records(records, en_key_section)
+
+    return [r for r in results if r is not None]
+
+
+AUDIT_STATE_PATH = DEFAULT_CACHE_PATH.with_name("locale_audit_state.json")
+
+
+def _tool_fingerprint() -> str:
+    """Stored results are only valid for the same parser and audit logic."""
+    h = hashlib.sha256(parser_fingerprint().encode())
+    h.update(Path(__file__).read_bytes())
+    return h.hexdigest()
+
+
+def load_audit_state(locale_root: Path, state_path: Path = AUDIT_STATE_PATH) -> Dict[str, Any]:
+    """Previous --incremental results for ``locale_root``, or {} if unusable."""
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if (
+        not isinstance(state, dict)
+        or state.get("tool") != _tool_fingerprint()
+        or state.get("locale_root") != str(locale_root.resolve())
+    ):
+        return {}
+    return state
+
+
+def save_audit_state(
+    locale_root: Path,
+    en_fp: Fingerprint,
+    en_key_section: Dict[str, str],
+    files: Dict[str, Tuple[Fingerprint, LocaleAudit]],
+    state_path: Path = AUDIT_STATE_PATH,
+) -> None:
+    state = {
+        "tool": _tool_fingerprint(),
+        "locale_root": str(locale_root.resolve()),
+        "en": {"fingerprint": list(en_fp), "key_section": en_key_section},
+        "files": {
+            key: {"fingerprint": list(fp), "result": result._asdict()}
+            for key, (fp, result) in files.items()
+        },
+    }
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_path.with_name(state_path.name + ".tmp")
+    tmp.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, state_path)
+
+
+def _stored_fingerprint(entry: Optional[Dict[str, Any]]) -> Optional[Fingerprint]:
+    if not entry:
+        return None
+    size, mtime_ns, digest = entry["fingerprint"]
+    return (size, mtime_ns, digest)
+
+
+def _stored_result(entry: Dict[str, Any]) -> LocaleAudit:
+    r = entry["result"]
+    return LocaleAudit(
+        missing=r["missing"],
+        extra=r["extra"],
+        misplaced=[(k, sec) for k, sec in r["misplaced"]],
+        empty=r["empty"],
+    )
+
+
+def print_audit(
+    rel: object,
+    result: LocaleAudit,
+    en_key_section: Dict[str, str],
+    quiet: bool,
+    is_template: bool,
+) -> None:
+    if quiet:
+        flag = "DRIFT" if result.drift else "OK"
+        print(
+            f"{rel}: MISSING={len(result.missing)} EXTRA={len(result.extra)} "
+            f"MISPLACED={len(result.misplaced)} EMPTY={len(result.empty)} [{flag}]"
+        )
+        return
+
+    print(f"=== {rel} ===")
+    if result.missing:
+        print("  MISSING:")
+        for k in result.missing:
+            print(f"    {k}  (en section: [{en_key_section.get(k, '?')}])")
+    if result.extra:
+        print("  EXTRA:")
+        for k in result.extra:
+            print(f"    {k}")
+    if result.misplaced:
+        print("  MISPLACED:")
+        for k, file_section in result.misplaced:
+            print(f"    {k}: en=[{en_key_section.get(k)}] file=[{file_section}]")
+    if result.empty:
+        print("  EMPTY:")
+        for k in result.empty:
+            print(f"    {k}")
+    if not result.drift and not result.empty:
+        print("  (no issues)")
+    elif not result.drift and is_template:
+        print("  (template: empty values expected for translators)")
+    print()
+
+
+def locale_paths(locale_root: Path) -> List[Path]:
+    """template_strings.cfg, then every non-en locale/<lang>/strings.cfg by name."""
+    paths: List[Path] = [locale_root / "template_strings.cfg"]
+    for d in sorted(locale_root.iterdir(), key=lambda p: p.name):
+        if not d.is_dir() or d.name == "en":
+            continue
+        p = d / "strings.cfg"
+        if p.is_file():
+            paths.append(p)
+    return paths
+
+
+# (size, mtime_ns) per watched file
+StatSnapshot = Dict[Path, Tuple[int, int]]
+Counts = Tuple[int, int, int, int]
+
+_COUNT_NAMES = ("MISSING", "EXTRA", "MISPLACED", "EMPTY")
+
+
+def stat_snapshot(paths: Iterable[Path]) -> StatSnapshot:
+    """One stat call per file; files that vanished mid-save are left out."""
+    snap: StatSnapshot = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        snap[path] = (st.st_size, st.st_mtime_ns)
+    return snap
+
+
+def _counts(result: LocaleAudit) -> Counts:
+    return (len(result.missing), len(result.extra), len(result.misplaced), len(result.empty))
+
+
+def _format_counts(counts: Counts, previous: Optional[Counts]) -> str:
+    parts = []
+    for i, name in enumerate(_COUNT_NAMES):
+        part = f"{name}={counts[i]}"
+        if previous is not None and counts[i] != previous[i]:
+            part += f"({counts[i] - previous[i]:+d})"
+        parts.append(part)
+    return " ".join(parts)
+
+
+def _totals(counts: Iterable[Counts]) -> Counts:
+    totals = [0, 0, 0, 0]
+    for c in counts:
+        for i, n in enumerate(c):
+            totals[i] += n
+    return (totals[0], totals[1], totals[2], totals[3])
+
+
+def watch(
+    locale_root: Path,
+    repo: Path,
+    cache: Optional[ParseCache],
+    jobs: int,
+    interval: float,
+    quiet: bool,
+) -> int:
+    """
+    Poll ``locale_root`` until interrupted, re-auditing only files whose stat changed.
+    The en key map stays in memory and is rebuilt only when en/strings.cfg changes.
+    Returns the exit code for the last audited state.
+    """
+    en_path = locale_root / "en" / "strings.cfg"
+
+    def rel_of(path: Path) -> object:
+        try:
+            return path.relative_to(repo)
+        except ValueError:
+            return path
+
+    en_stat: Optional[Tuple[int, int]] = None
+    en_key_section: Dict[str, str] = {}
+    snapshot: StatSnapshot = {}
+    counts: Dict[Path, Counts] = {}
+    drift: Dict[Path, bool] = {}
+    first = True  # until the first audit has been reported
+    polled = False
+    try:
+        while True:
+            # Sleep before every poll but the very first, including after a skipped one.
+            if polled:
+                time.sleep(interval)
+            polled = True
+            # Snapshot before auditing, so an edit made during the audit is seen next poll.
+            current = stat_snapshot(locale_paths(locale_root))
+            en_now = stat_snapshot([en_path]).get(en_path)
+            if en_now is None:
+                continue  # en is mid-save; try again next poll
+            en_changed = en_now != en_stat
+            changed = list(current)  # locale_paths order
+            if en_changed:
+                en_key_section = key_sections(en_path, cache)
+                en_stat = en_now
+            else:
+                changed = [p for p in changed if current[p] != snapshot.get(p)]
+            removed = [p for p in snapshot if p not in current]
+            snapshot = current
+            if not changed and not removed:
+                continue
+
+            before = sum(drift.values())
+            totals_before = _totals(counts.values())
+            stamp = time.strftime("%H:%M:%S")
+            if first:
+                print(f"[{stamp}] watching {rel_of(locale_root)} (Ctrl+C to stop)")
+            elif en_changed:
+                print(f"[{stamp}] en/strings.cfg changed: re-auditing {len(changed)} file(s)")
+            else:
+                print(f"[{stamp}] {len(changed) + len(removed)} file(s) changed")
+
+            for path in removed:
+                print(f"{rel_of(path)}: removed")
+                del counts[path]
+                del drift[path]
+            for path, result in zip(changed, audit_paths(changed, en_key_section, cache, jobs)):
+                new_counts = _counts(result)
+                old_counts = counts.get(path)
+                counts[path] = new_counts
+                drift[path] = result.drift
+                if not first and new_counts == old_counts:
+                    continue
+                flag = "DRIFT" if result.drift else "OK"
+                suffix = " (new)" if old_counts is None and not first else ""
+                print(f"{rel_of(path)}: {_format_counts(new_counts, old_counts)} [{flag}]{suffix}")
+                if not quiet and result.drift:
+                    is_template = path.name == "template_strings.cfg"
+                    print_audit(rel_of(path), result, en_key_section, False, is_template)
+
+            drifting = sum(drift.values())
+            delta = "" if first or drifting == before else f"({drifting - before:+d})"
+            totals = _format_counts(_totals(counts.values()), None if first else totals_before)
+            print(f"TOTAL: {totals} DRIFTING={drifting}{delta}")
+            sys.stdout.flush()
+            if cache is not None:
+                cache.save()
+            first = False
+    except KeyboardInterrupt:
+        pass
+    return 1 if any(drift.values()) else 0
 
 
 def main() -> int:
@@ -38,7 +397,36 @@ def main() -> int:
         default=None,
         help="Path to locale/ (default: <repo>/locale)",
     )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every file from scratch instead of using the on-disk parse cache",
+    )
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Re-audit only locales whose strings.cfg changed since the last --incremental run",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for parsing/auditing locales (0 = CPU count, default: 1)",
+    )
+    ap.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running: poll locale/ and re-audit files as they change (Ctrl+C to stop)",
+    )
+    ap.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Seconds between --watch polls (default: 1.0)",
+    )
     args = ap.parse_args()
+    if args.watch and args.incremental:
+        ap.error("--watch already re-audits only changed files; drop --incremental")
 
     repo = Path(__file__).resolve().parents[1]
     locale_root = args.locale_root or (repo / "locale")
@@ -47,21 +435,57 @@ def main() -> int:
         print(f"ERROR: canonical file not found: {en_path}", file=sys.stderr)
         return 2
 
-    _parsed = load_parsed(en_path)
-    en_lines = _parsed[1]
-    en_key_to_section = _parsed[2]
-    en_keys: Set[str] = set(en_key_to_section.keys())
-    # Map key -> expected section (from en)
-    en_key_section: Dict[str, str] = dict(en_key_to_section)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if args.watch:
+        cache = None if args.no_cache else ParseCache.open()
+        return watch(locale_root, repo, cache, jobs, args.interval, args.quiet)
 
-    template_path = locale_root / "template_strings.cfg"
-    paths: List[Path] = [template_path]
-    for d in sorted(locale_root.iterdir(), key=lambda p: p.name):
-        if not d.is_dir() or d.name == "en":
+    paths = locale_paths(locale_root)
+    state = load_audit_state(locale_root) if args.incremental else {}
+    stored_files: Dict[str, Any] = state.get("files", {})
+
+    en_fp: Optional[Fingerprint] = None
+    en_key_section: Optional[Dict[str, str]] = None
+    if args.incremental:
+        en_state = state.get("en")
+        en_fp = file_fingerprint(en_path, _stored_fingerprint(en_state))
+        if en_state and en_fp == _stored_fingerprint(en_state):
+            en_key_section = en_state["key_section"]
+
+    # Reuse stored results for unchanged locales (only while en is unchanged too).
+    results: List[Optional[LocaleAudit]] = [None] * len(paths)
+    fingerprints: List[Optional[Fingerprint]] = [None] * len(paths)
+    for i, path in enumerate(paths):
+        if not args.incremental:
             continue
-        p = d / "strings.cfg"
-        if p.is_file():
-            paths.append(p)
+        entry = stored_files.get(str(path.resolve()))
+        fingerprints[i] = file_fingerprint(path, _stored_fingerprint(entry))
+        if entry and en_key_section is not None and fingerprints[i] == _stored_fingerprint(entry):
+            results[i] = _stored_result(entry)
+
+    stale = [i for i, r in enumerate(results) if r is None]
+    if en_key_section is None or stale:
+        cache = None if args.no_cache else ParseCache.open()
+        if en_key_section is None:
+            # Map key -> expected section (from en); computed once, shared with workers
+            en_key_section = key_sections(en_path, cache)
+        fresh = audit_paths([paths[i] for i in stale], en_key_section, cache, jobs)
+        for i, result in zip(stale, fresh):
+            results[i] = result
+        if cache is not None:
+            cache.save()
+
+    if args.incremental and en_fp is not None:
+        save_audit_state(
+            locale_root,
+            en_fp,
+            en_key_section,
+            {
+                str(path.resolve()): (fp, result)
+                for path, fp, result in zip(paths, fingerprints, results)
+                if fp is not None and result is not None
+            },
+        )
 
     total_missing = 0
     total_extra = 0
@@ -69,75 +493,20 @@ def main() -> int:
     total_empty = 0
     any_drift = False
 
-    for path in paths:
+    for path, result in zip(paths, results):
         try:
             rel = path.relative_to(repo)
         except ValueError:
             rel = path
-        _, loc_lines, loc_key_to_section, _ = load_parsed(path)
-        loc_keys = set(loc_key_to_section.keys())
-
-        missing = sorted(en_keys - loc_keys)
-        extra = sorted(loc_keys - en_keys)
 
-        misplaced: List[str] = []
-        for k in sorted(en_keys & loc_keys):
-            if en_key_section.get(k) != loc_key_to_section.get(k):
-                misplaced.append(k)
-
-        empty: List[str] = []
-        for rec in loc_lines:
-            if rec.kind == "entry" and rec.key and rec.value is not None:
-                if rec.value.strip() == "":
-                    empty.append(rec.key)
-
-        is_template = path.name == "template_strings.cfg"
-
-        n_miss = len(missing)
-        n_ext = len(extra)
-        n_mis = len(misplaced)
-        n_emp = len(empty)
-
-        total_missing += n_miss
-        total_extra += n_ext
-        total_misplaced += n_mis
-        total_empty += n_emp
-
-        drift = n_miss > 0 or n_ext > 0 or n_mis > 0
-        if drift:
+        total_missing += len(result.missing)
+        total_extra += len(result.extra)
+        total_misplaced += len(result.misplaced)
+        total_empty += len(result.empty)
+        if result.drift:
             any_drift = True
 
-        if args.quiet:
-            flag = "DRIFT" if drift else "OK"
-            print(
-                f"{rel}: MISSING={n_miss} EXTRA={n_ext} MISPLACED={n_mis} EMPTY={n_emp} [{flag}]"
-            )
-        else:
-            print(f"=== {rel} ===")
-            if missing:
-                print("  MISSING:")
-                for k in missing:
-                    print(f"    {k}  (en section: [{en_key_section.get(k, '?')}])")
-            if extra:
-                print("  EXTRA:")
-                for k in extra:
-                    print(f"    {k}")
-            if misplaced:
-                print("  MISPLACED:")
-                for k in misplaced:
-                    print(
-                        f"    {k}: en=[{en_key_section.get(k)}] "
-                        f"file=[{loc_key_to_section.get(k)}]"
-                    )
-            if empty:
-                print("  EMPTY:")
-                for k in empty:
-                    print(f"    {k}")
-            if not missing and not extra and not misplaced and not empty:
-                print("  (no issues)")
-            elif not missing and not extra and not misplaced and empty and is_template:
-                print("  (template: empty values expected for translators)")
-            print()
+        print_audit(rel, result, en_key_section, args.quiet, path.name == "template_strings.cfg")
 
     print(
         "TOTAL: "
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for the locale tools on a generated locale tree.
+
+Builds a synthetic locale/ (en + template + N locales, tens of thousands of keys,
+LF/CRLF/mixed line endings, BOMs, MISSING/EXTRA/MISPLACED keys), then times:
+
+  parse_lines     _locale_parser.parse_lines over every file
+  audit_main      audit_locales.main --quiet --no-cache
+  sync_dry_run    sync_locales.sync_file (dry run) over every non-en file
+
+Each case reports the best wall time of --repeat runs and the peak traced
+allocation of one extra run (tracemalloc is kept out of the timed runs).
+
+Usage (from mod root):
+  python .scripts/bench_locales.py
+  python .scripts/bench_locales.py --locales 60 --keys 40000 --output bench.json
+  python .scripts/bench_locales.py --output new.json --compare bench.json
+
+With --compare, exits with code 1 if any case is slower or uses more peak memory
+than the baseline by more than --threshold (default 15%).
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+import audit_locales  # noqa: E402
+import sync_locales  # noqa: E402
+from _locale_parser import decode_text, flatten_en_order, parse_lines  # noqa: E402
+
+BENCH_FORMAT = 1
+
+_WORDS = (
+    "teleport favorite tag chart map player position surface confirm cancel "
+    "delete edit move slot lock unlock icon text owner destination invalid"
+).split()
+_NEWLINES = ("lf", "crlf", "mixed")
+
+
+def _render(lines: List[str], newline: str, bom: bool) -> bytes:
+    if newline == "lf":
+        text = "".join(line + "\n" for line in lines)
+    elif newline == "crlf":
+        text = "".join(line + "\r\n" for line in lines)
+    else:
+        text = "".join(line + ("\r\n" if i % 2 else "\n") for i, line in enumerate(lines))
+    return (("\ufeff" if bom else "") + text).encode("utf-8")
+
+
+def generate_tree(
+    root: Path,
+    locales: int,
+    keys: int,
+    sections: int,
+    drift: float,
+    seed: int,
+) -> Dict[str, int]:
+    """
+    Write a synthetic locale tree under ``root``; returns file/key/drift totals.
+
+    Each locale drops, adds and moves roughly ``drift`` of the en keys, and cycles
+    through LF/CRLF/mixed line endings, with a BOM on every third file.
+    """
+    rng = random.Random(seed)
+    section_names = [f"tf-bench-{s:03d}" for s in range(sections)]
+    en: List[Tuple[str, str, str]] = []  # (section, key, value)
+    for i in range(keys):
+        value = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 8)))
+        if i % 7 == 0:
+            value += " __1__"
+        en.append((section_names[i * sections // keys], f"key_{i:06d}", value))
+
+    def lines_for(entries: List[Tuple[str, str, str]], header: str) -> List[str]:
+        out = [f"# {header}", ""]
+        current = None
+        for section, key, value in entries:
+            if section != current:
+                if current is not None:
+                    out.append("")
+                out.append(f"[{section}]")
+                current = section
+            out.append(f"{key}={value}")
+        return out
+
+    (root / "en").mkdir(parents=True, exist_ok=True)
+    (root / "en" / "strings.cfg").write_bytes(_render(lines_for(en, "en"), "lf", False))
+    template = [(sec, key, "") for sec, key, _ in en]
+    (root / "template_strings.cfg").write_bytes(
+        _render(lines_for(template, "template"), "crlf", True)
+    )
+
+    totals = {"files": 2, "keys": keys, "missing": 0, "extra": 0, "misplaced": 0}
+    n_drift = max(1, int(keys * drift))
+    for n in range(locales):
+        entries = [(sec, key, f"{value} ({n})") for sec, key, value in en]
+        for idx in sorted(rng.sample(range(len(entries)), n_drift), reverse=True):
+            del entries[idx]
+        for idx in rng.sample(range(len(entries)), n_drift):
+            sec, key, value = entries[idx]
+            other = section_names[(section_names.index(sec) + 1) % sections]
+            entries[idx] = (other, key, value)
+        for j in range(n_drift):
+            pos = rng.randrange(len(entries) + 1)
+            entries.insert(pos, (entries[min(pos, len(entries) - 1)][0], f"extra_{n}_{j}", "x"))
+        # Misplaced keys land in the neighbouring section's block, as in a hand edit.
+        entries.sort(key=lambda e: e[0])
+        d = root / f"xx{n:03d}"
+        d.mkdir(exist_ok=True)
+        data = _render(lines_for(entries, f"locale {n}"), _NEWLINES[n % 3], n % 3 == 0)
+        (d / "strings.cfg").write_bytes(data)
+        totals["files"] += 1
+        totals["missing"] += n_drift
+        totals["extra"] += n_drift
+        totals["misplaced"] += n_drift
+    return totals
+
+
+def locale_files(locale_root: Path) -> List[Path]:
+    """Every strings.cfg including en, then template_strings.cfg."""
+    return sorted(locale_root.glob("*/strings.cfg")) + [locale_root / "template_strings.cfg"]
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Best-of-``repeat`` wall time, then peak traced memory of one more run."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(best, 6), "peak_bytes": peak}
+
+
+def bench_cases(locale_root: Path) -> Dict[str, Callable[[], Any]]:
+    paths = locale_files(locale_root)
+    blobs = [p.read_bytes() for p in paths]
+    en_path = locale_root / "en" / "strings.cfg"
+    targets = [p for p in paths if p != en_path]
+
+    def run_parse() -> None:
+        for data in blobs:
+            parse_lines(decode_text(data))
+
+    def run_audit() -> None:
+        argv = ["audit_locales.py", "--quiet", "--no-cache", "--locale-root", str(locale_root)]
+        saved = sys.argv
+        sys.argv = argv
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                audit_locales.main()
+        finally:
+            sys.argv = saved
+
+    def run_sync() -> None:
+        en_flat = flatten_en_order(en_path)
+        en_keys = {k for _, k, _ in en_flat}
+        for p in targets:
+            sync_locales.sync_file(p, en_flat, en_keys, "empty", dry_run=True)
+
+    return {"parse_lines": run_parse, "audit_main": run_audit, "sync_dry_run": run_sync}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Human-readable regressions of ``current`` against ``baseline``."""
+    regressions: List[str] = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            old, new = before[metric], now[metric]
+            if old > 0 and new > old * (1 + threshold):
+                pct = (new / old - 1) * 100
+                regressions.append(f"{name}.{metric}: {old} -> {new} (+{pct:.1f}%)")
+    return regressions
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark locale tools on a synthetic locale tree")
+    ap.add_argument(
+        "--locales",
+        type=int,
+        default=40,
+        help="Generated non-en locales (default: 40)",
+    )
+    ap.add_argument(
+        "--keys",
+        type=int,
+        default=20000,
+        help="Keys in the generated en/strings.cfg (default: 20000)",
+    )
+    ap.add_argument(
+        "--sections",
+        type=int,
+        default=50,
+        help="Sections the keys are spread over (default: 50)",
+    )
+    ap.add_argument(
+        "--drift",
+        type=float,
+        default=0.02,
+        help="Fraction of keys each locale is missing / has extra / misplaces (default: 0.02)",
+    )
+    ap.add_argument(
+        "--seed",
+        type=int,
+        default=1,
+        help="Generator seed (default: 1)",
+    )
+    ap.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed runs per case; the best is reported (default: 3)",
+    )
+    ap.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Write results as JSON to this path",
+    )
+    ap.add_argument(
+        "--compare",
+        type=Path,
+        default=None,
+        help="Baseline JSON from an earlier --output run; exit 1 on regressions",
+    )
+    ap.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Allowed slowdown / memory growth vs --compare baseline (default: 0.15)",
+    )
+    args = ap.parse_args()
+
+    params = {
+        "locales": args.locales,
+        "keys": args.keys,
+        "sections": args.sections,
+        "drift": args.drift,
+        "seed": args.seed,
+    }
+    with tempfile.TemporaryDirectory(prefix="tf-locale-bench-") as tmp:
+        locale_root = Path(tmp) / "locale"
+        start = time.perf_counter()
+        totals = generate_tree(locale_root, **params)
+        print(
+            f"Generated {totals['files']} files, {totals['keys']:,} en keys, "
+            f"{totals['missing']:,} missing / {totals['extra']:,} extra / "
+            f"{totals['misplaced']:,} misplaced ({time.perf_counter() - start:.2f}s)"
+        )
+        results: Dict[str, Dict[str, float]] = {}
+        for name, fn in bench_cases(locale_root).items():
+            results[name] = measure(fn, args.repeat)
+            r = results[name]
+            print(f"  {name:<14} {r['seconds']:9.3f}s  peak {r['peak_bytes'] / 1048576:8.1f} MiB")
+
+    report = {
+        "format": BENCH_FORMAT,
+        "params": params,
+        "python": platform.python_version(),
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote {args.output}")
+
+    if args.compare is None:
+        return 0
+    try:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: cannot read baseline {args.compare}: {e}", file=sys.stderr)
+        return 2
+    if baseline.get("params") != params:
+        print("WARNING: baseline was generated with different parameters", file=sys.stderr)
+    regressions = compare(report, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION: {line}")
+    if not regressions:
+        print(f"No regressions vs {args.compare} (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
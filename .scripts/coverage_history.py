@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Coverage history: every recorded run's per-file results in a local SQLite store
+(tests/output/coverage_history.db, not committed), keyed by git commit and time.
+
+generate_formatted_coverage.py records each run automatically; a run is written
+in one transaction with a single executemany, so recording costs a few ms.
+
+Usage (from mod root):
+  python .scripts/coverage_history.py record                 # from tests/luacov.stats.out
+  python .scripts/coverage_history.py runs
+  python .scripts/coverage_history.py trend gui/favorites_bar
+  python .scripts/coverage_history.py trend                  # every directory, latest runs
+  python .scripts/coverage_history.py regressions --since 3f2c1ab
+  python .scripts/coverage_history.py regressions --since 2025-07-01 --threshold 1.0
+
+--since accepts a run id (#12), a commit prefix, or an ISO date (first run on or
+after it). regressions exits with code 1 if any file's coverage fell.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import posixpath
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _luacov_stats import coverage_from_stats, default_resolver  # noqa: E402
+
+REPO_ROOT = _SCRIPT_DIR.parent
+DEFAULT_DB_PATH = REPO_ROOT / "tests" / "output" / "coverage_history.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    git_commit TEXT NOT NULL,
+    dirty INTEGER NOT NULL,
+    recorded_at TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_commit ON runs (git_commit, recorded_at);
+CREATE TABLE IF NOT EXISTS file_coverage (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    directory TEXT NOT NULL,
+    covered INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (run_id, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS file_coverage_dir ON file_coverage (directory, run_id);
+"""
+
+
+class Run(NamedTuple):
+    id: int
+    git_commit: str
+    dirty: bool
+    recorded_at: str
+    source: str
+
+
+def connect(db_path: Path = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def git_commit(repo: Path = REPO_ROOT) -> Tuple[str, bool]:
+    """(HEAD commit, working tree dirty); ("unknown", False) outside a git checkout."""
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=repo, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return head, bool(status.strip())
+
+
+def record_run(
+    files: Iterable[Tuple[str, int, int]],
+    source: str,
+    db_path: Path = DEFAULT_DB_PATH,
+    commit: Optional[Tuple[str, bool]] = None,
+    recorded_at: Optional[str] = None,
+) -> int:
+    """
+    Store one run's (path, covered, total) rows; returns the run id.
+    Paths are mod-relative with "/" separators.
+    """
+    head, dirty = commit if commit is not None else git_commit()
+    stamp = recorded_at or datetime.datetime.now().astimezone().isoformat(timespec="milliseconds")
+    rows = [
+        (path, posixpath.dirname(path) or ".", covered, total) for path, covered, total in files
+    ]
+    conn = connect(db_path)
+    try:
+        with conn:  # one transaction for the run and all of its rows
+            cur = conn.execute(
+                "INSERT INTO runs (git_commit, dirty, recorded_at, source) VALUES (?, ?, ?, ?)",
+                (head, int(dirty), stamp, source),
+            )
+            run_id = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO file_coverage (run_id, path, directory, covered, total)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(run_id,) + row for row in rows],
+            )
+    finally:
+        conn.close()
+    return int(run_id)
+
+
+def list_runs(conn: sqlite3.Connection, limit: int = 20) -> List[Run]:
+    cur = conn.execute(
+        "SELECT id, git_commit, dirty, recorded_at, source FROM runs ORDER BY id DESC LIMIT ?",
+        (limit,),
+    )
+    return [Run(r[0], r[1], bool(r[2]), r[3], r[4]) for r in cur]
+
+
+def find_run(conn: sqlite3.Connection, ref: str) -> Optional[Run]:
+    """Run for a "#id", a commit prefix (latest run of it) or an ISO date (first run since)."""
+    query = "SELECT id, git_commit, dirty, recorded_at, source FROM runs "
+    if ref.startswith("#") and ref[1:].isdigit():
+        row = conn.execute(query + "WHERE id = ?", (int(ref[1:]),)).fetchone()
+    else:
+        row = conn.execute(
+            query + "WHERE git_commit LIKE ? ORDER BY id DESC LIMIT 1", (ref + "%",)
+        ).fetchone()
+        if row is None:
+            row = conn.execute(
+                query + "WHERE recorded_at >= ? ORDER BY recorded_at, id LIMIT 1", (ref,)
+            ).fetchone()
+    return Run(row[0], row[1], bool(row[2]), row[3], row[4]) if row else None
+
+
+def _pct(covered: int, total: int) -> float:
+    return covered / total * 100 if total else 0.0
+
+
+def directory_trend(
+    conn: sqlite3.Connection, directory: Optional[str], limit: int
+) -> List[Tuple[Run, str, int, int]]:
+    """(run, directory, covered, total) for the latest ``limit`` runs, oldest first."""
+    runs = {r.id: r for r in list_runs(conn, limit)}
+    if not runs:
+        return []
+    marks = ",".join("?" * len(runs))
+    if directory:
+        directory = directory.strip("/")
+        cur = conn.execute(
+            f"SELECT run_id, SUM(covered), SUM(total) FROM file_coverage "
+            f"WHERE run_id IN ({marks}) AND (directory = ? OR (directory >= ? AND directory < ?)) "
+            f"GROUP BY run_id ORDER BY run_id",
+            # "a/b/" <= subdirectory < "a/b0" ('0' sorts right after '/')
+            (*runs, directory, directory + "/", directory + "0"),
+        )
+        return [(runs[rid], directory, c, t) for rid, c, t in cur]
+    cur = conn.execute(
+        f"SELECT run_id, directory, SUM(covered), SUM(total) FROM file_coverage "
+        f"WHERE run_id IN ({marks}) GROUP BY run_id, directory ORDER BY directory, run_id",
+        tuple(runs),
+    )
+    return [(runs[rid], d, c, t) for rid, d, c, t in cur]
+
+
+def regressions(
+    conn: sqlite3.Connection, baseline: Run, current: Run, threshold: float
+) -> List[Tuple[str, float, float]]:
+    """(path, baseline %, current %) for files whose coverage fell by more than ``threshold``."""
+    cur = conn.execute(
+        "SELECT b.path, b.covered, b.total, c.covered, c.total FROM file_coverage b "
+        "JOIN file_coverage c ON c.path = b.path AND c.run_id = ? WHERE b.run_id = ?",
+        (current.id, baseline.id),
+    )
+    fell = []
+    for path, bc, bt, cc, ct in cur:
+        before, after = _pct(bc, bt), _pct(cc, ct)
+        if after < before - threshold:
+            fell.append((path, before, after))
+    fell.sort(key=lambda row: row[2] - row[1])
+    return fell
+
+
+def _run_label(run: Run) -> str:
+    return f"#{run.id} {run.git_commit[:10]}{'+' if run.dirty else ''} {run.recorded_at}"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Record and query coverage history")
+    ap.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB_PATH,
+        help="SQLite database (default: tests/output/coverage_history.db)",
+    )
+    sub = ap.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="Record the current luacov results")
+    rec.add_argument(
+        "--stats",
+        type=Path,
+        default=REPO_ROOT / "tests" / "luacov.stats.out",
+        help="luacov.stats.out to record (default: tests/luacov.stats.out)",
+    )
+    runs_p = sub.add_parser("runs", help="List recorded runs")
+    runs_p.add_argument("--limit", type=int, default=20, help="Runs to show (default: 20)")
+    trend = sub.add_parser("trend", help="Per-directory coverage over recent runs")
+    trend.add_argument("directory", nargs="?", help="Directory prefix (default: every directory)")
+    trend.add_argument("--limit", type=int, default=10, help="Runs to include (default: 10)")
+    reg = sub.add_parser("regressions", help="Files whose coverage fell since a baseline run")
+    reg.add_argument("--since", required=True, help="Baseline: #run-id, commit prefix or ISO date")
+    reg.add_argument("--until", default=None, help="Compared run (default: latest)")
+    reg.add_argument(
+        "--threshold",
+        type=float,
+        default=0.0,
+        help="Ignore drops of at most this many percentage points (default: 0)",
+    )
+    args = ap.parse_args()
+
+    if args.command == "record":
+        if not args.stats.is_file():
+            print(f"ERROR: stats file not found: {args.stats}", file=sys.stderr)
+            return 2
+        resolve = default_resolver(args.stats.parent, REPO_ROOT)
+        files = []
+        for source_path, cov in coverage_from_stats(args.stats, resolve):
+            try:
+                rel = source_path.resolve().relative_to(REPO_ROOT).as_posix()
+            except ValueError:
+                continue
+            files.append((rel, cov.covered, cov.total))
+        run_id = record_run(files, str(args.stats), args.db)
+        print(f"Recorded run #{run_id} ({len(files)} files)")
+        return 0
+
+    if not args.db.is_file():
+        print(f"ERROR: no coverage history at {args.db}", file=sys.stderr)
+        return 2
+    conn = connect(args.db)
+    try:
+        if args.command == "runs":
+            for run in list_runs(conn, args.limit):
+                print(f"{_run_label(run)}  {run.source}")
+            return 0
+
+        if args.command == "trend":
+            current_dir = None
+            rows = directory_trend(conn, args.directory, args.limit)
+            for run, directory, covered, total in rows:
+                if directory != current_dir:
+                    print(f"{directory}:")
+                    current_dir = directory
+                print(f"  {_run_label(run)}  {covered}/{total} ({_pct(covered, total):.2f}%)")
+            return 0
+
+        baseline = find_run(conn, args.since)
+        current = find_run(conn, args.until) if args.until else next(iter(list_runs(conn, 1)), None)
+        if baseline is None or current is None:
+            ref = args.since if baseline is None else args.until
+            print(f"ERROR: no run matches {ref}", file=sys.stderr)
+            return 2
+        fell = regressions(conn, baseline, current, args.threshold)
+        print(f"Baseline {_run_label(baseline)} -> {_run_label(current)}")
+        for path, before, after in fell:
+            print(f"  {path}: {before:.2f}% -> {after:.2f}% ({after - before:+.2f})")
+        if not fell:
+            print("  no coverage regressions")
+        return 1 if fell else 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
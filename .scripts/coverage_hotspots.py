@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Hot-path map from luacov hit counts: the most-executed lines and functions of
+the mod under the test suite, as a cheap stand-in for the in-game profiler.
+
+Reads tests/luacov.stats.out (raw per-line counts, see _luacov_stats.py) or,
+with --report, the annotated luacov.report.out. Function spans come from
+_lua_lexer.functions(); each line is credited to its innermost function, so
+nested callbacks are ranked on their own.
+
+  calls      hits on the function's first executed body line (~ call count)
+  line_hits  hits summed over the function's own lines (~ work done)
+
+Usage (from mod root):
+  python .scripts/coverage_hotspots.py
+  python .scripts/coverage_hotspots.py --top 50 --dirs core/cache gui/favorites_bar
+  python .scripts/coverage_hotspots.py --report tests/luacov.report.out --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import posixpath
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _lua_lexer import functions  # noqa: E402
+from _luacov_report import read_report_hits  # noqa: E402
+from _luacov_stats import (  # noqa: E402
+    EXECUTABLE,
+    default_resolver,
+    line_classes,
+    read_stats,
+    repo_rel_name,
+)
+
+DEFAULT_DIRS = ("core", "gui")
+
+
+class FileProfile(NamedTuple):
+    rel: str  # path relative to the mod root, "/" separated
+    hits: List[Optional[int]]  # per line (index 0 = line 1); None = not executable
+    code: List[str]  # source text per line
+
+
+def profiles_from_stats(stats_path: Path, repo: Path) -> Iterator[FileProfile]:
+    resolve = default_resolver(stats_path.parent, repo)
+    for name, counts in read_stats(stats_path):
+        source_path = resolve(name)
+        if source_path is None:
+            continue
+        rel = repo_rel_name(name, stats_path.parent, repo)
+        if rel is None:
+            continue
+        source = source_path.read_text(encoding="utf-8", errors="replace")
+        hits: List[Optional[int]] = []
+        for i, cls in enumerate(line_classes(source)):
+            n = counts[i] if i < len(counts) else 0
+            # A hit always counts; a zero only on lines that can execute
+            hits.append(n if n > 0 else 0 if cls == EXECUTABLE else None)
+        yield FileProfile(rel, hits, source.split("\n"))
+
+
+def profiles_from_report(report_path: Path, repo: Path) -> Iterator[FileProfile]:
+    for fh in read_report_hits(report_path):
+        rel = repo_rel_name(fh.name, report_path.parent, repo)
+        if rel is not None:
+            yield FileProfile(rel, fh.hits, fh.code)
+
+
+def in_dirs(rel: str, dirs: Sequence[str]) -> bool:
+    return not dirs or any(rel == d or rel.startswith(d.rstrip("/") + "/") for d in dirs)
+
+
+def build_hotspots(
+    profiles: Iterator[FileProfile], dirs: Sequence[str], top: int
+) -> Dict[str, Any]:
+    """Top lines, top functions and per-directory totals for the selected files."""
+    lines: List[Any] = []  # heap-selected (hits, rel, line, code)
+    funcs: List[Dict[str, Any]] = []
+    directories: Dict[str, Dict[str, int]] = {}
+
+    for prof in profiles:
+        if not in_dirs(prof.rel, dirs):
+            continue
+        d = directories.setdefault(
+            posixpath.dirname(prof.rel) or ".",
+            {"files": 0, "executed_lines": 0, "line_hits": 0},
+        )
+        d["files"] += 1
+        for i, h in enumerate(prof.hits):
+            if h:
+                d["executed_lines"] += 1
+                d["line_hits"] += h
+                code = prof.code[i].strip() if i < len(prof.code) else ""
+                lines.append((h, prof.rel, i + 1, code))
+
+        # Credit each line to its innermost function (spans are in source order,
+        # so a nested function overwrites its parent's claim on its lines).
+        spans = functions("\n".join(prof.code))
+        owner = [-1] * (len(prof.hits) + 2)
+        for idx, span in enumerate(spans):
+            for ln in range(span.line, min(span.end_line, len(prof.hits)) + 1):
+                owner[ln] = idx
+        calls = [0] * len(spans)
+        own_hits = [0] * len(spans)
+        seen_body = [False] * len(spans)
+        for ln in range(1, len(prof.hits) + 1):
+            idx = owner[ln]
+            h = prof.hits[ln - 1]
+            if idx < 0 or h is None:
+                continue
+            span = spans[idx]
+            if ln == span.line and span.end_line != span.line:
+                continue  # the definition line runs when the closure is created
+            own_hits[idx] += h
+            if not seen_body[idx]:
+                seen_body[idx] = True
+                calls[idx] = h
+        for idx, span in enumerate(spans):
+            if own_hits[idx]:
+                funcs.append(
+                    {
+                        "function": span.name,
+                        "file": prof.rel,
+                        "line": span.line,
+                        "calls": calls[idx],
+                        "line_hits": own_hits[idx],
+                    }
+                )
+
+    top_lines = heapq.nlargest(top, lines, key=lambda t: t[0])
+    top_funcs = heapq.nlargest(top, funcs, key=lambda f: (f["line_hits"], f["calls"]))
+    dir_rows = [
+        dict(directory=name, **stats)
+        for name, stats in sorted(directories.items(), key=lambda kv: -kv[1]["line_hits"])
+    ]
+    return {
+        "lines": [
+            {"file": rel, "line": ln, "hits": h, "code": code} for h, rel, ln, code in top_lines
+        ],
+        "functions": top_funcs,
+        "directories": dir_rows,
+    }
+
+
+def print_hotspots(result: Dict[str, Any]) -> None:
+    print(f"Hot lines (top {len(result['lines'])}):")
+    for row in result["lines"]:
+        print(f"  {row['hits']:>10,}  {row['file']}:{row['line']}  {row['code'][:70]}")
+    print()
+    print(f"Hot functions (top {len(result['functions'])}):")
+    print(f"  {'line_hits':>10}  {'calls':>8}  function")
+    for row in result["functions"]:
+        print(
+            f"  {row['line_hits']:>10,}  {row['calls']:>8,}  "
+            f"{row['function']}  ({row['file']}:{row['line']})"
+        )
+    print()
+    print("By directory:")
+    print(f"  {'line_hits':>10}  {'executed':>8}  {'files':>5}  directory")
+    for row in result["directories"]:
+        print(
+            f"  {row['line_hits']:>10,}  {row['executed_lines']:>8,}  {row['files']:>5}  "
+            f"{row['directory']}"
+        )
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Rank the most-executed lines and functions")
+    ap.add_argument(
+        "--stats",
+        type=Path,
+        default=None,
+        help="luacov.stats.out to read (default: tests/luacov.stats.out)",
+    )
+    ap.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Read hit counts from an annotated luacov.report.out instead of the stats file",
+    )
+    ap.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Number of lines and functions to list (default: 20)",
+    )
+    ap.add_argument(
+        "--dirs",
+        nargs="*",
+        default=list(DEFAULT_DIRS),
+        help="Mod-relative directories to include (default: core gui; none = all files)",
+    )
+    ap.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the result as JSON",
+    )
+    args = ap.parse_args()
+
+    repo = Path(__file__).resolve().parents[1]
+    if args.report is not None:
+        if not args.report.is_file():
+            print(f"ERROR: report not found: {args.report}", file=sys.stderr)
+            return 2
+        profiles = profiles_from_report(args.report, repo)
+        source = str(args.report)
+    else:
+        stats_path = args.stats or (repo / "tests" / "luacov.stats.out")
+        if not stats_path.is_file():
+            print(f"ERROR: stats file not found: {stats_path}", file=sys.stderr)
+            return 2
+        profiles = profiles_from_stats(stats_path, repo)
+        source = str(stats_path)
+
+    result = build_hotspots(profiles, args.dirs, max(1, args.top))
+    if args.json:
+        print(json.dumps(dict(source=source, top=args.top, dirs=args.dirs, **result), indent=2))
+    else:
+        print_hotspots(result)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Cold-code report: functions in the shipped Lua files that no test ever executed,
+ranked by size, as candidates to delete or lazy-load (fewer bytes for Factorio
+to parse at mod load).
+
+Files come from _lua_files.iter_lua_files() (the same set the line
+counter reports); function spans from _lua_lexer.functions(); per-line hits from
+tests/luacov.stats.out or, with --report, luacov.report.out (see
+coverage_hotspots.py). A function is cold when none of its body lines was hit.
+A cold function nested in another cold function is folded into its parent.
+Files no spec loaded at all are listed separately: their coverage is unknown
+rather than zero, so they are not ranked with the functions.
+
+"Cold" means not reached by the test suite, not proven dead in game: check
+event handlers, remote interfaces and commands before deleting anything.
+
+Usage (from mod root):
+  python .scripts/dead_code_report.py
+  python .scripts/dead_code_report.py --dirs core/cache --top 50
+  python .scripts/dead_code_report.py --json > cold_functions.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _lua_files import iter_lua_files  # noqa: E402
+from _lua_lexer import functions  # noqa: E402
+from _luacov_stats import NEVER, line_classes  # noqa: E402
+from coverage_hotspots import (  # noqa: E402
+    DEFAULT_DIRS,
+    FileProfile,
+    in_dirs,
+    profiles_from_report,
+    profiles_from_stats,
+)
+
+
+def cold_functions(prof: FileProfile, source: str) -> List[Dict[str, Any]]:
+    """Outermost never-executed functions of one file, with their size."""
+    classes = line_classes(source)
+    lines = source.split("\n")
+    cold: List[Dict[str, Any]] = []
+    covered_until = 0  # end line of the last cold function (nested spans fold into it)
+    for span in functions(source):
+        if span.line <= covered_until:
+            continue
+        # The definition line runs when the closure is created, so look at the body;
+        # a one-line function has nothing else to look at.
+        first = span.line + 1 if span.end_line > span.line else span.line
+        body = prof.hits[first - 1 : span.end_line]
+        if any(h for h in body):
+            continue
+        code_lines = sum(1 for c in classes[span.line - 1 : span.end_line] if c != NEVER)
+        size = sum(len(line.encode("utf-8")) + 1 for line in lines[span.line - 1 : span.end_line])
+        cold.append(
+            {
+                "function": span.name,
+                "file": prof.rel,
+                "line": span.line,
+                "end_line": span.end_line,
+                "code_lines": code_lines,
+                "bytes": size,
+            }
+        )
+        covered_until = span.end_line
+    return cold
+
+
+def build_report(
+    profiles: Iterable[FileProfile], shipped: Dict[str, Path], dirs: Sequence[str]
+) -> Dict[str, Any]:
+    """Cold functions of loaded files plus the shipped files no spec loaded."""
+    cold: List[Dict[str, Any]] = []
+    loaded = set()
+    total_bytes = 0
+    for prof in profiles:
+        path = shipped.get(prof.rel)
+        if path is None or not in_dirs(prof.rel, dirs):
+            continue
+        loaded.add(prof.rel)
+        source = path.read_text(encoding="utf-8", errors="replace")
+        total_bytes += len(source.encode("utf-8"))
+        cold.extend(cold_functions(prof, source))
+    unloaded = []
+    for rel, path in sorted(shipped.items()):
+        if rel in loaded or not in_dirs(rel, dirs):
+            continue
+        source = path.read_text(encoding="utf-8", errors="replace")
+        code_lines = sum(1 for c in line_classes(source) if c != NEVER)
+        unloaded.append({"file": rel, "code_lines": code_lines, "bytes": path.stat().st_size})
+    cold.sort(key=lambda f: (-f["code_lines"], f["file"], f["line"]))
+    unloaded.sort(key=lambda f: (-f["code_lines"], f["file"]))
+    cold_bytes = sum(f["bytes"] for f in cold)
+    return {
+        "loaded_files": len(loaded),
+        "loaded_bytes": total_bytes,
+        "cold_bytes": cold_bytes,
+        "cold_functions": cold,
+        "unloaded_files": unloaded,
+    }
+
+
+def print_report(result: Dict[str, Any], top: int) -> None:
+    pct = result["cold_bytes"] / result["loaded_bytes"] * 100 if result["loaded_bytes"] else 0.0
+    print(
+        f"{len(result['cold_functions'])} never-executed functions in {result['loaded_files']} "
+        f"loaded files: {result['cold_bytes']:,} of {result['loaded_bytes']:,} bytes ({pct:.1f}%)"
+    )
+    print()
+    print(f"Largest cold functions (top {min(top, len(result['cold_functions']))}):")
+    print(f"  {'lines':>6}  {'bytes':>7}  function")
+    for row in result["cold_functions"][:top]:
+        print(
+            f"  {row['code_lines']:>6,}  {row['bytes']:>7,}  {row['function']}  "
+            f"({row['file']}:{row['line']}-{row['end_line']})"
+        )
+    if result["unloaded_files"]:
+        print()
+        print(f"Files no spec loaded ({len(result['unloaded_files'])}):")
+        for row in result["unloaded_files"][:top]:
+            print(f"  {row['code_lines']:>6,}  {row['bytes']:>7,}  {row['file']}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Rank never-executed Lua functions by size")
+    ap.add_argument(
+        "--stats",
+        type=Path,
+        default=None,
+        help="luacov.stats.out to read (default: tests/luacov.stats.out)",
+    )
+    ap.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Read hit counts from an annotated luacov.report.out instead of the stats file",
+    )
+    ap.add_argument(
+        "--dirs",
+        nargs="*",
+        default=list(DEFAULT_DIRS),
+        help="Mod-relative directories to include (default: core gui; none = all files)",
+    )
+    ap.add_argument(
+        "--top",
+        type=int,
+        default=30,
+        help="Rows to print (default: 30; --json always lists everything)",
+    )
+    ap.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the full result as JSON",
+    )
+    args = ap.parse_args()
+
+    repo = Path(__file__).resolve().parents[1]
+    if args.report is not None:
+        if not args.report.is_file():
+            print(f"ERROR: report not found: {args.report}", file=sys.stderr)
+            return 2
+        profiles = profiles_from_report(args.report, repo)
+        source = str(args.report)
+    else:
+        stats_path = args.stats or (repo / "tests" / "luacov.stats.out")
+        if not stats_path.is_file():
+            print(f"ERROR: stats file not found: {stats_path}", file=sys.stderr)
+            return 2
+        profiles = profiles_from_stats(stats_path, repo)
+        source = str(stats_path)
+
+    shipped = {p.relative_to(repo).as_posix(): p for p in iter_lua_files(repo)}
+    result = build_report(profiles, shipped, args.dirs)
+    if args.json:
+        print(json.dumps(dict(source=source, dirs=args.dirs, **result), indent=2))
+    else:
+        print_report(result, max(1, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
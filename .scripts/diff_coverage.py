@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Diff coverage: are the Lua lines changed since a git base ref covered by tests?
+
+Reads `git diff -U0` against the base (or the staged changes with --staged),
+then looks up only the touched files' line hits:
+
+  - luacov.report.out: through its .index (see _luacov_report.IndexedReport),
+    so just those files' sections are read;
+  - otherwise luacov.stats.out: only the touched files' count lines are decoded,
+    and executable lines are classified from the current sources.
+
+Usage (from mod root):
+  python .scripts/diff_coverage.py                       # against origin/main
+  python .scripts/diff_coverage.py --base HEAD~3
+  python .scripts/diff_coverage.py --staged --fail-under 80
+  python .scripts/diff_coverage.py --json
+
+Exits with code 1 if --fail-under is given and diff coverage is below it.
+Changed lines that are not executable (comments, blank lines, `end`) are ignored.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _luacov_report import IndexedReport  # noqa: E402
+from _luacov_stats import EXECUTABLE, default_resolver, line_classes, read_stats  # noqa: E402
+
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+# per line (index 0 = line 1): hit count, or None if the line is not executable
+LineHits = List[Optional[int]]
+
+
+class FileDiffCoverage(NamedTuple):
+    path: str
+    covered: List[int]
+    uncovered: List[int]
+    unknown: bool  # no coverage data for this file at all
+
+
+def changed_lines(base: Optional[str], staged: bool, repo: Path) -> Dict[str, Set[int]]:
+    """Mod-relative .lua path -> line numbers added or modified in the new version."""
+    cmd = ["git", "diff", "-U0", "--no-color", "--no-ext-diff"]
+    if staged:
+        cmd.append("--cached")
+    if base:
+        cmd.append(base)
+    cmd += ["--", "*.lua"]
+    out = subprocess.run(cmd, cwd=repo, capture_output=True, text=True, check=True).stdout
+    changes: Dict[str, Set[int]] = {}
+    current: Optional[Set[int]] = None
+    for line in out.splitlines():
+        if line.startswith("+++ "):
+            target = line[4:]
+            current = changes.setdefault(target[2:], set()) if target.startswith("b/") else None
+        elif current is not None and line.startswith("@@"):
+            m = _HUNK_RE.match(line)
+            if m:
+                start = int(m.group(1))
+                count = int(m.group(2)) if m.group(2) is not None else 1
+                current.update(range(start, start + count))
+    return {path: lines for path, lines in changes.items() if lines}
+
+
+def _ranges(lines: List[int]) -> str:
+    """[3, 4, 5, 9] -> "3-5, 9"."""
+    out: List[str] = []
+    i = 0
+    while i < len(lines):
+        j = i
+        while j + 1 < len(lines) and lines[j + 1] == lines[j] + 1:
+            j += 1
+        out.append(str(lines[i]) if i == j else f"{lines[i]}-{lines[j]}")
+        i = j + 1
+    return ", ".join(out)
+
+
+def hits_from_report(report_path: Path, paths: List[str]) -> Dict[str, LineHits]:
+    hits: Dict[str, LineHits] = {}
+    with IndexedReport.open(report_path) as report:
+        for path in paths:
+            name = report.resolve(path)
+            fh = report.file_hits(name) if name is not None else None
+            if fh is not None:
+                hits[path] = fh.hits
+    return hits
+
+
+def hits_from_stats(stats_path: Path, paths: List[str], repo: Path) -> Dict[str, LineHits]:
+    resolve = default_resolver(stats_path.parent, repo)
+    wanted = set(paths)
+    rel_of: Dict[str, str] = {}
+
+    def want(name: str) -> bool:
+        source = resolve(name)
+        if source is None:
+            return False
+        try:
+            rel = source.resolve().relative_to(repo).as_posix()
+        except ValueError:
+            return False
+        rel_of[name] = rel
+        return rel in wanted
+
+    hits: Dict[str, LineHits] = {}
+    for name, counts in read_stats(stats_path, want):
+        rel = rel_of[name]
+        source = (repo / rel).read_text(encoding="utf-8", errors="replace")
+        per_line: LineHits = []
+        for i, cls in enumerate(line_classes(source)):
+            n = counts[i] if i < len(counts) else 0
+            per_line.append(n if n > 0 else 0 if cls == EXECUTABLE else None)
+        hits[rel] = per_line
+    return hits
+
+
+def diff_coverage(
+    changes: Dict[str, Set[int]], hits: Dict[str, LineHits]
+) -> List[FileDiffCoverage]:
+    """Changed executable lines of each file split into covered / uncovered."""
+    results: List[FileDiffCoverage] = []
+    for path in sorted(changes):
+        file_hits = hits.get(path)
+        if file_hits is None:
+            results.append(FileDiffCoverage(path, [], sorted(changes[path]), True))
+            continue
+        covered: List[int] = []
+        uncovered: List[int] = []
+        for ln in sorted(changes[path]):
+            h = file_hits[ln - 1] if ln <= len(file_hits) else None
+            if h is None:
+                continue
+            (covered if h > 0 else uncovered).append(ln)
+        results.append(FileDiffCoverage(path, covered, uncovered, False))
+    return results
+
+
+def _totals(results: List[FileDiffCoverage]) -> Tuple[int, int]:
+    covered = sum(len(r.covered) for r in results if not r.unknown)
+    total = covered + sum(len(r.uncovered) for r in results if not r.unknown)
+    return covered, total
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Coverage of the Lua lines changed since a git base")
+    ap.add_argument(
+        "--base",
+        default="origin/main",
+        help="Git ref to diff against (default: origin/main)",
+    )
+    ap.add_argument(
+        "--staged",
+        action="store_true",
+        help="Check the staged changes (pre-commit) instead of the working tree vs --base",
+    )
+    ap.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="luacov.report.out to use (default: tests/luacov.report.out, if present)",
+    )
+    ap.add_argument(
+        "--stats",
+        type=Path,
+        default=None,
+        help="luacov.stats.out to use when there is no report (default: tests/luacov.stats.out)",
+    )
+    ap.add_argument(
+        "--fail-under",
+        type=float,
+        default=None,
+        help="Exit 1 if the changed executable lines are less than this percent covered",
+    )
+    ap.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the result as JSON",
+    )
+    args = ap.parse_args()
+
+    repo = Path(__file__).resolve().parents[1]
+    try:
+        changes = changed_lines(None if args.staged else args.base, args.staged, repo)
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, "stderr", "") or str(e)
+        print(f"ERROR: git diff failed: {stderr.strip()}", file=sys.stderr)
+        return 2
+
+    report_path = args.report or (repo / "tests" / "luacov.report.out")
+    stats_path = args.stats or (repo / "tests" / "luacov.stats.out")
+    paths = sorted(changes)
+    if args.report is not None or (args.stats is None and report_path.is_file()):
+        if not report_path.is_file():
+            print(f"ERROR: report not found: {report_path}", file=sys.stderr)
+            return 2
+        hits = hits_from_report(report_path, paths)
+    elif stats_path.is_file():
+        hits = hits_from_stats(stats_path, paths, repo)
+    else:
+        print("ERROR: no luacov.report.out or luacov.stats.out under tests/", file=sys.stderr)
+        return 2
+
+    results = diff_coverage(changes, hits)
+    covered, total = _totals(results)
+    pct = covered / total * 100 if total else 100.0
+
+    if args.json:
+        payload = {
+            "base": None if args.staged else args.base,
+            "staged": args.staged,
+            "covered": covered,
+            "total": total,
+            "coverage_pct": round(pct, 2),
+            "files": [r._asdict() for r in results],
+        }
+        print(json.dumps(payload, indent=2))
+    else:
+        for r in results:
+            if r.unknown:
+                print(f"{r.path}: no coverage data (file not loaded by any spec)")
+                continue
+            n = len(r.covered) + len(r.uncovered)
+            if n == 0:
+                continue
+            line = f"{r.path}: {len(r.covered)}/{n} changed lines covered"
+            if r.uncovered:
+                line += f"; uncovered: {_ranges(r.uncovered)}"
+            print(line)
+        print(f"TOTAL: {covered}/{total} changed executable lines covered ({pct:.2f}%)")
+
+    if args.fail_under is not None and pct < args.fail_under:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,717 @@
+#!/usr/bin/env python3
+"""
+Event -> handler index: every script.on_event / on_nth_tick / on_init / on_load /
+on_configuration_changed registration in the shipped Lua files, followed
+statically from the registered function down to the mod functions that handle
+the event, with the dispatch layers in between.
+
+A registration's handler expression is evaluated the way the dispatchers build
+it (see _lua_modules.py for name resolution):
+
+  - wrapper factories: create_safe_event_handler(h, name) / create_safe_handler(...)
+    return a closure; the closure is one layer and h is followed from its call
+    site (handler(event), pcall(handler, event), xpcall(function() ... end));
+  - table-driven registrations: script.on_event(event_type, ...) in a loop over
+    a table such as core_events or default_custom_input_handlers is expanded
+    into one registration per table entry (constructor fields and T[k] = v
+    assignments), and for _, e in ipairs(T) loops use e[1] / e[2];
+  - functions defined in the registering file (shared_on_gui_click,
+    dispatch_tag_editor_event, ...) are dispatch layers too: only calls that
+    pass the event on (the parameter holding it, as a whole argument) are
+    followed, and the callee's parameter in that position holds it next. A
+    function that passes the event nowhere (or takes none, like most
+    on_nth_tick closures) handles it inline; one defined in another file is a
+    handler and ends the chain.
+
+Registrations are flagged high-frequency for the events in HIGH_FREQUENCY_EVENTS
+and for on_nth_tick(n) with n <= 10 (60/n runs per second, as in ups_lint.py);
+an on_nth_tick handler that deregisters its own period is one-shot.
+
+For each registration the index lists its wrapper depth (dispatch layers before
+the deepest handler), the handlers it fans out to, and what the handlers reach
+through resolvable calls: how many functions and modules, any require() run at
+event time, and the GuiEventBus notifications they queue for the observers in
+gui_observer.lua (drained on on_nth_tick(2)). An event registered from more
+than one place is flagged: Factorio keeps only the last on_event per event.
+
+Usage (from mod root):
+  python .scripts/event_handler_index.py
+  python .scripts/event_handler_index.py --event on_gui_click --event on_tick
+  python .scripts/event_handler_index.py --json > event_handlers.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _lua_files import REPO_ROOT, iter_lua_files  # noqa: E402
+from _lua_lexer import KEYWORD, LONG_STRING, NAME, NUMBER, OP, STRING, string_value  # noqa: E402
+from _lua_modules import Call, FuncDef, LuaModule, ModuleIndex  # noqa: E402
+
+REGISTER_METHODS = ("on_event", "on_nth_tick", "on_init", "on_load", "on_configuration_changed")
+# Events that can fire many times per second in normal play
+HIGH_FREQUENCY_EVENTS = frozenset(
+    (
+        "on_tick",
+        "on_gui_location_changed",
+        "on_gui_text_changed",
+        "on_gui_value_changed",
+        "on_player_changed_position",
+        "on_selected_entity_changed",
+        "on_player_cursor_stack_changed",
+        "on_player_main_inventory_changed",
+        "on_built_entity",
+        "on_pre_build",
+        "on_player_mined_item",
+        "on_pre_player_mined_item",
+        "on_chunk_charted",
+    )
+)
+TICKS_PER_SECOND = 60
+# on_nth_tick(n) is high-frequency up to this period (6 or more runs per second)
+HIGH_FREQUENCY_MAX_PERIOD = 10
+NOTIFY_CALLS = ("notify", "notify_observers_safe")
+MAX_LAYERS = 8
+
+
+class Expr(NamedTuple):
+    """An expression in a module, with the values its free names are bound to."""
+
+    mod: LuaModule
+    start: int
+    end: int
+    env: Dict[str, "Expr"]
+
+
+class Target(NamedTuple):
+    fd: FuncDef
+    env: Dict[str, Expr]
+    wrapper: str  # factory name if fd is the closure a wrapper factory returned
+
+
+class Chain:
+    """One registration followed down to its handlers."""
+
+    def __init__(self, event: str, rel: str, line: int) -> None:
+        self.event = event
+        self.rel = rel
+        self.line = line
+        self.layers: List[Dict[str, Any]] = []
+        self.handlers: List[Dict[str, Any]] = []
+        self.unresolved = 0
+        self.one_shot = False  # the handler deregisters itself (script.on_nth_tick(n, nil))
+
+    def dedupe(self) -> None:
+        """One entry per function: the deepest path to a handler, the first to a layer."""
+        handlers: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for h in self.handlers:
+            key = (h["file"], h["line"])
+            if key not in handlers or h["depth"] > handlers[key]["depth"]:
+                handlers[key] = h
+        self.handlers = sorted(handlers.values(), key=lambda h: (h["depth"], h["file"], h["line"]))
+        seen: Set[Tuple[str, int]] = set()
+        layers = []
+        for layer in self.layers:
+            key = (layer["file"], layer["line"])
+            if key not in seen:
+                seen.add(key)
+                layers.append(layer)
+        self.layers = layers
+
+    @property
+    def depth(self) -> int:
+        depths = [h["depth"] for h in self.handlers] or [len(self.layers)]
+        return max(depths)
+
+
+def event_rate(event: str) -> Optional[float]:
+    """Runs per second of on_tick (60) and on_nth_tick(n) (60/n); None for other events."""
+    if event == "on_tick":
+        return float(TICKS_PER_SECOND)
+    if not (event.startswith("on_nth_tick(") and event.endswith(")")):
+        return None
+    try:
+        period = float(event[len("on_nth_tick(") : -1])
+    except ValueError:
+        return None
+    return TICKS_PER_SECOND / period if period > 0 else None
+
+
+def _text(mod: LuaModule, start: int, end: int) -> str:
+    return " ".join(t.text for t in mod.tokens[start:end])
+
+
+class HandlerIndex:
+    def __init__(self, index: ModuleIndex) -> None:
+        self.index = index
+
+    # -- expression evaluation ------------------------------------------------
+
+    def evaluate(self, expr: Expr, depth: int = 0) -> List[Target]:
+        """Functions an expression can evaluate to."""
+        mod, start, end, env = expr
+        if start >= end or depth > 12:
+            return []
+        tokens = mod.tokens
+        tok = tokens[start]
+        if tok.kind == KEYWORD and tok.text == "function":
+            fd = mod.by_start.get(start)
+            return [Target(fd, env, "")] if fd is not None else []
+        if tok.kind != NAME:
+            return []
+        parts, j = mod.chain(start)
+        if j >= end:
+            return self.evaluate_name(mod, parts, start, env, depth + 1)
+        if tokens[j].kind == OP and tokens[j].text == "[":
+            entry = self._index_value(mod, parts, j, env, depth + 1)
+            return self.evaluate(entry, depth + 1) if entry is not None else []
+        if tokens[j].kind == OP and tokens[j].text == "(":
+            found = []
+            args = mod.split_args(j)
+            for factory in self.evaluate_name(mod, parts, start, env, depth + 1):
+                fmod = self.index.module(factory.fd.rel)
+                closure = self._returned_closure(fmod, factory.fd) if fmod else None
+                if closure is None:
+                    continue
+                bound = dict(factory.env)
+                for param, (a, b) in zip(factory.fd.params, args):
+                    bound[param] = Expr(mod, a, b, env)
+                found.append(Target(closure, bound, factory.fd.name))
+            return found
+        return []
+
+    def evaluate_name(
+        self, mod: LuaModule, parts: List[str], use: int, env: Dict[str, Expr], depth: int
+    ) -> List[Target]:
+        head = parts[0]
+        if head in env:
+            expr: Optional[Expr] = env[head]
+            for field in parts[1:]:
+                expr = self._field(expr, field, depth + 1) if expr is not None else None
+            return self.evaluate(expr, depth + 1) if expr is not None else []
+        if mod.is_param(head, use):
+            return []
+        if head in mod.bindings or mod.by_name.get(".".join(parts)):
+            resolved = [r for r in self.index.resolve(mod, parts) if isinstance(r, FuncDef)]
+            if resolved:
+                return [Target(r, {}, "") for r in resolved]
+        init = mod.local_init(head, use)
+        if init is not None:
+            expr = Expr(mod, init[0], init[1], env)
+            for field in parts[1:]:
+                expr = self._field(expr, field, depth + 1) if expr is not None else None
+            return self.evaluate(expr, depth + 1) if expr is not None else []
+        return [
+            Target(r, {}, "") for r in self.index.resolve(mod, parts) if isinstance(r, FuncDef)
+        ]
+
+    def _constructor(self, expr: Expr, depth: int) -> Optional[Expr]:
+        """The table constructor an expression evaluates to, if it can be found."""
+        mod, start, end, env = expr
+        if depth > 12 or start >= end:
+            return None
+        tokens = mod.tokens
+        if tokens[start].kind == OP and tokens[start].text == "{":
+            return expr
+        if tokens[start].kind != NAME:
+            return None
+        parts, j = mod.chain(start)
+        if j < end and tokens[j].kind == OP and tokens[j].text == "[":
+            entry = self._index_value(mod, parts, j, env, depth + 1)
+            return self._constructor(entry, depth + 1) if entry is not None else None
+        if j < end:
+            return None
+        head = parts[0]
+        if head in env:
+            base: Optional[Expr] = env[head]
+        else:
+            init = mod.local_init(head, start)
+            base = Expr(mod, init[0], init[1], env) if init is not None else None
+        for field in parts[1:]:
+            base = self._field(base, field, depth + 1) if base is not None else None
+        return self._constructor(base, depth + 1) if base is not None else None
+
+    def _field(self, expr: Expr, key: Any, depth: int) -> Optional[Expr]:
+        table = self._constructor(expr, depth)
+        if table is None:
+            return None
+        for k, a, b in table.mod.table_fields(table.start):
+            if k == key:
+                return Expr(table.mod, a, b, table.env)
+        return None
+
+    def _index_value(
+        self, mod: LuaModule, parts: List[str], open_index: int, env: Dict[str, Expr], depth: int
+    ) -> Optional[Expr]:
+        """Value of ``T[...]``: the table entry bound for this registration, or a literal index."""
+        name = ".".join(parts)
+        if name + "[]" in env:
+            return env[name + "[]"]
+        tokens = mod.tokens
+        if tokens[open_index + 1].kind == NUMBER and tokens[open_index + 2].text == "]":
+            base = self._constructor(Expr(mod, open_index - 1, open_index, env), depth)
+            if base is None:
+                base_expr = env.get(parts[0]) if len(parts) == 1 else None
+                base = self._constructor(base_expr, depth) if base_expr else None
+            if base is not None:
+                return self._field(base, int(float(tokens[open_index + 1].text)), depth)
+        return None
+
+    def _returned_closure(self, mod: LuaModule, fd: FuncDef) -> Optional[FuncDef]:
+        """The function a wrapper factory returns: ``return function(...) ... end``."""
+        for i in mod.body_indices(fd):
+            tok = mod.tokens[i]
+            if tok.kind == KEYWORD and tok.text == "return":
+                nxt = i + 1
+                if nxt < fd.end and mod.tokens[nxt].text == "function":
+                    return mod.by_start.get(nxt)
+        return None
+
+    # -- registrations --------------------------------------------------------
+
+    def event_name(self, mod: LuaModule, start: int, end: int, method: str) -> Optional[str]:
+        """Static event name: defines.events.x, a string, a constant, or n for on_nth_tick."""
+        tokens = mod.tokens
+        if start >= end:
+            return None
+        texts = [t.text for t in tokens[start:end]]
+        if texts[:4] == ["defines", ".", "events", "."] and len(texts) == 5:
+            return texts[4]
+        pieces = []
+        for a, b in self._concat_pieces(mod, start, end):
+            tok = tokens[a]
+            if b - a == 1 and tok.kind in (STRING, LONG_STRING):
+                pieces.append(string_value(tok))
+            elif b - a == 1 and tok.kind == NUMBER:
+                pieces.append(f"{float(tok.text):g}")
+            elif tok.kind == NAME:
+                parts, j = mod.chain(a)
+                values = self.index.resolve(mod, parts) if j == b else []
+                value = next((v for v in values if isinstance(v, (str, float))), None)
+                if value is None:
+                    pieces.append(f"<{_text(mod, a, b)}>")
+                else:
+                    pieces.append(value if isinstance(value, str) else f"{value:g}")
+            else:
+                pieces.append(f"<{_text(mod, a, b)}>")
+        if not pieces or (len(pieces) == 1 and pieces[0].startswith("<")):
+            return None
+        name = "".join(pieces)
+        return f"on_nth_tick({name})" if method == "on_nth_tick" else name
+
+    def _concat_pieces(self, mod: LuaModule, start: int, end: int) -> List[Tuple[int, int]]:
+        pieces = []
+        depth = 0
+        a = start
+        for i in range(start, end):
+            tok = mod.tokens[i]
+            if tok.kind == OP and tok.text in ("(", "{", "["):
+                depth += 1
+            elif tok.kind == OP and tok.text in (")", "}", "]"):
+                depth -= 1
+            elif tok.kind == OP and tok.text == ".." and depth == 0:
+                pieces.append((a, i))
+                a = i + 1
+        pieces.append((a, end))
+        return pieces
+
+    def registrations(self, mod: LuaModule) -> List[Tuple[str, str, int, Expr]]:
+        """(event, method, line, handler expression) for every registration in ``mod``."""
+        tokens = mod.tokens
+        found: List[Tuple[str, str, int, Expr]] = []
+        for i in range(len(tokens) - 3):
+            if not (tokens[i].text == "script" and tokens[i + 1].text == "."):
+                continue
+            method = tokens[i + 2].text
+            if method not in REGISTER_METHODS or tokens[i + 3].text != "(":
+                continue
+            args = mod.split_args(i + 3)
+            line = tokens[i].line
+            if method in ("on_event", "on_nth_tick"):
+                if len(args) < 2:
+                    continue
+                (ea, eb), (ha, hb) = args[0], args[1]
+                if hb - ha == 1 and tokens[ha].text == "nil":
+                    continue  # deregistration
+                event = self.event_name(mod, ea, eb, method)
+                if event is not None:
+                    found.append((event, method, line, Expr(mod, ha, hb, {})))
+                else:
+                    for event, env in self._table_driven(mod, method, i, args[0]):
+                        found.append((event, method, line, Expr(mod, ha, hb, env)))
+            elif args:
+                found.append((method, method, line, Expr(mod, args[0][0], args[0][1], {})))
+        return found
+
+    def _table_driven(
+        self, mod: LuaModule, method: str, site: int, event_arg: Tuple[int, int]
+    ) -> List[Tuple[str, Dict[str, Expr]]]:
+        """Expand a registration whose event comes from a table being iterated."""
+        tokens = mod.tokens
+        # Innermost first: the registration may sit in a pcall(function() ... end)
+        scopes = sorted(
+            (fd for fd in mod.funcs if fd.start < site < fd.end), key=lambda fd: -fd.start
+        )
+        for fn in scopes:
+            entries = self._scope_entries(mod, method, site, event_arg, fn)
+            if entries:
+                return entries
+        return []
+
+    def _scope_entries(
+        self, mod: LuaModule, method: str, site: int, event_arg: Tuple[int, int], fn: FuncDef
+    ) -> List[Tuple[str, Dict[str, Expr]]]:
+        tokens = mod.tokens
+        ea, eb = event_arg
+        # for _, e in ipairs(T) do script.on_event(e[1], e[2]) end
+        if eb - ea == 4 and tokens[ea + 1].text == "[" and tokens[ea + 2].kind == NUMBER:
+            var, position = tokens[ea].text, int(float(tokens[ea + 2].text))
+            for i in range(fn.start, site):
+                texts = [t.text for t in tokens[i : i + 7]]
+                if texts[:1] != ["for"] or var not in texts[1:4] or "ipairs" not in texts:
+                    continue
+                k = i + texts.index("ipairs") + 2
+                table = self._constructor(Expr(mod, k, k + 1, {}), 0)
+                if table is None:
+                    return []
+                entries = []
+                for _, a, b in table.mod.table_fields(table.start):
+                    env = {var: Expr(table.mod, a, b, {})}
+                    element = self._field(env[var], position, 0)
+                    event = (
+                        self.event_name(element.mod, element.start, element.end, method)
+                        if element is not None
+                        else None
+                    )
+                    entries.append((event or f"<{_text(mod, ea, eb)}>", env))
+                return entries
+            return []
+        # T[k] indexed in the registering function, k being the event: one per entry of T
+        if eb - ea != 1 or tokens[ea].kind != NAME:
+            return []
+        key = tokens[ea].text
+        for i in range(fn.start, fn.end - 3):
+            tok = tokens[i]
+            if tok.kind != NAME or tokens[i + 1].text != "[" or tokens[i - 1].text in (".", ":"):
+                continue
+            if tokens[i + 2].text != key or tokens[i + 3].text != "]":
+                continue
+            table = self._constructor(Expr(mod, i, i + 1, {}), 0)
+            if table is None:
+                continue
+            entries = []
+            for key, a, b in self._table_entries(mod, tok.text, table):
+                if isinstance(key, tuple):
+                    event = self.event_name(mod, key[0], key[1], method) or (
+                        f"<{_text(mod, key[0], key[1])}>"
+                    )
+                else:
+                    event = str(key)
+                entries.append((event, {tok.text + "[]": Expr(mod, a, b, {})}))
+            if entries:
+                return entries
+        return []
+
+    def _table_entries(
+        self, mod: LuaModule, name: str, table: Expr
+    ) -> List[Tuple[Any, int, int]]:
+        """Keyed fields of a table constructor plus ``name[key] = value`` assignments in ``mod``."""
+        entries = [
+            (k, a, b) for k, a, b in table.mod.table_fields(table.start) if not isinstance(k, int)
+        ]
+        tokens = mod.tokens
+        for i in range(len(tokens) - 2):
+            if tokens[i].text != name or tokens[i + 1].text != "[":
+                continue
+            if i > 0 and tokens[i - 1].text in (".", ":"):
+                continue
+            close = mod.expr_end(i + 2)
+            if close + 1 < len(tokens) and tokens[close + 1].text == "=" and (
+                tokens[close].text == "]"
+            ):
+                entries.append(((i + 2, close), close + 2, mod.expr_end(close + 2)))
+        return entries
+
+    # -- chains ---------------------------------------------------------------
+
+    def _event_calls(self, mod: LuaModule, fd: FuncDef) -> List[Tuple[Call, List[Tuple[int, int]]]]:
+        """Calls in fd's body with their argument ranges; pcall/xpcall closures are inlined."""
+        tokens = mod.tokens
+        found = []
+        indices = list(mod.body_indices(fd))
+        pos = 0
+        while pos < len(indices):
+            i = indices[pos]
+            pos += 1
+            tok = tokens[i]
+            if tok.kind == KEYWORD and tok.text == "function":
+                inner = mod.by_start.get(i)
+                if inner is not None and tokens[i - 1].text == "(" and tokens[i - 2].text in (
+                    "pcall",
+                    "xpcall",
+                ):
+                    indices[pos:pos] = mod.body_indices(inner)
+                continue
+            call = mod.call_at(i)
+            if call is None:
+                continue
+            if call.index != i:  # pcall(f, ...): f's arguments are the pcall's
+                open_index = call.index - 1
+            else:
+                _, open_index = mod.chain(i)
+                while tokens[open_index].text in (":",):
+                    open_index += 2
+            if tokens[open_index].text != "(":
+                continue
+            args = mod.split_args(open_index)
+            if call.index != i:  # drop f (and xpcall's message handler)
+                args = args[2:] if tok.text == "xpcall" else args[1:]
+            found.append((call, args))
+        return found
+
+    def follow(self, site: LuaModule, target: Target, chain: Chain, depth: int,
+               path: Set[Tuple[str, int]], event: Optional[str]) -> None:
+        """
+        Add target to the chain. ``event`` is the parameter of target that receives the
+        registration's event (None if it receives none); only calls passing it on are
+        followed, so everything else the function calls is part of handling the event.
+        """
+        fd, env, wrapper = target
+        key = (fd.rel, fd.start)
+        if key in path or depth > MAX_LAYERS:
+            return
+        mod = self.index.module(fd.rel)
+        if mod is None:
+            return
+        if fd.rel != site.rel and not wrapper:
+            chain.handlers.append(
+                {"function": fd.name, "file": fd.rel, "line": fd.line, "depth": depth, "fd": fd}
+            )
+            return
+        kind = f"wrapper from {wrapper}" if wrapper else "dispatch"
+        layer = {
+            "function": fd.name,
+            "file": fd.rel,
+            "line": fd.line,
+            "depth": depth + 1,
+            "kind": kind,
+            "fd": fd,
+        }
+        chain.layers.append(layer)
+        reached = len(chain.handlers)
+        for call, args in self._event_calls(mod, fd) if event is not None else []:
+            positions = [
+                k for k, (a, b) in enumerate(args) if b - a == 1 and mod.tokens[a].text == event
+            ]
+            if not positions:
+                continue
+            targets = self.evaluate_name(mod, list(call.parts), call.index, env, 0)
+            if not targets:
+                chain.unresolved += 1
+            for t in targets:
+                if t.fd.rel == site.rel and not t.wrapper and not t.env:
+                    # Local dispatch helper: bind its parameters to this call's arguments
+                    bound = {p: Expr(mod, a, b, env) for p, (a, b) in zip(t.fd.params, args)}
+                    t = Target(t.fd, bound, "")
+                params = t.fd.params
+                callee_event = params[positions[0]] if positions[0] < len(params) else None
+                self.follow(site, t, chain, depth + 1, path | {key}, callee_event)
+        if len(chain.handlers) == reached and not wrapper:
+            # Nothing further takes the event: this function handles it inline
+            chain.layers.remove(layer)
+            chain.handlers.append(
+                {"function": fd.name, "file": fd.rel, "line": fd.line, "depth": depth, "fd": fd}
+            )
+
+    def _deregisters(self, fd: FuncDef, event: str) -> bool:
+        """Does fd itself call script.on_nth_tick(<same period>, nil)?"""
+        mod = self.index.module(fd.rel)
+        if mod is None:
+            return False
+        tokens = mod.tokens
+        for i in mod.body_indices(fd):
+            texts = [t.text for t in tokens[i : i + 4]]
+            if texts != ["script", ".", "on_nth_tick", "("]:
+                continue
+            args = mod.split_args(i + 3)
+            if len(args) == 2 and _text(mod, *args[1]) == "nil":
+                if self.event_name(mod, args[0][0], args[0][1], "on_nth_tick") == event:
+                    return True
+        return False
+
+    def build(self, site: LuaModule) -> List[Chain]:
+        chains = []
+        for event, method, line, expr in self.registrations(site):
+            chain = Chain(event, site.rel, line)
+            targets = self.evaluate(expr)
+            if not targets:
+                chain.unresolved += 1
+            chain.one_shot = method == "on_nth_tick" and any(
+                self._deregisters(target.fd, event) for target in targets
+            )
+            for target in targets:
+                # Factorio passes the event as the first argument
+                event = target.fd.params[0] if target.fd.params else None
+                self.follow(site, target, chain, 0, set(), event)
+            chain.dedupe()
+            chains.append(chain)
+        return chains
+
+    def reach(self, chain: Chain) -> Dict[str, Any]:
+        """Functions, modules, runtime requires and notifications reached by the handlers."""
+        funcs = self.index.reachable([h["fd"] for h in chain.handlers + chain.layers])
+        files = sorted({fd.rel for fd in funcs.values()})
+        requires: Set[str] = set()
+        notifies: Set[str] = set()
+        for fd in funcs.values():
+            mod = self.index.module(fd.rel)
+            if mod is None:
+                continue
+            tokens = mod.tokens
+            for i in mod.body_indices(fd):
+                tok = tokens[i]
+                if tok.kind != NAME or tokens[i - 1].text in (".", ":"):
+                    if tok.kind == NAME and tok.text in NOTIFY_CALLS and tokens[i + 1].text == "(":
+                        arg = tokens[i + 2]
+                        if arg.kind in (STRING, LONG_STRING):
+                            notifies.add(string_value(arg))
+                    continue
+                if tok.text == "require":
+                    arg = tokens[i + 1]
+                    if arg.text == "(":
+                        arg = tokens[i + 2]
+                    if arg.kind in (STRING, LONG_STRING):
+                        requires.add(string_value(arg))
+        return {
+            "functions": len(funcs),
+            "modules": files,
+            "runtime_requires": sorted(requires),
+            "notifies": sorted(notifies),
+        }
+
+
+def build_index(index: ModuleIndex, rels: List[str]) -> List[Dict[str, Any]]:
+    handlers = HandlerIndex(index)
+    rows = []
+    for rel in rels:
+        mod = index.module(rel)
+        if mod is None:
+            continue
+        for chain in handlers.build(mod):
+            reach = handlers.reach(chain)
+            rate = None if chain.one_shot else event_rate(chain.event)
+            rows.append(
+                {
+                    "event": chain.event,
+                    "file": chain.rel,
+                    "line": chain.line,
+                    "per_second": rate,
+                    "one_shot": chain.one_shot,
+                    "high_frequency": chain.event in HIGH_FREQUENCY_EVENTS
+                    or (rate is not None and rate >= TICKS_PER_SECOND / HIGH_FREQUENCY_MAX_PERIOD),
+                    "wrapper_depth": chain.depth,
+                    "layers": [{k: v for k, v in h.items() if k != "fd"} for h in chain.layers],
+                    "handlers": [
+                        {k: v for k, v in h.items() if k != "fd"} for h in chain.handlers
+                    ],
+                    "unresolved_calls": chain.unresolved,
+                    **reach,
+                }
+            )
+    registered = Counter(row["event"] for row in rows)
+    for row in rows:
+        row["registrations"] = registered[row["event"]]
+    rows.sort(key=lambda r: (not r["high_frequency"], r["event"], r["file"], r["line"]))
+    return rows
+
+
+def print_index(rows: List[Dict[str, Any]]) -> None:
+    events = sorted({r["event"] for r in rows})
+    hot = sum(1 for e in events if any(r["high_frequency"] for r in rows if r["event"] == e))
+    print(f"{len(rows)} registrations of {len(events)} events ({hot} high-frequency)")
+    for row in rows:
+        flags = []
+        if row["one_shot"]:
+            flags.append("one-shot")
+        elif row["per_second"] is not None:
+            flags.append(f"{row['per_second']:.3g}/s")
+        if row["high_frequency"]:
+            flags.append("high-frequency")
+        if row["registrations"] > 1 and not row["event"].startswith("on_nth_tick("):
+            flags.append(f"registered {row['registrations']} times, last one wins")
+        suffix = f"  [{'; '.join(flags)}]" if flags else ""
+        print()
+        print(f"{row['event']}  {row['file']}:{row['line']}{suffix}")
+        print(
+            f"  wrapper depth {row['wrapper_depth']}, {len(row['handlers'])} handlers, "
+            f"reaches {row['functions']} functions in {len(row['modules'])} modules"
+        )
+        for layer in row["layers"]:
+            indent = "  " * layer["depth"]
+            name = layer["function"] if layer["function"] != "<anonymous>" else "function"
+            print(f"  {indent}{name}  ({layer['kind']}, {layer['file']}:{layer['line']})")
+        for h in row["handlers"]:
+            indent = "  " * (h["depth"] + 1)
+            print(f"  {indent}-> {h['function']}  ({h['file']}:{h['line']})")
+        if row["unresolved_calls"]:
+            print(f"  {row['unresolved_calls']} call(s) could not be resolved statically")
+        if row["runtime_requires"]:
+            print(f"  require() at event time: {', '.join(row['runtime_requires'])}")
+        if row["notifies"]:
+            print(f"  queues GuiEventBus notifications: {', '.join(row['notifies'])}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Index event registrations and their handler chains")
+    ap.add_argument(
+        "--event",
+        action="append",
+        default=None,
+        help="Only show this event (repeatable; e.g. on_gui_click, on_nth_tick(2))",
+    )
+    ap.add_argument(
+        "--files",
+        nargs="+",
+        default=None,
+        help="Mod-relative Lua files to scan for registrations (default: all shipped files)",
+    )
+    ap.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the index as JSON",
+    )
+    args = ap.parse_args()
+
+    if args.files is not None:
+        rels = [f.replace("\\", "/") for f in args.files]
+        missing = [rel for rel in rels if not (REPO_ROOT / rel).is_file()]
+        if missing:
+            print(f"ERROR: file not found: {', '.join(missing)}", file=sys.stderr)
+            return 2
+    else:
+        rels = []
+        for path in iter_lua_files(REPO_ROOT):
+            if "script.on_" in path.read_text(encoding="utf-8", errors="replace"):
+                rels.append(path.relative_to(REPO_ROOT).as_posix())
+
+    rows = build_index(ModuleIndex(), rels)
+    if args.event:
+        rows = [r for r in rows if r["event"] in args.event]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_index(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
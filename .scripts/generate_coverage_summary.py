@@ -1,62 +1,35 @@
 import os
-import re
+import sys
 import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _luacov_report import read_report  # noqa: E402
+from _luacov_stats import coverage_from_stats, default_resolver  # noqa: E402
+
+MOD_ROOT = Path(__file__).resolve().parent.parent
 
 def parse_luacov_report(file_path):
     coverage_data = {}
-    current_file = None
     line_counts = {"covered": 0, "not_covered": 0, "total": 0}
-    
-    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-        for line in f:
-            # Look for file headers
-            if line.startswith('=============================================================================='):
-                file_header = next(f, '').strip()
-                if file_header.startswith('=============================================================================='):
-                    continue
-                
-                # Process the previous file if there was one
-                if current_file and current_file in coverage_data:
-                    coverage_data[current_file]['coverage_pct'] = (
-                        (coverage_data[current_file]['covered'] / coverage_data[current_file]['total']) * 100
-                        if coverage_data[current_file]['total'] > 0 else 0
-                    )
-                
-                # Filter to include only our project files
-                if "TeleportFavorites" in file_header and not file_header.endswith('.lua'):
-                    continue
-                
-                current_file = file_header
-                coverage_data[current_file] = {
-                    'covered': 0,
-                    'not_covered': 0,
-                    'total': 0,
-                    'coverage_pct': 0
-                }
-                continue
-                
-            # Count covered and uncovered lines
-            if current_file and current_file in coverage_data:
-                # Count covered lines (those with a number at the beginning)
-                if re.match(r'^\s*\d+', line):
-                    coverage_data[current_file]['covered'] += 1
-                    coverage_data[current_file]['total'] += 1
-                    line_counts['covered'] += 1
-                    line_counts['total'] += 1
-                # Count uncovered lines (those with asterisks)
-                elif re.match(r'^\s*\*+\d+', line):
-                    coverage_data[current_file]['not_covered'] += 1
-                    coverage_data[current_file]['total'] += 1
-                    line_counts['not_covered'] += 1
-                    line_counts['total'] += 1
-    
-    # Process the last file
-    if current_file and current_file in coverage_data:
-        coverage_data[current_file]['coverage_pct'] = (
-            (coverage_data[current_file]['covered'] / coverage_data[current_file]['total']) * 100
-            if coverage_data[current_file]['total'] > 0 else 0
-        )
-    
+
+    # Single streaming pass; see _luacov_report.py for the report layout
+    for record in read_report(file_path):
+        # Filter to include only our project files
+        if "TeleportFavorites" in record.name and not record.name.endswith('.lua'):
+            continue
+
+        coverage_data[record.name] = {
+            'covered': record.covered,
+            'not_covered': record.missed,
+            'total': record.total,
+            'coverage_pct': record.coverage_pct
+        }
+        line_counts['covered'] += record.covered
+        line_counts['not_covered'] += record.missed
+        line_counts['total'] += record.total
+
     # Calculate overall coverage
     overall_coverage = {
         'covered': line_counts['covered'],
@@ -64,7 +37,7 @@ def parse_luacov_report(file_path):
         'total': line_counts['total'],
         'coverage_pct': (line_counts['covered'] / line_counts['total']) * 100 if line_counts['total'] > 0 else 0
     }
-    
+
     return coverage_data, overall_coverage
 
 def filter_mod_files(coverage_data, mod_prefix="v:\\Fac2orios\\2_Gemini\\mods\\TeleportFavorites"):
@@ -78,6 +51,39 @@ def filter_mod_files(coverage_data, mod_prefix="v:\\Fac2orios\\2_Gemini\\mods\\T
     
     return mod_files
 
+def mod_files_from_stats(stats_path):
+    """filter_mod_files output and overall coverage, read from raw luacov stats
+
+    Sources are resolved against this checkout, so no mod prefix is needed. Like
+    parse_luacov_report, the overall figures count every file luacov recorded;
+    only files inside the mod are listed.
+    """
+    resolve = default_resolver(Path(stats_path).parent, MOD_ROOT)
+    mod_files = {}
+    line_counts = {"covered": 0, "not_covered": 0, "total": 0}
+    for source_path, record in coverage_from_stats(stats_path, resolve):
+        line_counts['covered'] += record.covered
+        line_counts['not_covered'] += record.missed
+        line_counts['total'] += record.total
+        try:
+            relative_path = source_path.resolve().relative_to(MOD_ROOT)
+        except ValueError:
+            continue
+        mod_files['\\'.join(relative_path.parts)] = {
+            'covered': record.covered,
+            'not_covered': record.missed,
+            'total': record.total,
+            'coverage_pct': record.coverage_pct
+        }
+
+    overall_coverage = {
+        'covered': line_counts['covered'],
+        'not_covered': line_counts['not_covered'],
+        'total': line_counts['total'],
+        'coverage_pct': (line_counts['covered'] / line_counts['total']) * 100 if line_counts['total'] > 0 else 0
+    }
+    return mod_files, overall_coverage
+
 def group_files_by_directory(mod_files):
     directory_stats = {}
     
@@ -170,11 +176,16 @@ def format_report(mod_files, directory_stats, overall_coverage):
     return report
 
 def main():
+    stats_path = "v:\\Fac2orios\\2_Gemini\\mods\\TeleportFavorites\\tests\\luacov.stats.out"
     report_path = "v:\\Fac2orios\\2_Gemini\\mods\\TeleportFavorites\\tests\\luacov.report.out"
     output_path = "v:\\Fac2orios\\2_Gemini\\mods\\TeleportFavorites\\tests\\coverage_summary.md"
     
-    coverage_data, overall_coverage = parse_luacov_report(report_path)
-    mod_files = filter_mod_files(coverage_data)
+    # Raw stats skip luacov's text report entirely; fall back to the report
+    if os.path.exists(stats_path):
+        mod_files, overall_coverage = mod_files_from_stats(stats_path)
+    else:
+        coverage_data, overall_coverage = parse_luacov_report(report_path)
+        mod_files = filter_mod_files(coverage_data)
     directory_stats = group_files_by_directory(mod_files)
     report = format_report(mod_files, directory_stats, overall_coverage)
     
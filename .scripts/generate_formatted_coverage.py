@@ -1,68 +1,66 @@
 """
-Generate a formatted coverage report from luacov.report.out
+Generate a formatted coverage report from luacov.stats.out (preferred, read
+directly; see _luacov_stats.py) or luacov.report.out
 """
 
 import os
-import re
+import sqlite3
 import sys
 from datetime import datetime
+from pathlib import Path
 
-def extract_module_coverage(content):
-    """Extract coverage information from the luacov report"""
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _luacov_report import iter_file_coverage  # noqa: E402
+from _luacov_stats import coverage_from_stats, default_resolver  # noqa: E402
+from coverage_history import record_run  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+def extract_module_coverage(report):
+    """Extract coverage information from the luacov report
+
+    ``report`` is an iterable of report lines (e.g. an open file), read once in
+    a single streaming pass; a whole-report string is also accepted.
+    """
+    if isinstance(report, str):
+        report = report.splitlines()
     modules = {}
-    current_module = None
-    in_module_section = False
-    covered_lines = 0
-    total_lines = 0
-    
-    # Process line by line
-    lines = content.splitlines()
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        
-        # Module header
-        if line.startswith('='*70):
-            # Save previous module
-            if current_module is not None:
-                modules[current_module] = {
-                    'covered': covered_lines,
-                    'total': total_lines,
-                    'coverage': (covered_lines / total_lines * 100) if total_lines > 0 else 0
-                }
-            
-            # Get next module name (next line)
-            i += 1
-            if i < len(lines) and not lines[i].startswith('='*70):
-                current_module = lines[i]
-                covered_lines = 0
-                total_lines = 0
-                in_module_section = True
-            else:
-                current_module = None
-                in_module_section = False
-        
-        # Count covered lines (starts with number)
-        elif in_module_section and re.match(r'^\s*\d+\s', line):
-            covered_lines += 1
-            total_lines += 1
-        
-        # Count uncovered lines (starts with asterisks)
-        elif in_module_section and re.match(r'^\s*\*+\d+\s', line):
-            total_lines += 1
-            
-        i += 1
-    
-    # Add the last module
-    if current_module is not None and in_module_section:
-        modules[current_module] = {
-            'covered': covered_lines,
-            'total': total_lines,
-            'coverage': (covered_lines / total_lines * 100) if total_lines > 0 else 0
+    for record in iter_file_coverage(report):
+        modules[record.name] = {
+            'covered': record.covered,
+            'total': record.total,
+            'coverage': record.coverage_pct
         }
-    
     return modules
 
+def extract_stats_coverage(stats_path):
+    """Coverage of the mod's own Lua files from raw luacov stats
+
+    Returns (modules, total_covered, total_lines) like filter_project_modules,
+    keyed by path relative to the mod root.
+    """
+    resolve = default_resolver(Path(stats_path).parent, Path(REPO_ROOT))
+    missing = []
+    modules = {}
+    total_covered = 0
+    total_lines = 0
+    for source_path, record in coverage_from_stats(stats_path, resolve, missing.append):
+        try:
+            module_name = source_path.resolve().relative_to(REPO_ROOT).as_posix()
+        except ValueError:
+            continue  # luacov itself, busted, other rocks
+        modules[module_name] = {
+            'covered': record.covered,
+            'total': record.total,
+            'coverage': record.coverage_pct
+        }
+        total_covered += record.covered
+        total_lines += record.total
+    if missing:
+        print(f"Warning: no source found for {len(missing)} file(s) in {stats_path}, e.g. {missing[0]}")
+    return modules, total_covered, total_lines
+
 def filter_project_modules(modules):
     """Filter to include only TeleportFavorites modules"""
     project_modules = {}
@@ -144,39 +142,44 @@ def generate_coverage_report(modules, total_covered, total_lines):
     return "\n".join(report)
 
 def main():
+    # Prefer the raw stats file: no need for luacov to render the text report
+    possible_stats = [
+        "luacov.stats.out",  # When running from tests/ directory
+        "tests/luacov.stats.out"  # When running from project root
+    ]
     # Try multiple possible locations for the report file
     possible_paths = [
         "luacov.report.out",  # When running from tests/ directory
         "tests/luacov.report.out"  # When running from project root
     ]
-    
-    report_path = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            report_path = path
-            break
-    
+
+    stats_path = next((p for p in possible_stats if os.path.exists(p)), None)
+    report_path = next((p for p in possible_paths if os.path.exists(p)), None)
+
     # Check if file exists
-    if not report_path:
-        print(f"Error: luacov.report.out not found in any of these locations: {possible_paths}")
+    if not stats_path and not report_path:
+        print(f"Error: no luacov output found in any of these locations: {possible_stats + possible_paths}")
         return 1
-    
-    # Read the report file
+
+    # Read and process the stats/report in one streaming pass
+    source_path = stats_path or report_path
     try:
-        with open(report_path, 'r', encoding='utf-8', errors='replace') as f:
-            content = f.read()
-    except Exception as e:
-        print(f"Error reading {report_path}: {e}")
+        if stats_path:
+            project_modules, total_covered, total_lines = extract_stats_coverage(stats_path)
+        else:
+            with open(report_path, 'r', encoding='utf-8', errors='replace') as f:
+                modules = extract_module_coverage(f)
+            project_modules, total_covered, total_lines = filter_project_modules(modules)
+    except (OSError, ValueError) as e:
+        print(f"Error reading {source_path}: {e}")
         return 1
-    
-    # Process the report
+
     try:
-        modules = extract_module_coverage(content)
-        project_modules, total_covered, total_lines = filter_project_modules(modules)
         report = generate_coverage_report(project_modules, total_covered, total_lines)
         
         # Determine output path - use current directory if we're in tests/, otherwise use tests/
-        output_path = "coverage_summary.txt" if os.path.exists("luacov.report.out") else "tests/coverage_summary.txt"
+        in_tests_dir = os.path.dirname(source_path) == ""
+        output_path = "coverage_summary.txt" if in_tests_dir else "tests/coverage_summary.txt"
         
         # Output report
         with open(output_path, "w") as f:
@@ -184,6 +187,14 @@ def main():
             
         print(report)
         print(f"\nReport saved to {output_path}")
+
+        # Keep history: the summary file above is overwritten on every run
+        try:
+            rows = [(path, s['covered'], s['total']) for path, s in project_modules.items()]
+            run_id = record_run(rows, source_path)
+            print(f"Coverage history: recorded run #{run_id}")
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: could not record coverage history: {e}")
         
     except Exception as e:
         print(f"Error processing report: {e}")
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Cross-check locale keys in locale/en/strings.cfg against Lua source usage.
+
+One tokenizing pass over the mod's Lua files (core/, gui/, prototypes/ and the
+root *.lua files) builds an inverted index of locale references, which is then
+compared with the keys en/strings.cfg defines:
+
+  UNUSED     en keys that no Lua file refers to
+  UNDEFINED  Lua references to a locale section/key that en does not define
+
+Recognised references:
+  - string literals such as "tf-gui.confirm" (and "tf-gui.prefix_" .. n)
+  - BasicHelpers.get_gui_string / get_error_string / get_string(player, category, key)
+  - prototype names for sections Factorio resolves by name ([controls],
+    [mod-setting-name], ...), e.g. name = "tf-open-tag-editor"
+
+Per-file references are cached in .scripts/.cache/locale_key_index.json keyed by
+size/mtime/content hash, so only edited Lua files are re-tokenized.
+
+Usage (from mod root):
+  python .scripts/locale_key_usage.py
+  python .scripts/locale_key_usage.py --quiet
+  python .scripts/locale_key_usage.py --strict
+
+Exits with code 1 if any UNDEFINED reference is found (with --strict, also
+for UNUSED keys).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+import _lua_lexer  # noqa: E402
+from _locale_cache import DEFAULT_CACHE_PATH, ParseCache  # noqa: E402
+from _locale_parser import ROOT_SECTION, LineKind, read_records  # noqa: E402
+from _lua_lexer import LONG_STRING, NAME, OP, STRING, Token, string_value, tokenize  # noqa: E402
+
+INDEX_PATH = DEFAULT_CACHE_PATH.with_name("locale_key_index.json")
+
+SOURCE_DIRS = ("core", "gui", "prototypes")
+EXCLUDED_FILES = {"factorio.emmy.lua"}
+
+# Mirrors _LOCALE_PREFIXES in core/utils/basic_helpers.lua
+CATEGORY_PREFIXES = {
+    "gui": "tf-gui",
+    "error": "tf-error",
+    "command": "tf-command",
+    "handler": "tf-handler",
+    "setting_name": "mod-setting-name",
+    "setting_desc": "mod-setting-description",
+}
+# helper name -> (fixed category or None, index of the key argument)
+HELPERS = {
+    "get_gui_string": ("gui", 1),
+    "get_error_string": ("error", 1),
+    "get_string": (None, 2),
+}
+
+# Sections Factorio looks up by prototype/setting name rather than by an explicit
+# "section.key" string, so a bare name literal counts as a reference.
+IMPLICIT_SECTIONS = {
+    "controls",
+    "mod-name",
+    "mod-description",
+    "mod-setting-name",
+    "mod-setting-description",
+    "string-mod-setting",
+    "shortcut-name",
+    "item-name",
+    "item-description",
+    "entity-name",
+    "entity-description",
+}
+
+# Literal values that could be locale keys (no spaces, no format characters).
+_REF_RE = re.compile(r"^[A-Za-z0-9_.\-]+$")
+
+# ref -> line numbers, in file order
+RefLines = Dict[str, List[int]]
+
+
+class FileRefs:
+    """References found in one Lua file."""
+
+    __slots__ = ("exact", "prefix")
+
+    def __init__(self, exact: Optional[RefLines] = None, prefix: Optional[RefLines] = None) -> None:
+        self.exact: RefLines = exact if exact is not None else {}
+        self.prefix: RefLines = prefix if prefix is not None else {}
+
+    def add(self, bucket: RefLines, ref: str, line: int) -> None:
+        if _REF_RE.match(ref):
+            bucket.setdefault(ref, []).append(line)
+
+
+def _split_args(tokens: List[Token], open_idx: int) -> Tuple[List[List[Token]], int]:
+    """Split the call arguments starting at tokens[open_idx] == "(" by top-level commas."""
+    args: List[List[Token]] = [[]]
+    depth = 0
+    i = open_idx
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok.kind == OP and tok.text in "({[":
+            depth += 1
+            if depth > 1:
+                args[-1].append(tok)
+        elif tok.kind == OP and tok.text in ")}]":
+            depth -= 1
+            if depth == 0:
+                return args, i
+            args[-1].append(tok)
+        elif depth == 1 and tok.kind == OP and tok.text == ",":
+            args.append([])
+        else:
+            args[-1].append(tok)
+        i += 1
+    return args, i
+
+
+def _literal(arg: List[Token]) -> Tuple[Optional[str], bool]:
+    """(value, is_prefix) for `"lit"` or `"lit" .. expr`; (None, False) otherwise."""
+    if not arg or arg[0].kind not in (STRING, LONG_STRING):
+        return None, False
+    if len(arg) == 1:
+        return string_value(arg[0]), False
+    if arg[1].kind == OP and arg[1].text == "..":
+        return string_value(arg[0]), True
+    return None, False
+
+
+def extract_references(source: str) -> FileRefs:
+    """Single token pass over one Lua file."""
+    refs = FileRefs()
+    tokens = list(tokenize(source, comments=False))
+    n = len(tokens)
+    for i, tok in enumerate(tokens):
+        if tok.kind in (STRING, LONG_STRING):
+            nxt = tokens[i + 1] if i + 1 < n else None
+            is_prefix = nxt is not None and nxt.kind == OP and nxt.text == ".."
+            refs.add(refs.prefix if is_prefix else refs.exact, string_value(tok), tok.line)
+        elif tok.kind == NAME and tok.text in HELPERS and i + 1 < n and tokens[i + 1].text == "(":
+            category, key_idx = HELPERS[tok.text]
+            args, _ = _split_args(tokens, i + 1)
+            if category is None and len(args) > 1:
+                category, _ = _literal(args[1])
+            prefix = CATEGORY_PREFIXES.get(category or "")
+            if prefix is None or len(args) <= key_idx:
+                continue
+            key, is_prefix = _literal(args[key_idx])
+            if key is not None:
+                refs.add(refs.prefix if is_prefix else refs.exact, f"{prefix}.{key}", tok.line)
+    return refs
+
+
+def lua_sources(repo: Path) -> Iterator[Path]:
+    for p in sorted(repo.glob("*.lua")):
+        if not p.name.startswith("."):
+            yield p
+    for d in SOURCE_DIRS:
+        for p in sorted((repo / d).rglob("*.lua")):
+            if p.name not in EXCLUDED_FILES:
+                yield p
+
+
+def _tool_fingerprint() -> str:
+    h = hashlib.sha256()
+    for src in (Path(_lua_lexer.__file__), Path(__file__)):
+        h.update(src.read_bytes())
+    return h.hexdigest()
+
+
+def build_index(
+    repo: Path, index_path: Optional[Path] = INDEX_PATH
+) -> Tuple[Dict[str, FileRefs], int]:
+    """
+    Per-file references for every scanned Lua file; returns (refs_by_file, files_tokenized).
+    Unchanged files (size/mtime, then content hash) come from ``index_path``.
+    """
+    tool = _tool_fingerprint()
+    stored: Dict[str, Any] = {}
+    if index_path is not None:
+        try:
+            data = json.loads(index_path.read_text(encoding="utf-8"))
+            if data.get("tool") == tool:
+                stored = data["files"]
+        except (OSError, ValueError, AttributeError, KeyError):
+            stored = {}
+
+    out: Dict[str, FileRefs] = {}
+    new_entries: Dict[str, Any] = {}
+    tokenized = 0
+    for path in lua_sources(repo):
+        rel = path.relative_to(repo).as_posix()
+        st = os.stat(path)
+        entry = stored.get(rel)
+        if entry and entry["fingerprint"][:2] == [st.st_size, st.st_mtime_ns]:
+            new_entries[rel] = entry
+        else:
+            data_bytes = path.read_bytes()
+            digest = hashlib.sha256(data_bytes).hexdigest()
+            if not (entry and entry["fingerprint"][2] == digest):
+                refs = extract_references(data_bytes.decode("utf-8", errors="replace"))
+                entry = {"exact": refs.exact, "prefix": refs.prefix}
+                tokenized += 1
+            entry = dict(entry, fingerprint=[st.st_size, st.st_mtime_ns, digest])
+            new_entries[rel] = entry
+        out[rel] = FileRefs(entry["exact"], entry["prefix"])
+
+    if index_path is not None and new_entries != stored:
+        # Also drops entries for deleted files, since only scanned files are kept.
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_name(index_path.name + ".tmp")
+        payload = {"tool": tool, "files": new_entries}
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, index_path)
+    return out, tokenized
+
+
+def invert(refs_by_file: Dict[str, FileRefs]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """Inverted index: ref -> ["file:line", ...] for exact and prefix references."""
+    exact: Dict[str, List[str]] = {}
+    prefix: Dict[str, List[str]] = {}
+    for rel, refs in refs_by_file.items():
+        for bucket, target in ((refs.exact, exact), (refs.prefix, prefix)):
+            for ref, lines in bucket.items():
+                target.setdefault(ref, []).extend(f"{rel}:{ln}" for ln in lines)
+    return exact, prefix
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Find unused and undefined locale keys")
+    ap.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Only print the totals line",
+    )
+    ap.add_argument(
+        "--strict",
+        action="store_true",
+        help="Also exit 1 when UNUSED keys exist",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and do not write the cached parse/index files",
+    )
+    args = ap.parse_args()
+
+    repo = Path(__file__).resolve().parents[1]
+    en_path = repo / "locale" / "en" / "strings.cfg"
+    if not en_path.is_file():
+        print(f"ERROR: canonical file not found: {en_path}", file=sys.stderr)
+        return 2
+
+    cache = None if args.no_cache else ParseCache.open()
+    # ref -> (section, key); root keys are referenced by their bare (dotted) name
+    defined: Dict[str, Tuple[str, str]] = {}
+    for rec in read_records(en_path, cache):
+        if rec.kind == LineKind.ENTRY and rec.key is not None and rec.section is not None:
+            ref = rec.key if rec.section == ROOT_SECTION else f"{rec.section}.{rec.key}"
+            defined.setdefault(ref, (rec.section, rec.key))
+    if cache is not None:
+        cache.save()
+
+    refs_by_file, tokenized = build_index(repo, None if args.no_cache else INDEX_PATH)
+    exact, prefix = invert(refs_by_file)
+
+    locale_sections: Set[str] = {sec for sec, _ in defined.values() if sec != ROOT_SECTION}
+    locale_sections.update(CATEGORY_PREFIXES.values())
+
+    unused: List[Tuple[str, str]] = []
+    for ref, (sec, key) in defined.items():
+        if ref in exact or any(ref.startswith(p) for p in prefix):
+            continue
+        if sec in IMPLICIT_SECTIONS and (key in exact or any(key.startswith(p) for p in prefix)):
+            continue
+        unused.append((sec, key))
+
+    undefined: List[Tuple[str, List[str]]] = []
+    for ref in sorted(exact):
+        head, dot, _ = ref.partition(".")
+        if dot and head in locale_sections and ref not in defined:
+            undefined.append((ref, exact[ref]))
+
+    if not args.quiet:
+        print(f"Scanned {len(refs_by_file)} Lua files ({tokenized} tokenized, rest cached)")
+        print()
+        print(f"UNUSED ({len(unused)}):")
+        for sec, key in unused:
+            print(f"  [{sec}] {key}")
+        print()
+        print(f"UNDEFINED ({len(undefined)}):")
+        for ref, where in undefined:
+            print(f"  {ref}  ({', '.join(where)})")
+        print()
+
+    print(
+        "TOTAL: "
+        f"KEYS={len(defined)} REFERENCED={len(defined) - len(unused)} "
+        f"UNUSED={len(unused)} UNDEFINED={len(undefined)}"
+    )
+
+    if undefined or (args.strict and unused):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
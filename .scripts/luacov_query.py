@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Query luacov.report.out through its .index file (see _luacov_report.IndexedReport).
+
+Only the requested byte range of the report is read, so looking up one file or
+the summary costs O(section size) rather than a scan of the whole report.
+
+Usage (from mod root):
+  python .scripts/luacov_query.py --summary
+  python .scripts/luacov_query.py core/cache/cache.lua
+  python .scripts/luacov_query.py core/cache/cache.lua --lines
+  python .scripts/luacov_query.py --list
+
+The report defaults to tests/luacov.report.out, then tests/output/luacov.report.out.
+Exits with code 1 if a requested file is not in the report.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _luacov_report import IndexedReport  # noqa: E402
+
+
+def default_report(repo: Path) -> Optional[Path]:
+    for sub in ("tests", "tests/output"):
+        candidate = repo / sub / "luacov.report.out"
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Look up coverage in luacov.report.out via its index")
+    ap.add_argument(
+        "files",
+        nargs="*",
+        help="Files to report, as luacov names them or by path suffix (e.g. core/cache/cache.lua)",
+    )
+    ap.add_argument(
+        "--summary",
+        action="store_true",
+        help="Print the report's summary table",
+    )
+    ap.add_argument(
+        "--lines",
+        action="store_true",
+        help="Also print each requested file's annotated source section",
+    )
+    ap.add_argument(
+        "--list",
+        action="store_true",
+        help="List the files in the report",
+    )
+    ap.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Path to luacov.report.out (its index is <report>.index)",
+    )
+    args = ap.parse_args()
+    if not (args.files or args.summary or args.list):
+        ap.error("give file names, --summary or --list")
+
+    repo = Path(__file__).resolve().parents[1]
+    report_path = args.report or default_report(repo)
+    if report_path is None or not report_path.is_file():
+        missing = report_path or "tests/luacov.report.out"
+        print(f"ERROR: luacov report not found: {missing}", file=sys.stderr)
+        return 2
+
+    status = 0
+    with IndexedReport.open(report_path) as report:
+        if not report.indexed:
+            print(f"WARNING: no usable index for {report_path}; scanning it", file=sys.stderr)
+
+        if args.list:
+            for name in report.names():
+                print(name)
+
+        for query in args.files:
+            name = report.resolve(query)
+            cov = report.file_coverage(name) if name is not None else None
+            if cov is None:
+                print(f"{query}: not in report")
+                status = 1
+                continue
+            print(
+                f"{cov.name}: {cov.covered}/{cov.total} lines "
+                f"({cov.coverage_pct:.2f}%), {cov.missed} missed"
+            )
+            if args.lines:
+                text = report.section(cov.name)
+                if text is not None:
+                    print(text, end="" if text.endswith("\n") else "\n")
+
+        if args.summary:
+            rows = report.summary()
+            width = max((len(r.name) for r in rows), default=4)
+            lines: List[str] = [f"{'File':<{width}}  {'Hits':>6} {'Missed':>6} {'Coverage':>8}"]
+            for r in rows:
+                pct = f"{r.coverage_pct:.2f}%"
+                lines.append(f"{r.name:<{width}}  {r.hits:>6} {r.missed:>6} {pct:>8}")
+            print("\n".join(lines))
+
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
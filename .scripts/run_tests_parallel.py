@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Run the test suite in parallel: spec files are split into shards, each shard runs
+tests/infrastructure/run_all_tests.lua in its own Lua process, and the shards'
+luacov hit counts are merged into one tests/luacov.stats.out afterwards.
+
+Each shard gets TF_LUACOV_STATSFILE, so it saves its counts to
+tests/output/shards/shard-<n>.stats.out instead of the shared stats file and
+skips the per-run reporting. Hit counts are summed per file and line, so the
+merged stats (and everything computed from them: generate_formatted_coverage.py,
+coverage_history.py, ...) match a sequential run of the same specs.
+
+Shards are balanced longest-first by each spec's median duration over recent
+runs (tests/output/test_timings_history.jsonl, see _test_timings.py); specs with
+no history are estimated from their file size. Each shard's output is kept in
+tests/output/shards/shard-<n>.log, and the shards' timings are merged into
+tests/output/test_timings.json and appended to the history.
+
+Usage (from mod root):
+  python .scripts/run_tests_parallel.py                      # one shard per CPU
+  python .scripts/run_tests_parallel.py --jobs 4
+  python .scripts/run_tests_parallel.py cache_spec gui_observer_spec
+  python .scripts/run_tests_parallel.py --no-coverage-summary --text-report
+
+Exits with code 1 if any test failed or a spec file could not be loaded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _luacov_stats import merge_stats, write_stats  # noqa: E402
+from _test_timings import (  # noqa: E402
+    LATEST_PATH,
+    append_history,
+    balance_shards,
+    duration_weight,
+    load_history,
+    load_run,
+    merge_runs,
+    spec_durations,
+)
+
+REPO_ROOT = _SCRIPT_DIR.parent
+TESTS_DIR = REPO_ROOT / "tests"
+SHARD_DIR = TESTS_DIR / "output" / "shards"
+
+# Totals printed by run_all_tests.lua's "Overall Test Summary"
+_TOTAL_RE = {
+    "files": re.compile(r"^Test files processed: (\d+)", re.M),
+    "files_failed": re.compile(r"^Test files failed: (\d+)", re.M),
+    "passed": re.compile(r"^Total tests passed: (\d+)", re.M),
+    "failed": re.compile(r"^Total tests failed: (\d+)", re.M),
+}
+
+
+class ShardResult(NamedTuple):
+    index: int
+    specs: List[str]
+    returncode: int
+    seconds: float
+    files: int
+    files_failed: int
+    passed: int
+    failed: int
+    stats_path: Optional[Path]  # None when the shard saved no coverage
+    timings_path: Optional[Path]  # None when the shard wrote no timings
+    log_path: Path
+
+
+def spec_files(names: List[str]) -> List[str]:
+    """Spec paths relative to tests/ ("specs/x_spec.lua"), all specs if ``names`` is empty."""
+    if not names:
+        found = TESTS_DIR.glob("specs/*_spec.lua")
+        return sorted(p.relative_to(TESTS_DIR).as_posix() for p in found)
+    specs = []
+    for name in names:
+        name = name.replace("\\", "/")
+        if not name.startswith("specs/"):
+            name = "specs/" + name
+        if not name.endswith(".lua"):
+            name += ".lua"
+        specs.append(name)
+    return specs
+
+
+def spec_size(spec: str) -> int:
+    try:
+        return (TESTS_DIR / spec).stat().st_size
+    except OSError:
+        return 0
+
+
+def make_shards(specs: List[str], count: int) -> List[List[str]]:
+    """Longest-first split by historical duration (file size for specs never timed)."""
+    weight = duration_weight(spec_durations(load_history()), spec_size)
+    return balance_shards(specs, count, weight)
+
+
+def _total(name: str, output: str) -> int:
+    m = _TOTAL_RE[name].search(output)
+    return int(m.group(1)) if m else 0
+
+
+def run_shard(index: int, specs: List[str], lua: str) -> ShardResult:
+    stats_path = SHARD_DIR / f"shard-{index}.stats.out"
+    timings_path = SHARD_DIR / f"shard-{index}.timings.json"
+    log_path = SHARD_DIR / f"shard-{index}.log"
+    for stale in (stats_path, timings_path):
+        if stale.exists():
+            stale.unlink()
+    env = dict(
+        os.environ, TF_LUACOV_STATSFILE=str(stats_path), TF_TEST_TIMINGS_FILE=str(timings_path)
+    )
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [lua, "infrastructure/run_all_tests.lua", *specs],
+        cwd=TESTS_DIR,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+    )
+    seconds = time.perf_counter() - start
+    log_path.write_text(proc.stdout, encoding="utf-8")
+    return ShardResult(
+        index=index,
+        specs=specs,
+        returncode=proc.returncode,
+        seconds=seconds,
+        files=_total("files", proc.stdout),
+        files_failed=_total("files_failed", proc.stdout),
+        passed=_total("passed", proc.stdout),
+        failed=_total("failed", proc.stdout),
+        stats_path=stats_path if stats_path.is_file() else None,
+        timings_path=timings_path if timings_path.is_file() else None,
+        log_path=log_path,
+    )
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Run spec files in parallel shards, merging coverage")
+    ap.add_argument(
+        "specs",
+        nargs="*",
+        help="Spec files to run (default: every tests/specs/*_spec.lua)",
+    )
+    ap.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=0,
+        help="Number of shards / Lua processes (default: CPU count)",
+    )
+    ap.add_argument(
+        "--lua",
+        default=os.environ.get("LUA", "lua"),
+        help="Lua interpreter to run (default: $LUA or lua)",
+    )
+    ap.add_argument(
+        "--stats",
+        type=Path,
+        default=TESTS_DIR / "luacov.stats.out",
+        help="Merged stats file to write (default: tests/luacov.stats.out)",
+    )
+    ap.add_argument(
+        "--no-coverage-summary",
+        action="store_true",
+        help="Do not run generate_formatted_coverage.py on the merged stats",
+    )
+    ap.add_argument(
+        "--text-report",
+        action="store_true",
+        help="Also render luacov.report.out from the merged stats (slow on the full suite)",
+    )
+    args = ap.parse_args()
+
+    specs = spec_files(args.specs)
+    if not specs:
+        print("ERROR: no spec files found under tests/specs", file=sys.stderr)
+        return 2
+    missing = [s for s in specs if not (TESTS_DIR / s).is_file()]
+    if missing:
+        print(f"ERROR: spec file not found: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    shards = make_shards(specs, args.jobs or os.cpu_count() or 1)
+    SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    print(f"Running {len(specs)} spec files in {len(shards)} shards")
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+            results = list(
+                pool.map(lambda job: run_shard(job[0], job[1], args.lua), enumerate(shards))
+            )
+    except OSError as e:
+        print(f"ERROR: could not start {args.lua}: {e}", file=sys.stderr)
+        return 2
+    wall = time.perf_counter() - start
+
+    for r in results:
+        status = "ok" if r.returncode == 0 and not r.failed and not r.files_failed else "FAILED"
+        print(
+            f"  shard {r.index}: {len(r.specs)} specs, {r.passed} passed, {r.failed} failed, "
+            f"{r.seconds:.1f}s  [{status}]  {r.log_path.relative_to(REPO_ROOT).as_posix()}"
+        )
+
+    files = sum(r.files for r in results)
+    files_failed = sum(r.files_failed for r in results)
+    passed = sum(r.passed for r in results)
+    failed = sum(r.failed for r in results)
+    crashed = [r for r in results if r.returncode != 0]
+    print("\n==== Overall Test Summary ====")
+    print(f"Test files processed: {files}")
+    print(f"Test files failed: {files_failed}")
+    print(f"Total tests passed: {passed}")
+    print(f"Total tests failed: {failed}")
+    print(f"Wall time: {wall:.1f}s (sum of shards {sum(r.seconds for r in results):.1f}s)")
+
+    shard_runs = []
+    for r in results:
+        if r.timings_path is not None:
+            try:
+                shard_runs.append(load_run(r.timings_path))
+            except (OSError, ValueError) as e:
+                print(f"WARNING: ignoring shard {r.index} timings: {e}", file=sys.stderr)
+    if shard_runs:
+        run = merge_runs(shard_runs)
+        run["wall_seconds"] = wall
+        run["shards"] = len(shards)
+        LATEST_PATH.write_text(json.dumps(run, indent=2) + "\n", encoding="utf-8")
+        append_history(run)
+
+    stats_files = [r.stats_path for r in results if r.stats_path is not None]
+    if stats_files:
+        write_stats(args.stats, merge_stats(stats_files))
+        print(f"Merged coverage of {len(stats_files)} shards into {args.stats}")
+        if args.text_report:
+            subprocess.run(
+                [args.lua, "-e", "require('luacov.reporter').report()"],
+                cwd=args.stats.parent,
+                check=False,
+            )
+        if not args.no_coverage_summary:
+            subprocess.run(
+                [sys.executable, str(_SCRIPT_DIR / "generate_formatted_coverage.py")],
+                cwd=REPO_ROOT,
+                check=False,
+            )
+    elif results:
+        print("No shard saved coverage stats (LuaCov not installed?)")
+
+    if crashed:
+        for r in crashed:
+            print(f"ERROR: shard {r.index} exited with code {r.returncode}", file=sys.stderr)
+    return 1 if failed or files_failed or crashed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Test impact selection: run only the specs that can observe the files changed
+since a git base, instead of the whole suite.
+
+Each spec is mapped to the repo files it depends on, from two sources:
+
+  - static: require("...") calls in the spec and, transitively, in every module
+    it requires (resolved like run_all_tests.lua's package.path, from tests/);
+  - coverage: the files LuaCov saw each spec execute in the last run that ran
+    it ("covered_files" in tests/output/test_timings.json, see _test_timings.py).
+    This catches modules reached without a literal require.
+
+The map is cached in .scripts/.cache/test_impact_map.json: per-file require
+lists are keyed by (size, mtime, sha256), so only edited files are re-tokenized,
+and per-spec coverage survives partial runs. Falls back to the full suite when
+the map cannot be trusted: the test infrastructure changed, or a spec that was
+not itself changed has no coverage data yet (run the full suite once with LuaCov).
+
+Usage (from mod root):
+  python .scripts/select_tests.py                    # changes vs HEAD (incl. untracked)
+  python .scripts/select_tests.py --base origin/main --explain
+  python .scripts/select_tests.py --files core/cache/cache.lua
+  python .scripts/select_tests.py --run -- --jobs 2  # run them via run_tests_parallel.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+import _lua_files  # noqa: E402
+import _lua_lexer  # noqa: E402
+from _file_cache import file_fingerprint  # noqa: E402
+from _lua_files import REPO_ROOT, TESTS_DIR, resolve_module  # noqa: E402
+from _lua_lexer import LONG_STRING, NAME, OP, STRING, string_value, tokenize  # noqa: E402
+from _luacov_stats import repo_rel_name  # noqa: E402
+from _test_timings import LATEST_PATH, load_run  # noqa: E402
+
+CACHE_PATH = _SCRIPT_DIR / ".cache" / "test_impact_map.json"
+CACHE_FORMAT = 1
+
+# Changes under these paths can affect every spec
+FULL_RUN_PREFIXES = ("tests/infrastructure/",)
+
+
+def spec_paths() -> List[str]:
+    """Repo-relative paths of every spec file."""
+    found = TESTS_DIR.glob("specs/*_spec.lua")
+    return sorted(p.relative_to(REPO_ROOT).as_posix() for p in found)
+
+
+def static_requires(source: str) -> List[str]:
+    """Module names passed as a literal to require: require("a.b") / require "a.b"."""
+    tokens = list(tokenize(source, comments=False))
+    names: List[str] = []
+    for i, tok in enumerate(tokens):
+        if tok.kind != NAME or tok.text != "require" or i + 1 >= len(tokens):
+            continue
+        if i > 0 and tokens[i - 1].kind == OP and tokens[i - 1].text in (".", ":"):
+            continue  # some_table.require(...)
+        arg = tokens[i + 1]
+        if arg.kind == OP and arg.text == "(" and i + 2 < len(tokens):
+            arg = tokens[i + 2]
+        if arg.kind in (STRING, LONG_STRING):
+            names.append(string_value(arg))
+    return names
+
+
+def _tool_fingerprint() -> str:
+    h = hashlib.sha256(f"format={CACHE_FORMAT}".encode())
+    for src in (Path(__file__), Path(_lua_lexer.__file__), Path(_lua_files.__file__)):
+        h.update(src.read_bytes())
+    return h.hexdigest()
+
+
+class ImpactMap:
+    """Cached spec -> files map (see module docstring)."""
+
+    def __init__(self, cache_path: Path = CACHE_PATH) -> None:
+        self.cache_path = cache_path
+        self.tool = _tool_fingerprint()
+        # rel path -> [size, mtime_ns, digest, [required rel paths]]
+        self.files: Dict[str, List[Any]] = {}
+        # spec rel path -> repo-relative files it executed
+        self.coverage: Dict[str, List[str]] = {}
+        self.coverage_source: Optional[int] = None  # mtime_ns of the imported timings file
+        self._dirty = False
+        self.reparsed = 0
+
+    @classmethod
+    def open(cls, cache_path: Path = CACHE_PATH) -> "ImpactMap":
+        impact = cls(cache_path)
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        if isinstance(data, dict) and data.get("tool") == impact.tool:
+            impact.files = data.get("files", {})
+            impact.coverage = data.get("coverage", {})
+            impact.coverage_source = data.get("coverage_source")
+        else:
+            impact._dirty = True
+        return impact
+
+    def save(self) -> None:
+        for rel in [r for r in self.files if not (REPO_ROOT / r).is_file()]:
+            del self.files[rel]
+            self._dirty = True
+        if not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        payload = {
+            "format": CACHE_FORMAT,
+            "tool": self.tool,
+            "files": self.files,
+            "coverage": self.coverage,
+            "coverage_source": self.coverage_source,
+        }
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+        self._dirty = False
+
+    def import_coverage(self, timings_path: Path = LATEST_PATH) -> None:
+        """Take per-spec covered files from the latest run (only the specs it ran)."""
+        try:
+            mtime = timings_path.stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime == self.coverage_source:
+            return
+        try:
+            run = load_run(timings_path)
+        except (OSError, ValueError):
+            return
+        for spec in run.get("specs", []):
+            covered = spec.get("covered_files")
+            if covered is None:
+                continue
+            rel_spec = "tests/" + spec["spec"].replace("\\", "/")
+            rels = (repo_rel_name(name, TESTS_DIR, REPO_ROOT) for name in covered)
+            files = {rel for rel in rels if rel is not None}
+            self.coverage[rel_spec] = sorted(files)
+        self.coverage_source = mtime
+        self._dirty = True
+
+    def requires(self, rel: str) -> List[str]:
+        """Resolved require targets of one file, re-tokenized only when it changed."""
+        path = REPO_ROOT / rel
+        entry = self.files.get(rel)
+        try:
+            fp = file_fingerprint(path, (entry[0], entry[1], entry[2]) if entry else None)
+        except OSError:
+            return []
+        if entry is not None and entry[2] == fp[2]:
+            if (entry[0], entry[1]) != fp[:2]:
+                # Touched but identical (checkout, rebase): refresh the stat only
+                entry[0], entry[1] = fp[0], fp[1]
+                self._dirty = True
+            return entry[3]
+        source = path.read_text(encoding="utf-8", errors="replace")
+        targets = sorted({t for t in map(resolve_module, static_requires(source)) if t})
+        self.files[rel] = [fp[0], fp[1], fp[2], targets]
+        self._dirty = True
+        self.reparsed += 1
+        return targets
+
+    def static_closure(self, spec: str) -> Set[str]:
+        seen = {spec}
+        stack = [spec]
+        while stack:
+            for dep in self.requires(stack.pop()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return seen
+
+    def spec_files(self, spec: str) -> Tuple[Set[str], Set[str]]:
+        """(static, coverage) file sets of one spec."""
+        return self.static_closure(spec), set(self.coverage.get(spec, ()))
+
+
+def changed_files(base: str) -> List[str]:
+    """Files changed since ``base`` in the working tree (staged or not), plus untracked ones."""
+
+    def git(*args: str) -> List[str]:
+        out = subprocess.run(
+            ["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        return [line for line in out.splitlines() if line]
+
+    files = set(git("diff", "--name-only", "--no-renames", base))
+    files.update(git("ls-files", "--others", "--exclude-standard"))
+    return sorted(files)
+
+
+def select(
+    changed: List[str], impact: ImpactMap, specs: List[str]
+) -> Tuple[Optional[str], Dict[str, List[str]]]:
+    """
+    (full-run reason or None, selected spec -> changed files that selected it).
+    A changed spec always selects itself.
+    """
+    for rel in changed:
+        if rel.startswith(FULL_RUN_PREFIXES):
+            return f"test infrastructure changed ({rel})", {}
+    changed_lua = {rel for rel in changed if rel.endswith(".lua")}
+    selected: Dict[str, List[str]] = {}
+    for spec in specs:
+        static, covered = impact.spec_files(spec)
+        hits = sorted(changed_lua & (static | covered))
+        if hits:
+            selected[spec] = hits
+    unmapped = [s for s in specs if s not in impact.coverage and s not in selected]
+    if unmapped:
+        return f"no coverage data for {len(unmapped)} spec(s), e.g. {unmapped[0]}", {}
+    return None, selected
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Select the specs affected by changed files")
+    ap.add_argument(
+        "--base",
+        default="HEAD",
+        help="Git ref to diff the working tree against (default: HEAD)",
+    )
+    ap.add_argument(
+        "--files",
+        nargs="+",
+        default=None,
+        help="Changed files (repo-relative) instead of asking git",
+    )
+    ap.add_argument(
+        "--explain",
+        action="store_true",
+        help="Show which changed files selected each spec",
+    )
+    ap.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the selection as JSON",
+    )
+    ap.add_argument(
+        "--run",
+        action="store_true",
+        help="Run the selected specs with run_tests_parallel.py (arguments after -- go to it)",
+    )
+    args, passthrough = ap.parse_known_args()
+    if passthrough and passthrough[0] == "--":
+        passthrough = passthrough[1:]
+    if passthrough and not args.run:
+        ap.error(f"unrecognized arguments: {' '.join(passthrough)}")
+
+    if args.files is not None:
+        changed = sorted({f.replace("\\", "/") for f in args.files})
+    else:
+        try:
+            changed = changed_files(args.base)
+        except (OSError, subprocess.CalledProcessError) as e:
+            stderr = getattr(e, "stderr", "") or str(e)
+            print(f"ERROR: git failed: {stderr.strip()}", file=sys.stderr)
+            return 2
+
+    specs = spec_paths()
+    impact = ImpactMap.open()
+    impact.import_coverage()
+    full_reason, selected = select(changed, impact, specs)
+    impact.save()
+
+    run_specs = specs if full_reason else sorted(selected)
+    if args.json:
+        payload = {
+            "changed": changed,
+            "full_run": full_reason,
+            "specs": run_specs,
+            "reasons": selected,
+        }
+        print(json.dumps(payload, indent=2))
+    else:
+        if full_reason:
+            print(f"Full run: {full_reason}")
+        print(f"{len(run_specs)} of {len(specs)} specs selected for {len(changed)} changed files")
+        for spec in run_specs:
+            why = f"  <- {', '.join(selected[spec])}" if args.explain and spec in selected else ""
+            print(f"  {spec}{why}")
+
+    if not args.run:
+        return 0
+    if not run_specs:
+        print("Nothing to run")
+        return 0
+    cmd = [sys.executable, str(_SCRIPT_DIR / "run_tests_parallel.py"), *passthrough]
+    if not full_reason:
+        cmd += [Path(spec).name for spec in run_specs]
+    return subprocess.run(cmd, cwd=REPO_ROOT).returncode
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,27 +4,41 @@ Sync non-English locale/template strings.cfg files to match keys in en/strings.c
 
 Removes EXTRA keys, inserts MISSING keys after the best predecessor (en file order).
 
-Dry-run by default; pass --write to modify files.
+Dry-run by default; pass --write to modify files. Each target is rendered in
+memory first; files whose bytes would not change are left alone, and the rest
+are written in parallel (--jobs threads) via temp file + rename, so an
+interrupted run never leaves a half-written strings.cfg. --write also records
+per-file results in .scripts/.cache/locale_sync_manifest.json.
 
 Usage (from mod root):
   python .scripts/sync_locales.py
   python .scripts/sync_locales.py --write
   python .scripts/sync_locales.py --write --placeholder english
+  python .scripts/sync_locales.py --no-cache
+  python .scripts/sync_locales.py --write --jobs 8
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import json
+import os
+import stat
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Set, Tuple
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 
 _SCRIPT_DIR = Path(__file__).resolve().parent
 if str(_SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(_SCRIPT_DIR))
 
+from _locale_cache import ParseCache  # noqa: E402
 from _locale_parser import (  # noqa: E402
     ROOT_SECTION,
+    LineKind,
     LineRecord,
     flatten_en_order,
     load_parsed,
@@ -37,128 +51,225 @@ def detect_newline(raw: str) -> str:
     return "\n"
 
 
-def collect_sections(lines: List[LineRecord]) -> Set[str]:
-    out: Set[str] = {ROOT_SECTION}
-    for rec in lines:
-        if rec.kind == "section" and rec.section:
-            out.add(rec.section)
-    return out
-
-
-def keys_in_lines(lines: List[LineRecord]) -> Set[str]:
-    s: Set[str] = set()
-    for rec in lines:
-        if rec.kind == "entry" and rec.key:
-            s.add(rec.key)
-    return s
-
-
-def line_index_for_key(lines: List[LineRecord], key: str) -> Optional[int]:
-    for i, rec in enumerate(lines):
-        if rec.kind == "entry" and rec.key == key:
-            return i
-    return None
-
-
 def remove_extra_entries(lines: List[LineRecord], en_keys: Set[str]) -> Tuple[List[LineRecord], List[str]]:
     removed: List[str] = []
     kept: List[LineRecord] = []
     for rec in lines:
-        if rec.kind == "entry" and rec.key and rec.key not in en_keys:
+        if rec.kind == LineKind.ENTRY and rec.key and rec.key not in en_keys:
             removed.append(rec.key)
             continue
         kept.append(rec)
     return kept, removed
 
 
-def find_predecessor_key(
+def merge_missing_entries(
+    lines: List[LineRecord],
     en_flat: List[Tuple[str, str, str]],
-    missing_idx: int,
-    keys_in_file: Set[str],
-) -> Optional[str]:
-    for j in range(missing_idx - 1, -1, -1):
-        pk = en_flat[j][1]
-        if pk in keys_in_file:
-            return pk
-    return None
-
-
-def sync_file(
-    path: Path,
-    en_flat: List[Tuple[str, str, str]],
-    en_keys: Set[str],
-    placeholder: str,
-    dry_run: bool,
-) -> Tuple[bool, List[str], List[str]]:
+    nl: str,
+    fill_english: bool,
+) -> Tuple[List[LineRecord], List[str]]:
     """
-    Returns (changed, removed_keys, inserted_keys)
+    Insert en keys missing from ``lines``; returns (new_lines, inserted_keys).
+
+    Each missing key goes right after its predecessor in en order (or at the top
+    of the file for the first en key), with a [section] header first if that
+    section does not exist yet. By the time a key is placed every earlier en key
+    is present, so the predecessor is always the previous en entry; insertions
+    therefore form a tree of "after this line" anchors, built in one pass over
+    en_flat and emitted in one pass over ``lines``. Several insertions after the
+    same line come out most-recent first, matching repeated list.insert(pos).
     """
-    raw, lines, _, _ = load_parsed(path)
-    file_nl = detect_newline(raw)
-    nl = file_nl
-
-    is_template = path.name == "template_strings.cfg"
-
-    new_lines, removed = remove_extra_entries(lines, en_keys)
-    keys_now = keys_in_lines(new_lines)
-
+    n = len(lines)
+    start = -1  # anchor id for "top of file"; original lines are 0..n-1
+    first_line_for_key: Dict[str, int] = {}
+    sections_now: Set[str] = {ROOT_SECTION}
+    for i, rec in enumerate(lines):
+        if rec.kind == LineKind.ENTRY and rec.key:
+            first_line_for_key.setdefault(rec.key, i)
+        elif rec.kind == LineKind.SECTION and rec.section:
+            sections_now.add(rec.section)
+
+    # Planned blocks get ids n, n+1, ...; children[anchor] is in insertion order.
+    blocks: List[List[LineRecord]] = []
+    children: Dict[int, List[int]] = {}
     inserted: List[str] = []
-    changed = bool(removed)
 
-    # Insert missing keys in en file order
     for idx, (sec, key, val_en) in enumerate(en_flat):
-        if key in keys_now:
+        if key in first_line_for_key:
             continue
 
-        pred = find_predecessor_key(en_flat, idx, keys_now)
-        if pred is not None:
-            li = line_index_for_key(new_lines, pred)
-            if li is None:
-                raise RuntimeError(f"{path}: predecessor {pred} not found after prune")
-            pos = li + 1
-        else:
-            pos = 0
-
-        need_section_header = sec != ROOT_SECTION and sec not in collect_sections(new_lines)
-
-        # Value for new entry
-        if is_template or placeholder == "empty":
-            val = ""
+        if idx == 0:
+            anchor = start
         else:
-            val = val_en
-
-        to_insert: List[LineRecord] = []
-        if need_section_header:
-            to_insert.append(
-                LineRecord(
-                    kind="section",
-                    text=f"[{sec}]{nl}",
-                    section=sec,
-                )
-            )
-        to_insert.append(
+            pred = en_flat[idx - 1][1]
+            anchor = first_line_for_key.get(pred, start)
+
+        block: List[LineRecord] = []
+        if sec != ROOT_SECTION and sec not in sections_now:
+            block.append(LineRecord(kind=LineKind.SECTION, text=f"[{sec}]{nl}", section=sec))
+            sections_now.add(sec)
+        val = val_en if fill_english else ""
+        block.append(
             LineRecord(
-                kind="entry",
+                kind=LineKind.ENTRY,
                 text=f"{key}={val}{nl}",
                 section=sec,
                 key=key,
-                value=val,
             )
         )
 
-        # Insert section+entry at pos; if need header, both in order
-        for i, block in enumerate(to_insert):
-            new_lines.insert(pos + i, block)
-
-        keys_now.add(key)
+        block_id = n + len(blocks)
+        blocks.append(block)
+        children.setdefault(anchor, []).append(block_id)
+        first_line_for_key[key] = block_id
         inserted.append(key)
-        changed = True
 
-    if changed and not dry_run:
-        out = "".join(rec.text for rec in new_lines)
-        path.write_text(out, encoding="utf-8")
+    if not blocks:
+        return lines, inserted
+
+    out: List[LineRecord] = []
+
+    def emit_after(anchor: int) -> None:
+        # Iterative DFS: last-inserted child first, each followed by its own subtree.
+        stack = list(children.get(anchor, ()))
+        while stack:
+            block_id = stack.pop()
+            out.extend(blocks[block_id - n])
+            stack.extend(children.get(block_id, ()))
+
+    emit_after(start)
+    for i, rec in enumerate(lines):
+        out.append(rec)
+        emit_after(i)
+    return out, inserted
+
+
+class SyncPlan(NamedTuple):
+    path: Path
+    changed: bool
+    removed: List[str]
+    inserted: List[str]
+    content: str  # rendered file text; only meaningful when changed
+
 
-    return changed, removed, inserted
+def plan_file(
+    path: Path,
+    en_flat: List[Tuple[str, str, str]],
+    en_keys: Set[str],
+    placeholder: str,
+    cache: Optional[ParseCache] = None,
+) -> SyncPlan:
+    """Render the synced text of ``path`` in memory without touching the file."""
+    raw, lines, _, _ = load_parsed(path, cache)
+    nl = detect_newline(raw)
+
+    is_template = path.name == "template_strings.cfg"
+
+    new_lines, removed = remove_extra_entries(lines, en_keys)
+    fill_english = not is_template and placeholder != "empty"
+    new_lines, inserted = merge_missing_entries(new_lines, en_flat, nl, fill_english)
+    changed = bool(removed) or bool(inserted)
+    content = "".join(rec.text for rec in new_lines) if changed else ""
+    return SyncPlan(path, changed, removed, inserted, content)
+
+
+def encode_text(content: str) -> bytes:
+    """Bytes that ``path.write_text(content, encoding="utf-8")`` would have written."""
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return content.encode("utf-8")
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """
+    Replace ``path`` with ``data`` unless it already holds exactly those bytes.
+    Writes a sibling temp file and renames it over ``path``, so an interrupted
+    run leaves either the old or the new file, never a partial one.
+    """
+    try:
+        if path.read_bytes() == data:
+            return False
+        mode: Optional[int] = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = None
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+        raise
+    return True
+
+
+def write_plans(plans: List[SyncPlan], jobs: int) -> List[bool]:
+    """Write every changed plan on a thread pool; returns written flags in input order."""
+    todo = [(i, plan) for i, plan in enumerate(plans) if plan.changed]
+    written = [False] * len(plans)
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(todo) or 1))) as pool:
+        futures = {
+            i: pool.submit(write_if_changed, plan.path, encode_text(plan.content)) for i, plan in todo
+        }
+        for i, future in futures.items():
+            written[i] = future.result()
+    return written
+
+
+def sync_file(
+    path: Path,
+    en_flat: List[Tuple[str, str, str]],
+    en_keys: Set[str],
+    placeholder: str,
+    dry_run: bool,
+    cache: Optional[ParseCache] = None,
+) -> Tuple[bool, List[str], List[str]]:
+    """
+    Returns (changed, removed_keys, inserted_keys)
+    """
+    plan = plan_file(path, en_flat, en_keys, placeholder, cache)
+    if plan.changed and not dry_run:
+        write_if_changed(path, encode_text(plan.content))
+    return plan.changed, plan.removed, plan.inserted
+
+
+SYNC_MANIFEST_PATH = Path(__file__).resolve().parent / ".cache" / "locale_sync_manifest.json"
+
+
+def write_manifest(
+    manifest_path: Path,
+    locale_root: Path,
+    plans: List[SyncPlan],
+    written: List[bool],
+) -> None:
+    """Record what the last --write run did to each target (atomic, like the writes)."""
+    files = {}
+    for plan, did_write in zip(plans, written):
+        if did_write:
+            status = "written"
+        elif plan.changed:
+            status = "identical"  # rendered bytes already on disk
+        else:
+            status = "unchanged"
+        files[plan.path.relative_to(locale_root).as_posix()] = {
+            "status": status,
+            "removed": plan.removed,
+            "inserted": plan.inserted,
+        }
+    manifest = {
+        "locale_root": str(locale_root.resolve()),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "files": files,
+    }
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, manifest_path)
 
 
 def main() -> int:
@@ -180,6 +291,23 @@ def main() -> int:
         default=None,
         help="Path to locale/ (default: <repo>/locale)",
     )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every file from scratch instead of using the on-disk parse cache",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Writer threads for --write (0 = CPU count, default: 0)",
+    )
+    ap.add_argument(
+        "--manifest",
+        type=Path,
+        default=SYNC_MANIFEST_PATH,
+        help="Where --write records per-file results (default: .scripts/.cache/)",
+    )
     args = ap.parse_args()
 
     repo = Path(__file__).resolve().parents[1]
@@ -189,7 +317,8 @@ def main() -> int:
         print(f"ERROR: {en_path} not found", file=sys.stderr)
         return 2
 
-    en_flat = flatten_en_order(en_path)
+    cache = None if args.no_cache else ParseCache.open()
+    en_flat = flatten_en_order(en_path, cache)
     en_keys = {t[1] for t in en_flat}
 
     targets: List[Path] = [locale_root / "template_strings.cfg"]
@@ -204,20 +333,29 @@ def main() -> int:
     if dry_run:
         print("DRY RUN (use --write to apply)\n")
 
+    plans = [plan_file(path, en_flat, en_keys, args.placeholder, cache) for path in targets]
+    if cache is not None:
+        cache.save()
+
+    written = [False] * len(plans)
+    if not dry_run:
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        written = write_plans(plans, jobs)
+        write_manifest(args.manifest, locale_root, plans, written)
+
     any_changed = False
-    for path in targets:
+    for plan in plans:
         try:
-            rel = path.relative_to(repo)
+            rel = plan.path.relative_to(repo)
         except ValueError:
-            rel = path
-        changed, removed, inserted = sync_file(path, en_flat, en_keys, args.placeholder, dry_run)
-        if changed:
+            rel = plan.path
+        if plan.changed:
             any_changed = True
             print(f"{rel}:")
-            if removed:
-                print(f"  removed EXTRA ({len(removed)}): {', '.join(removed)}")
-            if inserted:
-                print(f"  inserted MISSING ({len(inserted)}): {', '.join(inserted)}")
+            if plan.removed:
+                print(f"  removed EXTRA ({len(plan.removed)}): {', '.join(plan.removed)}")
+            if plan.inserted:
+                print(f"  inserted MISSING ({len(plan.inserted)}): {', '.join(plan.inserted)}")
         else:
             print(f"{rel}: (no changes)")
 
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Where does test time go? Reports on the spec/test durations written by
+tests/infrastructure/run_all_tests.lua (see _test_timings.py for the format).
+
+  slowest   slowest spec files (and, with --tests, slowest test cases) of a run
+  compare   per-spec duration change between two runs
+  shards    preview how run_tests_parallel.py would split the specs
+
+Usage (from mod root):
+  python .scripts/test_timings.py slowest
+  python .scripts/test_timings.py slowest --tests --top 30
+  python .scripts/test_timings.py compare                          # last two runs
+  python .scripts/test_timings.py compare --base old.json --current tests/output/test_timings.json
+  python .scripts/test_timings.py shards --jobs 4
+
+compare exits with code 1 if any spec slowed down by more than --threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _test_timings import (  # noqa: E402
+    HISTORY_PATH,
+    LATEST_PATH,
+    Run,
+    duration_weight,
+    load_history,
+    load_run,
+    spec_durations,
+    spec_seconds,
+)
+from run_tests_parallel import make_shards, spec_files, spec_size  # noqa: E402
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:,.1f} ms"
+
+
+def _run_label(run: Run) -> str:
+    shards = f", {run['shards']} shards" if run.get("shards") else ""
+    return f"{run.get('started_at', '?')} ({len(run.get('specs', []))} specs{shards})"
+
+
+def slowest(run: Run, top: int, tests: bool) -> Dict[str, List[Dict[str, object]]]:
+    specs = sorted(run.get("specs", []), key=lambda s: -s.get("seconds", 0.0))[:top]
+    result: Dict[str, List[Dict[str, object]]] = {
+        "specs": [
+            {
+                "spec": s["spec"],
+                "seconds": s.get("seconds", 0.0),
+                "tests": len(s.get("tests", [])),
+                "failed": s.get("failed", 0),
+            }
+            for s in specs
+        ]
+    }
+    if tests:
+        cases = [
+            {
+                "spec": s["spec"],
+                "describe": t.get("describe", ""),
+                "test": t.get("test", ""),
+                "seconds": t.get("seconds", 0.0),
+            }
+            for s in run.get("specs", [])
+            for t in s.get("tests", [])
+        ]
+        cases.sort(key=lambda t: -t["seconds"])
+        result["tests"] = cases[:top]
+    return result
+
+
+def compare(base: Run, current: Run) -> List[Tuple[str, Optional[float], Optional[float]]]:
+    """(spec, base seconds, current seconds) for every spec in either run, biggest change first."""
+    before, after = spec_seconds(base), spec_seconds(current)
+    rows = [(spec, before.get(spec), after.get(spec)) for spec in set(before) | set(after)]
+    rows.sort(key=lambda r: -abs((r[2] or 0.0) - (r[1] or 0.0)))
+    return rows
+
+
+def _pick_runs(base: Optional[Path], current: Optional[Path]) -> Tuple[Run, Run]:
+    history = load_history(last=2)
+    cur = load_run(current) if current else (history[-1] if history else load_run(LATEST_PATH))
+    if base:
+        return load_run(base), cur
+    if len(history) < 2:
+        raise ValueError(f"need two runs in {HISTORY_PATH} (or pass --base)")
+    return history[-2], cur
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Report spec and test durations")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    slow = sub.add_parser("slowest", help="Slowest specs (and test cases) of one run")
+    slow.add_argument(
+        "--run",
+        type=Path,
+        default=LATEST_PATH,
+        help="Timing file to read (default: tests/output/test_timings.json)",
+    )
+    slow.add_argument("--top", type=int, default=15, help="Rows to show (default: 15)")
+    slow.add_argument("--tests", action="store_true", help="Also list the slowest test cases")
+    slow.add_argument("--json", action="store_true", help="Print the result as JSON")
+
+    cmp_p = sub.add_parser("compare", help="Per-spec duration change between two runs")
+    cmp_p.add_argument("--base", type=Path, default=None, help="Baseline run (default: previous)")
+    cmp_p.add_argument("--current", type=Path, default=None, help="Compared run (default: latest)")
+    cmp_p.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Flag specs that got this much slower, as a fraction (default: 0.25)",
+    )
+    cmp_p.add_argument(
+        "--min-ms",
+        type=float,
+        default=5.0,
+        help="Ignore specs whose change is below this many ms (default: 5)",
+    )
+
+    sh = sub.add_parser("shards", help="Preview the longest-first shard split")
+    sh.add_argument("--jobs", "-j", type=int, default=0, help="Shards (default: CPU count)")
+    args = ap.parse_args()
+
+    try:
+        if args.command == "slowest":
+            run = load_run(args.run)
+            result = slowest(run, max(1, args.top), args.tests)
+            if args.json:
+                print(json.dumps(result, indent=2))
+                return 0
+            print(f"Run {_run_label(run)}, {_ms(run.get('seconds', 0.0))} CPU")
+            print(f"Slowest specs (top {len(result['specs'])}):")
+            for row in result["specs"]:
+                failed = f", {row['failed']} failed" if row["failed"] else ""
+                print(f"  {_ms(row['seconds']):>12}  {row['spec']}  ({row['tests']} tests{failed})")
+            if args.tests:
+                print(f"\nSlowest tests (top {len(result['tests'])}):")
+                for row in result["tests"]:
+                    print(
+                        f"  {_ms(row['seconds']):>12}  {row['spec']}: "
+                        f"{row['describe']} / {row['test']}"
+                    )
+            return 0
+
+        if args.command == "compare":
+            base, current = _pick_runs(args.base, args.current)
+            print(f"Baseline {_run_label(base)} -> {_run_label(current)}")
+            slower = []
+            for spec, before, after in compare(base, current):
+                if before is None or after is None:
+                    state = "new" if before is None else "removed"
+                    print(f"  {state:>8}  {spec}")
+                    continue
+                delta = after - before
+                if abs(delta) * 1000 < args.min_ms:
+                    continue
+                ratio = delta / before if before else float("inf")
+                flag = ""
+                if ratio > args.threshold:
+                    slower.append(spec)
+                    flag = "  SLOWER"
+                print(f"  {ratio:>+8.0%}  {spec}: {_ms(before)} -> {_ms(after)}{flag}")
+            if not slower:
+                print("  no spec slowed down beyond the threshold")
+            return 1 if slower else 0
+
+        # The runner's own split, so the preview cannot drift from what it runs
+        shards = make_shards(spec_files([]), args.jobs or os.cpu_count() or 1)
+        durations = spec_durations(load_history())
+        weight = duration_weight(durations, spec_size)
+        # Without history the weights are byte counts; do not dress them up as time.
+        fmt = _ms if durations else (lambda size: f"{size:,.0f} B")
+        if not durations:
+            print("No timing history: shards are size-weighted (spec file bytes)")
+        for i, shard in enumerate(shards):
+            load = sum(weight(s) for s in shard)
+            print(f"shard {i}: {fmt(load)} {'estimated' if durations else 'size-weighted'}")
+            for spec in shard:
+                source = "  (estimated from size)" if durations and spec not in durations else ""
+                print(f"  {fmt(weight(spec)):>12}  {spec}{source}")
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Static UPS lint for the tick handlers: every function reachable from the
+on_tick / on_nth_tick registrations in core/events/event_registration_dispatcher.lua
+(through require()d modules, see _lua_modules.py) is scanned for per-call costs
+that add up when they run every tick on a server:
+
+  table        table constructor {...} (an allocation per execution)
+  concat       string concatenation .. (a new string per execution)
+  closure      function defined inside the hot function (a closure per execution)
+  storage-pairs  pairs() over a storage table (walks persistent state)
+  get_player-in-loop  game.get_player / game.players[...] inside a loop
+
+Each function gets an estimated executions per second: 60 for on_tick, 60/n for
+on_nth_tick(n), passed down the call graph and multiplied by --loop-factor for
+each enclosing loop (a callback handed to for_each_* / sort counts as one).
+Diagnostic calls (ErrorHandler.*, log, error) are skipped: they run on error
+and debug paths, so their arguments are not charged and their callees not
+followed. A table after `or` (x = x or {}) is lazy initialisation, not charged.
+The highest-rate path wins, calls back into a caller (recursion) are not
+followed, and conditions are ignored, so estimates are upper bounds. Findings
+are ranked by executions per second.
+
+Usage (from mod root):
+  python .scripts/ups_lint.py
+  python .scripts/ups_lint.py --top 60 --min-rate 1
+  python .scripts/ups_lint.py --json > ups_lint.json
+  python .scripts/ups_lint.py --baseline ups_lint.json   # exit 1 on new findings
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+if str(_SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPT_DIR))
+
+from _lua_lexer import KEYWORD, NAME, NUMBER, OP  # noqa: E402
+from _lua_modules import FuncDef, LuaModule, ModuleIndex  # noqa: E402
+
+DEFAULT_ENTRY = "core/events/event_registration_dispatcher.lua"
+TICKS_PER_SECOND = 60
+KINDS = ("get_player-in-loop", "storage-pairs", "closure", "table", "concat")
+# Callees that call the function passed to them once per element
+ITERATING_PREFIXES = ("for_each",)
+ITERATING_NAMES = ("sort",)
+# Diagnostic calls (error and debug paths): arguments not charged, callee not followed
+DIAGNOSTIC_MODULES = ("ErrorHandler",)
+DIAGNOSTIC_NAMES = ("log", "error")
+DIAGNOSTIC_FILES = ("core/utils/error_handler.lua",)  # also reached through other aliases
+MAX_RELAXATIONS = 4  # rate updates per function before it is left as is
+
+FuncKey = Tuple[str, int]  # (rel, token index of `function`)
+
+
+class Root(NamedTuple):
+    label: str  # "on_tick", "on_nth_tick(2)"
+    rate: float  # executions per second (0 if the period could not be resolved)
+    rel: str
+    line: int
+    handlers: List[FuncDef]
+
+
+def _key(fd: FuncDef) -> FuncKey:
+    return (fd.rel, fd.start)
+
+
+def _handler_defs(index: ModuleIndex, mod: LuaModule, start: int, end: int) -> List[FuncDef]:
+    """Functions an argument expression evaluates to: an inline function or a name."""
+    tok = mod.tokens[start]
+    if tok.kind == KEYWORD and tok.text == "function":
+        fd = mod.by_start.get(start)
+        return [fd] if fd is not None else []
+    if tok.kind == NAME:
+        parts = [t.text for t in mod.tokens[start:end] if t.kind == NAME]
+        return [r for r in index.resolve(mod, parts) if isinstance(r, FuncDef)]
+    return []
+
+
+def find_roots(index: ModuleIndex, mod: LuaModule) -> List[Root]:
+    """script.on_nth_tick(n, f) and script.on_event(defines.events.on_tick, f) in ``mod``."""
+    tokens = mod.tokens
+    roots = []
+    for i in range(len(tokens) - 3):
+        if not (tokens[i].text == "script" and tokens[i + 1].text == "."):
+            continue
+        method = tokens[i + 2].text
+        if method not in ("on_nth_tick", "on_event") or tokens[i + 3].text != "(":
+            continue
+        args = mod.split_args(i + 3)
+        if len(args) < 2:
+            continue
+        first = tokens[args[0][0] : args[0][1]]
+        if method == "on_event":
+            if [t.text for t in first][-3:] != ["events", ".", "on_tick"]:
+                continue
+            label, rate = "on_tick", float(TICKS_PER_SECOND)
+        else:
+            period: Optional[float] = None
+            if len(first) == 1 and first[0].kind == NUMBER:
+                period = float(first[0].text)
+            elif first and first[0].kind == NAME:
+                values = index.resolve(mod, [t.text for t in first if t.kind == NAME])
+                period = next((v for v in values if isinstance(v, float)), None)
+            text = "".join(t.text for t in first)
+            if period:
+                label = f"on_nth_tick({period:g})" if first[0].kind == NUMBER else (
+                    f"on_nth_tick({text}={period:g})"
+                )
+                rate = TICKS_PER_SECOND / period
+            else:
+                label, rate = f"on_nth_tick({text})", 0.0
+        handlers = _handler_defs(index, mod, *args[1])
+        roots.append(Root(label, rate, mod.rel, tokens[i].line, handlers))
+    return roots
+
+
+def _iterating_callee(mod: LuaModule, fn_index: int) -> bool:
+    """Is the function at fn_index passed straight to a for_each_* / sort call?"""
+    tokens = mod.tokens
+    depth = 0
+    i = fn_index - 1
+    while i > 0:
+        tok = tokens[i]
+        if tok.kind == OP and tok.text in (")", "}", "]"):
+            depth += 1
+        elif tok.kind == OP and tok.text in ("(", "{", "["):
+            if depth == 0:
+                if tok.text != "(" or tokens[i - 1].kind != NAME:
+                    return False
+                name = tokens[i - 1].text
+                return name.startswith(ITERATING_PREFIXES) or name in ITERATING_NAMES
+            depth -= 1
+        elif tok.kind == KEYWORD and depth == 0:
+            return False
+        i -= 1
+    return False
+
+
+def _diagnostic_call_end(index: ModuleIndex, mod: LuaModule, i: int) -> Optional[int]:
+    """Index of the last token of the ErrorHandler.* / log / error call starting at i."""
+    call = mod.call_at(i)
+    if call is None:
+        return None
+    parts = call.parts
+    if not (
+        any(p in DIAGNOSTIC_MODULES for p in parts[:-1])
+        or (len(parts) == 1 and parts[0] in DIAGNOSTIC_NAMES)
+    ):
+        callees = index.resolve_call(mod, call)
+        if not callees or any(fd.rel not in DIAGNOSTIC_FILES for fd in callees):
+            return None
+    tokens = mod.tokens
+    j = i + 2 * len(parts) - 1  # the "(", "{" or string after the callee chain
+    if tokens[j].kind != OP:
+        return j
+    depth = 0
+    while j < len(tokens):
+        tok = tokens[j]
+        if tok.kind == OP and tok.text in ("(", "{", "["):
+            depth += 1
+        elif tok.kind == OP and tok.text in (")", "}", "]"):
+            depth -= 1
+            if depth == 0:
+                return j
+        j += 1
+    return None
+
+
+class BodyScan(NamedTuple):
+    findings: List[Dict[str, Any]]  # kind, line, loops
+    edges: List[Tuple[List[FuncDef], int]]  # (callees, loop depth of the call)
+    nested: List[Tuple[FuncDef, int]]  # (closure, loop depth where it is created)
+
+
+def scan_body(index: ModuleIndex, mod: LuaModule, fd: FuncDef, base_loops: int) -> BodyScan:
+    """Walk one function body (nested bodies excluded) tracking loop depth."""
+    tokens = mod.tokens
+    findings: List[Dict[str, Any]] = []
+    edges: List[Tuple[List[FuncDef], int]] = []
+    nested: List[Tuple[FuncDef, int]] = []
+    blocks: List[bool] = []  # True for loop blocks
+    pending_loop = False
+    storage_locals: Set[str] = set()
+
+    def add(kind: str, line: int) -> None:
+        findings.append({"kind": kind, "line": line, "loops": blocks.count(True)})
+
+    i = fd.start + 1
+    # Skip the parameter list so `function(a, b)` is not read as a call
+    while i < fd.end and not (tokens[i].kind == OP and tokens[i].text == ")"):
+        i += 1
+    i += 1
+    while i < fd.end:
+        tok = tokens[i]
+        loops = blocks.count(True)
+        if tok.kind == KEYWORD:
+            text = tok.text
+            if text == "function":
+                inner = mod.by_start.get(i)
+                if inner is not None:
+                    add("closure", tok.line)
+                    extra = 1 if _iterating_callee(mod, i) else 0
+                    nested.append((inner, loops + extra))
+                    i = inner.end + 1
+                    continue
+            elif text in ("for", "while"):
+                pending_loop = True
+            elif text == "do":
+                blocks.append(pending_loop)
+                pending_loop = False
+            elif text == "repeat":
+                blocks.append(True)
+            elif text == "if":
+                blocks.append(False)
+            elif text in ("end", "until") and blocks:
+                blocks.pop()
+            elif text == "local" and i + 3 < fd.end:
+                # local x = <expression mentioning storage> on the same line
+                name = tokens[i + 1]
+                if name.kind == NAME and tokens[i + 2].text == "=":
+                    for t in tokens[i + 3 : fd.end]:
+                        if t.line != tok.line:
+                            break
+                        if t.kind == NAME and t.text == "storage":
+                            storage_locals.add(name.text)
+                            break
+        elif tok.kind == OP:
+            if tok.text == "{":
+                # x = x or {} allocates once, not per execution
+                if not (tokens[i - 1].kind == KEYWORD and tokens[i - 1].text == "or"):
+                    add("table", tok.line)
+            elif tok.text == "..":
+                add("concat", tok.line)
+        elif tok.kind == NAME:
+            prev = tokens[i - 1]
+            is_member = prev.kind == OP and prev.text in (".", ":")
+            if not is_member:
+                end = _diagnostic_call_end(index, mod, i)
+                if end is not None:
+                    i = end + 1
+                    continue
+            if not is_member and tok.text == "pairs" and tokens[i + 1].text == "(":
+                arg = tokens[i + 2]
+                if arg.kind == NAME and (arg.text == "storage" or arg.text in storage_locals):
+                    add("storage-pairs", tok.line)
+            if (
+                not is_member
+                and tok.text == "game"
+                and tokens[i + 1].text == "."
+                and (
+                    tokens[i + 2].text == "get_player"
+                    or (tokens[i + 2].text == "players" and tokens[i + 3].text == "[")
+                )
+                and loops + base_loops > 0
+            ):
+                add("get_player-in-loop", tok.line)
+            call = mod.call_at(i)
+            if call is not None:
+                callees = index.resolve_call(mod, call)
+                if callees:
+                    edges.append((callees, loops))
+        i += 1
+    return BodyScan(findings, edges, nested)
+
+
+def lint(index: ModuleIndex, roots: List[Root], loop_factor: float) -> Dict[str, Any]:
+    """Propagate rates from the roots and collect findings of every reachable function."""
+    rate: Dict[FuncKey, float] = {}
+    via: Dict[FuncKey, str] = {}
+    parent: Dict[FuncKey, Optional[FuncKey]] = {}
+    base_loops: Dict[FuncKey, int] = {}
+    defs: Dict[FuncKey, FuncDef] = {}
+    scans: Dict[Tuple[FuncKey, int], BodyScan] = {}
+    relaxed: Counter = Counter()
+    queue: List[FuncKey] = []
+
+    def calls_back(caller: Optional[FuncKey], key: FuncKey) -> bool:
+        while caller is not None:
+            if caller == key:
+                return True
+            caller = parent[caller]
+        return False
+
+    def visit(
+        fd: FuncDef, r: float, root: str, loops: int, caller: Optional[FuncKey] = None
+    ) -> None:
+        key = _key(fd)
+        if key in rate and (r <= rate[key] or relaxed[key] >= MAX_RELAXATIONS):
+            return
+        if calls_back(caller, key):
+            return
+        relaxed[key] += 1
+        rate[key], via[key], defs[key], parent[key] = r, root, fd, caller
+        base_loops[key] = loops
+        queue.append(key)
+
+    for root in roots:
+        for fd in root.handlers:
+            visit(fd, root.rate, root.label, 0)
+    while queue:
+        key = queue.pop()
+        fd = defs[key]
+        mod = index.module(fd.rel)
+        if mod is None:
+            continue
+        scan_key = (key, base_loops[key])
+        if scan_key not in scans:
+            scans[scan_key] = scan_body(index, mod, fd, base_loops[key])
+        scan = scans[scan_key]
+        for callees, loops in scan.edges:
+            for callee in callees:
+                visit(callee, rate[key] * loop_factor**loops, via[key], 0, key)
+        for inner, loops in scan.nested:
+            in_loop = 1 if loops + base_loops[key] > 0 else 0
+            visit(inner, rate[key] * loop_factor**loops, via[key], in_loop, key)
+
+    findings = []
+    for key, fd in defs.items():
+        mod = index.module(fd.rel)
+        scan = scans.get((key, base_loops[key]))
+        if mod is None or scan is None:
+            continue
+        grouped: Counter = Counter()
+        per_run: Dict[Tuple[str, int], float] = {}
+        for f in scan.findings:
+            site = (f["kind"], f["line"])
+            grouped[site] += 1
+            per_run[site] = rate[key] * loop_factor ** f["loops"]
+        for (kind, line), count in grouped.items():
+            findings.append(
+                {
+                    "kind": kind,
+                    "file": fd.rel,
+                    "line": line,
+                    "function": fd.name,
+                    "count": count,
+                    "per_second": per_run[(kind, line)] * count,
+                    "root": via[key],
+                    "code": mod.source_line(line)[:100],
+                }
+            )
+    findings.sort(
+        key=lambda f: (-f["per_second"], KINDS.index(f["kind"]), f["file"], f["line"])
+    )
+    functions = sorted(
+        (
+            {"function": fd.name, "file": fd.rel, "line": fd.line, "per_second": rate[key],
+             "root": via[key]}
+            for key, fd in defs.items()
+        ),
+        key=lambda f: (-f["per_second"], f["file"], f["line"]),
+    )
+    return {"functions": functions, "findings": findings}
+
+
+def _finding_counts(findings: List[Dict[str, Any]]) -> Counter:
+    """Occurrences per (file, function, kind): stable across unrelated line shifts."""
+    counts: Counter = Counter()
+    for f in findings:
+        counts[(f["file"], f["function"], f["kind"])] += f["count"]
+    return counts
+
+
+def regressions(
+    findings: List[Dict[str, Any]], baseline: List[Dict[str, Any]]
+) -> List[Tuple[Tuple[str, str, str], int, int]]:
+    """((file, function, kind), before, after) where a hot function gained findings."""
+    before, after = _finding_counts(baseline), _finding_counts(findings)
+    return sorted((k, before.get(k, 0), n) for k, n in after.items() if n > before.get(k, 0))
+
+
+def print_report(roots: List[Root], result: Dict[str, Any], top: int, min_rate: float) -> None:
+    findings = [f for f in result["findings"] if f["per_second"] >= min_rate]
+    files = {f["file"] for f in result["functions"]}
+    print(
+        f"{len(roots)} tick registrations reach {len(result['functions'])} functions in "
+        f"{len(files)} files; {len(result['findings'])} findings"
+    )
+    for root in roots:
+        rate = f"{root.rate:>9.3f}/s" if root.rate else "        ?/s"
+        names = ", ".join(fd.name for fd in root.handlers) or "unresolved handler"
+        print(f"  {rate}  {root.label}  {root.rel}:{root.line}  ({names})")
+    totals = Counter()
+    for f in result["findings"]:
+        totals[f["kind"]] += f["count"]
+    print("  " + ", ".join(f"{totals[k]} {k}" for k in KINDS if totals[k]))
+    print()
+    print(f"Hottest findings (top {min(top, len(findings))}, estimated executions per second):")
+    for f in findings[:top]:
+        count = f" x{f['count']}" if f["count"] > 1 else ""
+        print(
+            f"  {f['per_second']:>10.2f}  {f['kind']}{count}  {f['file']}:{f['line']}  "
+            f"{f['function']}  [{f['root']}]"
+        )
+        print(f"              {f['code']}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Flag per-tick costs reachable from tick handlers")
+    ap.add_argument(
+        "--entry",
+        default=DEFAULT_ENTRY,
+        help=f"Lua file whose tick registrations are the roots (default: {DEFAULT_ENTRY})",
+    )
+    ap.add_argument(
+        "--loop-factor",
+        type=float,
+        default=10.0,
+        help="Assumed iterations per loop when estimating rates (default: 10)",
+    )
+    ap.add_argument(
+        "--min-rate",
+        type=float,
+        default=0.0,
+        help="Hide findings below this many executions per second (default: 0)",
+    )
+    ap.add_argument(
+        "--top",
+        type=int,
+        default=40,
+        help="Findings to print (default: 40; --json always lists everything)",
+    )
+    ap.add_argument(
+        "--json",
+        action="store_true",
+        help="Print roots, reachable functions and findings as JSON",
+    )
+    ap.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Earlier --json output; exit 1 if a function gained findings since",
+    )
+    args = ap.parse_args()
+
+    index = ModuleIndex()
+    mod = index.module(args.entry.replace("\\", "/"))
+    if mod is None:
+        print(f"ERROR: entry file not found: {args.entry}", file=sys.stderr)
+        return 2
+    roots = find_roots(index, mod)
+    if not roots:
+        print(f"ERROR: no tick registrations found in {args.entry}", file=sys.stderr)
+        return 2
+    result = lint(index, roots, args.loop_factor)
+
+    if args.json:
+        payload = {
+            "entry": mod.rel,
+            "loop_factor": args.loop_factor,
+            "roots": [
+                {
+                    "label": r.label,
+                    "per_second": r.rate,
+                    "file": r.rel,
+                    "line": r.line,
+                    "handlers": [fd.name for fd in r.handlers],
+                }
+                for r in roots
+            ],
+            **result,
+        }
+        print(json.dumps(payload, indent=2))
+    else:
+        print_report(roots, result, max(1, args.top), args.min_rate)
+
+    if args.baseline is None:
+        return 0
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["findings"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"ERROR: cannot read baseline {args.baseline}: {e}", file=sys.stderr)
+        return 2
+    worse = regressions(result["findings"], baseline)
+    out = sys.stderr if args.json else sys.stdout
+    if not worse:
+        print("\nNo new findings in tick-reachable functions since the baseline", file=out)
+        return 0
+    print(f"\nNew findings since the baseline ({len(worse)}):", file=out)
+    for (file, function, kind), before, after in worse:
+        print(f"  {kind}: {before} -> {after}  {function}  ({file})", file=out)
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
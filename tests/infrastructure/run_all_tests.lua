@@ -30,7 +30,17 @@ _G.game = _G.game or {
 }
 
 -- Try to load LuaCov
-local has_luacov = pcall(require, "luacov")
+-- A parallel shard (.scripts/run_tests_parallel.py) writes its own stats file,
+-- named by TF_LUACOV_STATSFILE; the orchestrator merges them afterwards.
+local shard_statsfile = os.getenv("TF_LUACOV_STATSFILE")
+local has_luacov
+if shard_statsfile then
+  has_luacov = pcall(function()
+    require("luacov.runner").init({ statsfile = shard_statsfile })
+  end)
+else
+  has_luacov = pcall(require, "luacov")
+end
 if has_luacov then
   print("LuaCov found and enabled")
 else
@@ -67,13 +77,100 @@ local function run_test_file(file_path)
   
   if not success then
     print("ERROR loading " .. file_path .. ": " .. tostring(err))
-    return false, 0, 0  -- file_success, tests_passed, tests_failed
+    return false, 0, 0, {}  -- file_success, tests_passed, tests_failed, test timings
   end
   
   -- Run the tests using the framework and get detailed results
-  local test_success, tests_passed, tests_failed = test_framework.run()
+  local test_success, tests_passed, tests_failed, timings = test_framework.run()
   
-  return test_success, tests_passed or 0, tests_failed or 0
+  return test_success, tests_passed or 0, tests_failed or 0, timings or {}
+end
+
+-- Total hits per source file seen by LuaCov so far (nil when coverage is off).
+-- Diffing two snapshots gives the files a spec executed, which
+-- .scripts/select_tests.py uses to map specs to the modules they exercise.
+local function coverage_snapshot()
+  local runner = package.loaded["luacov.runner"]
+  local data = runner and runner.data
+  if type(data) ~= "table" then
+    return nil
+  end
+  local sums = {}
+  for name, file_data in pairs(data) do
+    local sum = 0
+    for line, hits in pairs(file_data) do
+      if type(line) == "number" then
+        sum = sum + hits
+      end
+    end
+    sums[name] = sum
+  end
+  return sums
+end
+
+local function files_executed(before, after)
+  local files = {}
+  for name, sum in pairs(after) do
+    if sum > (before[name] or 0) then
+      table.insert(files, name)
+    end
+  end
+  table.sort(files)
+  return files
+end
+
+-- Minimal JSON encoding for the timing file (strings, numbers, booleans, arrays, objects)
+local function json_encode(value)
+  local t = type(value)
+  if t == "string" then
+    return '"' .. value:gsub('[%c"\\]', function(c)
+      return string.format("\\u%04x", c:byte())
+    end) .. '"'
+  elseif t == "number" then
+    if value == math.floor(value) then
+      return string.format("%d", value)
+    end
+    return string.format("%.6f", value)
+  elseif t == "boolean" then
+    return tostring(value)
+  elseif t == "table" then
+    local parts = {}
+    if #value > 0 or next(value) == nil then
+      for _, v in ipairs(value) do
+        table.insert(parts, json_encode(v))
+      end
+      return "[" .. table.concat(parts, ",") .. "]"
+    end
+    local keys = {}
+    for k in pairs(value) do
+      table.insert(keys, k)
+    end
+    table.sort(keys)
+    for _, k in ipairs(keys) do
+      table.insert(parts, json_encode(k) .. ":" .. json_encode(value[k]))
+    end
+    return "{" .. table.concat(parts, ",") .. "}"
+  end
+  return "null"
+end
+
+-- Write spec/test durations for .scripts/test_timings.py (and the parallel shard balancer).
+-- A parallel shard writes only its own file (TF_TEST_TIMINGS_FILE); a normal run writes
+-- output/test_timings.json and appends the run to output/test_timings_history.jsonl.
+local function write_timings(run)
+  local encoded = json_encode(run)
+  local shard_file = os.getenv("TF_TEST_TIMINGS_FILE")
+  local targets = shard_file and { { shard_file, "w" } }
+    or { { "output/test_timings.json", "w" }, { "output/test_timings_history.jsonl", "a" } }
+  for _, target in ipairs(targets) do
+    local f = io.open(target[1], target[2])
+    if f then
+      f:write(encoded, "\n")
+      f:close()
+    else
+      print("Could not write test timings to " .. target[1])
+    end
+  end
 end
 
 -- Get all test files from specs directory or specific files from args
@@ -144,10 +241,27 @@ local total_files = 0
 local successful_files = 0
 local total_tests_passed = 0
 local total_tests_failed = 0
+local spec_timings = {}
+local run_start = os.clock()
 
 for _, file in ipairs(test_files) do
   total_files = total_files + 1
-  local file_success, tests_passed, tests_failed = run_test_file(file)
+  local coverage_before = coverage_snapshot()
+  local spec_start = os.clock()
+  local file_success, tests_passed, tests_failed, timings = run_test_file(file)
+  local spec_timing = {
+    spec = file,
+    seconds = os.clock() - spec_start,
+    passed = tests_passed or 0,
+    failed = tests_failed or 0,
+    loaded = #timings > 0 or file_success,
+    tests = timings
+  }
+  local coverage_after = coverage_before and coverage_snapshot()
+  if coverage_after then
+    spec_timing.covered_files = files_executed(coverage_before, coverage_after)
+  end
+  table.insert(spec_timings, spec_timing)
   
   total_tests_passed = total_tests_passed + (tests_passed or 0)
   total_tests_failed = total_tests_failed + (tests_failed or 0)
@@ -165,17 +279,38 @@ print("Total tests passed: " .. total_tests_passed)
 print("Total tests failed: " .. total_tests_failed)
 print("Total tests run: " .. (total_tests_passed + total_tests_failed))
 
+write_timings({
+  format = 1,
+  started_at = os.date("!%Y-%m-%dT%H:%M:%SZ"),
+  clock = "cpu",
+  seconds = os.clock() - run_start,
+  specs = spec_timings
+})
+
 -- Generate coverage report if LuaCov was enabled
 if has_luacov then
   print("\n==== Generating Coverage Report ====")
-  local reporter = require("luacov.reporter")
-  reporter.report()
-  print("Coverage report generated in luacov.report.out")
-  
-  -- Try to run our coverage analyzer
-  pcall(function()
-    dofile("analyze_coverage.lua")
-  end)
+  -- Flush hit counts: the Python formatter reads luacov.stats.out directly
+  require("luacov.runner").save_stats()
+
+  -- Shards leave reporting to the orchestrator, which sees the merged counts
+  if shard_statsfile then
+    print("Coverage stats saved to " .. shard_statsfile)
+    print("\n==== Testing Complete ====")
+    return
+  end
+
+  -- The annotated text report is slow on a full suite; only build it on request
+  if os.getenv("TF_LUACOV_TEXT_REPORT") then
+    local reporter = require("luacov.reporter")
+    reporter.report()
+    print("Coverage report generated in luacov.report.out")
+
+    -- Try to run our coverage analyzer
+    pcall(function()
+      dofile("analyze_coverage.lua")
+    end)
+  end
   
   -- Try to run the Python coverage formatter
   os.execute("python \"V:\\Fac2orios\\2_Gemini\\mods\\TeleportFavorites\\.scripts\\generate_formatted_coverage.py\"")
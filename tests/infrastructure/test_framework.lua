@@ -340,6 +340,8 @@ local function run_tests()
   local passed = 0
   local failed = 0
   local failures = {}
+  -- Per-test CPU seconds (os.clock), including setup/teardown; written to JSON by run_all_tests.lua
+  local timings = {}
   
   for _, describe in ipairs(tests) do
     print("\n" .. describe.description)
@@ -347,6 +349,7 @@ local function run_tests()
     for _, test in ipairs(describe.tests) do
       io.write("  - " .. test.description .. " ... ")
       io.flush()
+      local test_start = os.clock()
       
       -- Reset test state before each test
       reset_test_state()
@@ -382,6 +385,13 @@ local function run_tests()
       if local_after_each then
         pcall(local_after_each)
       end
+
+      table.insert(timings, {
+        describe = describe.description,
+        test = test.description,
+        seconds = os.clock() - test_start,
+        passed = success
+      })
     end
   end
   
@@ -402,7 +412,7 @@ local function run_tests()
     end
   end
   
-  return failed == 0, passed, failed
+  return failed == 0, passed, failed, timings
 end
 
 -- Return API